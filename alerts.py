@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Hashable
+import argparse
+import heapq
+import os
+import shlex
+import subprocess
+import sys
+
+import main
+
+# The dashboard's "Departure with Lunch" countdown: 45 minutes before leaving.
+LUNCH_TIME = timedelta(minutes=45)
+KINDS = ("depart", "lunch", "sleep", "morning")
+# An alert found this late (the machine slept, say) is dropped, not fired.
+GRACE = 300.0
+# How often the schedule file is checked; alerts never wait on it.
+RELOAD_INTERVAL = 10.0
+IDLE_SLEEP = 3600.0
+
+
+@dataclass(frozen=True)
+class Alert:
+    kind: str
+    label: str
+    at: datetime  # when it fires
+    event_at: datetime  # the class or routine it is for
+
+    def message(self) -> str:
+        if self.kind == "depart":
+            return f"Leave now for {self.label} ({self.event_at:%I:%M %p})"
+        if self.kind == "lunch":
+            return f"Eat now, before leaving for {self.label} ({self.event_at:%I:%M %p})"
+        if self.kind == "sleep":
+            return "Time to sleep"
+        return "Morning routine"
+
+
+Hook = Callable[[Alert], None]
+
+
+class AlertEngine:
+    # One pending instant per source (a class and alert kind, or the nightly
+    # sleep/morning routine) in a min-heap of epoch seconds. Firing an alert
+    # pushes that source's next occurrence. Superseded entries stay in the
+    # heap and are skipped when they surface, since `pending` no longer
+    # matches them; sync drops them once they outnumber the live ones.
+    def __init__(self, kinds: tuple[str, ...], hooks: list[Hook]) -> None:
+        self.kinds = kinds
+        self.hooks = hooks
+        self.heap: list[tuple[float, int, Hashable, datetime]] = []
+        self.pending: dict[Hashable, tuple[float, int]] = {}
+        self.sources: dict[Hashable, tuple[str, main.ClassEvent | None]] = {}
+        self.seq = 0
+
+    def wanted(self) -> dict[Hashable, tuple[str, main.ClassEvent | None]]:
+        sources: dict[Hashable, tuple[str, main.ClassEvent | None]] = {}
+        for ev in main.SCHEDULE:
+            for kind in ("depart", "lunch"):
+                if kind in self.kinds:
+                    sources[(kind, ev)] = (kind, ev)
+        if main.SLEEP_ENABLED:
+            # The config is part of the key, so changing it re-registers.
+            config = (main.SLEEP_START, main.SLEEP_DURATION)
+            if "sleep" in self.kinds:
+                sources[("sleep", config)] = ("sleep", None)
+            if "morning" in self.kinds and main.MORNING_ENABLED:
+                sources[("morning", config)] = ("morning", None)
+        return sources
+
+    def sync(self, now: datetime) -> tuple[int, int]:
+        # Registers what the loaded schedule and travel file need now; returns
+        # (added, removed). A class's alert depends on the event before it and
+        # on travel times, so every class source is checked, but only those
+        # whose next instant moved get a new heap entry.
+        wanted = self.wanted()
+        removed = [key for key in self.sources if key not in wanted]
+        for key in removed:
+            del self.sources[key]
+            self.pending.pop(key, None)
+        added = [key for key in wanted if key not in self.sources]
+        for key in added:
+            self.sources[key] = wanted[key]
+        for key, (_, ev) in self.sources.items():
+            if ev is not None or key not in self.pending:
+                self.schedule(key, now.timestamp())
+        if len(self.heap) > 2 * len(self.pending):
+            self.heap = [entry for entry in self.heap if self.pending.get(entry[2]) == entry[:2]]
+            heapq.heapify(self.heap)
+        return len(added), len(removed)
+
+    def next_instant(self, key: Hashable, after: float) -> tuple[float, datetime] | None:
+        # The first instant after `after` for one source, with the start of
+        # what it is for.
+        kind, ev = self.sources[key]
+        if ev is not None:
+            # The lead depends on where the previous event is (main's travel
+            # times), so walk occurrences until one's alert is still ahead.
+            occ = datetime.fromtimestamp(after, main.TZ)
+            while True:
+                occ = main.next_occurrence(occ, ev)
+                if occ is None:
+                    return None
+                lead = main.departure_lead(occ, ev) + (LUNCH_TIME if kind == "lunch" else timedelta(0))
+                at = occ.timestamp() - lead.total_seconds()
+                if at > after:
+                    return at, occ
+        day = datetime.fromtimestamp(after, main.TZ).date()
+        for offset in (-1, 0, 1):
+            start_dt = datetime.combine(day + timedelta(days=offset), main.SLEEP_START, tzinfo=main.TZ)
+            event_at = start_dt if kind == "sleep" else start_dt + main.SLEEP_DURATION  # wakes at a wall-clock time
+            if event_at.timestamp() > after:
+                return event_at.timestamp(), event_at
+        return None
+
+    def schedule(self, key: Hashable, after: float) -> None:
+        found = self.next_instant(key, after)
+        if found is None:
+            self.pending.pop(key, None)
+            return
+        armed = self.pending.get(key)
+        if armed is not None and armed[0] == found[0]:
+            return
+        self.seq += 1
+        self.pending[key] = (found[0], self.seq)
+        heapq.heappush(self.heap, (found[0], self.seq, key, found[1]))
+
+    def next_at(self) -> float | None:
+        heap = self.heap
+        while heap and self.pending.get(heap[0][2]) != heap[0][:2]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def fire_due(self, now: datetime) -> list[Alert]:
+        t = now.timestamp()
+        fired = []
+        while True:
+            at = self.next_at()
+            if at is None or at > t:
+                return fired
+            _, _, key, event_at = heapq.heappop(self.heap)
+            kind, ev = self.sources[key]
+            # Re-arm from the later of the alert and now, so a long suspend
+            # does not replay every missed day.
+            self.schedule(key, max(at, t))
+            if t - at > GRACE:
+                continue
+            label = "" if ev is None else f"{ev.course} {ev.kind}".strip()
+            alert = Alert(kind, label, datetime.fromtimestamp(at, main.TZ), event_at)
+            fired.append(alert)
+            for hook in self.hooks:
+                hook(alert)
+
+
+def bell_hook(alert: Alert) -> None:
+    print(f"\a{alert.at:%a %H:%M:%S}  {alert.message()}", flush=True)
+
+
+def command_hook(command: str, children: list[subprocess.Popen], with_message: bool) -> Hook:
+    # Runs `command` without waiting. Notify commands get title and message
+    # as arguments; scripts get kind, label and event time, plus the same in
+    # SCHEDULER_ALERT_* variables.
+    argv = shlex.split(command)
+
+    def hook(alert: Alert) -> None:
+        env = dict(
+            os.environ,
+            SCHEDULER_ALERT_KIND=alert.kind,
+            SCHEDULER_ALERT_LABEL=alert.label,
+            SCHEDULER_ALERT_AT=alert.at.isoformat(),
+            SCHEDULER_ALERT_EVENT_AT=alert.event_at.isoformat(),
+            SCHEDULER_ALERT_MESSAGE=alert.message(),
+        )
+        args = ["Scheduler", alert.message()] if with_message else [alert.kind, alert.label, alert.event_at.isoformat()]
+        try:
+            children.append(subprocess.Popen(argv + args, env=env, stdin=subprocess.DEVNULL))
+        except OSError as exc:
+            print(f"alert hook failed: {exc}", file=sys.stderr)
+
+    return hook
+
+
+def run(
+    engine: AlertEngine,
+    clock: main.Clock,
+    watcher: main.ScheduleFileWatcher | None,
+    until: datetime | None = None,
+    children: list[subprocess.Popen] | None = None,
+    travel: main.TravelFileWatcher | None = None,
+) -> int:
+    # Sleeps straight to the next alert; the only other wakeups are the
+    # schedule and travel file checks. Returns how many alerts fired.
+    fired = 0
+    files = [source for source in (watcher, travel) if source is not None]
+    engine.sync(clock.now())
+    while True:
+        now = clock.now()
+        if until is not None and now.timestamp() >= until.timestamp():
+            return fired
+        # Alerts due now fire before a reload re-arms them from now.
+        fired += len(engine.fire_due(now))
+        if any([source.poll() for source in files]):
+            engine.sync(now)
+        if children:
+            children[:] = [child for child in children if child.poll() is None]
+        wakeup = now.timestamp() + (RELOAD_INTERVAL if files else IDLE_SLEEP)
+        at = engine.next_at()
+        if at is not None and at < wakeup:
+            wakeup = at
+        if until is not None:
+            wakeup = min(wakeup, until.timestamp())
+        clock.sleep(max(0.0, wakeup - clock.time()))
+
+
+def main_cli(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Fire alerts when it is time to leave, eat, sleep or start the morning routine.")
+    parser.add_argument(
+        "--schedule",
+        default=main.default_schedule_file(),
+        help=f"TOML/JSON/iCalendar schedule file, hot-reloaded on change (default: ${main.SCHEDULE_FILE_ENV} or {' / '.join(main.SCHEDULE_FILE_CANDIDATES)})",
+    )
+    parser.add_argument(
+        "--travel",
+        default=main.default_travel_file(),
+        help=f"TOML/JSON travel times between places, hot-reloaded on change (default: ${main.TRAVEL_FILE_ENV} or {' / '.join(main.TRAVEL_FILE_CANDIDATES)})",
+    )
+    parser.add_argument(
+        "--kinds",
+        type=lambda s: tuple(kind.strip() for kind in s.split(",")),
+        default=KINDS,
+        help=f"comma-separated alerts to fire (default: {','.join(KINDS)})",
+    )
+    parser.add_argument("--no-bell", dest="bell", action="store_false", help="do not print alerts with a terminal bell")
+    parser.add_argument("--notify", nargs="?", const="notify-send", metavar="COMMAND", help="desktop notification command, given title and message (default: notify-send)")
+    parser.add_argument("--exec", dest="script", metavar="COMMAND", help="run a command per alert with kind, label and event time as arguments")
+    parser.add_argument("--replay", nargs=2, type=main.local_datetime, metavar=("FROM", "TO"), help="run over an ISO date/time range on a virtual clock")
+    parser.add_argument("--speed", type=float, default=1000.0, help="replay speed, 0 for as fast as possible (default: %(default)g)")
+    args = parser.parse_args(argv)
+    unknown = [kind for kind in args.kinds if kind not in KINDS]
+    if unknown:
+        parser.error(f"unknown alert kind(s): {', '.join(unknown)} (choose from {', '.join(KINDS)})")
+
+    watcher: main.ScheduleFileWatcher | None = None
+    if args.schedule:
+        watcher = main.ScheduleFileWatcher(args.schedule)
+        watcher.poll()
+        if watcher.error:
+            parser.error(watcher.error)
+    travel = main.watch_travel_file(args.travel)
+    if travel is not None and travel.error:
+        parser.error(travel.error)
+    children: list[subprocess.Popen] = []
+    hooks: list[Hook] = []
+    if args.bell:
+        hooks.append(bell_hook)
+    if args.notify:
+        hooks.append(command_hook(args.notify, children, with_message=True))
+    if args.script:
+        hooks.append(command_hook(args.script, children, with_message=False))
+    engine = AlertEngine(args.kinds, hooks)
+
+    if args.replay is not None:
+        start, end = args.replay
+        fired = run(engine, main.ReplayClock(start, args.speed), None, end, children)
+        print(f"{fired} alerts between {start:%Y-%m-%d %H:%M} and {end:%Y-%m-%d %H:%M}", file=sys.stderr)
+        return
+    try:
+        run(engine, main.SYSTEM_CLOCK, watcher, children=children, travel=travel)
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+
+if __name__ == "__main__":
+    main_cli()
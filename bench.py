@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Callable
+import argparse
+import json
+import platform
+import random
+import sys
+import time as time_mod
+
+import main
+
+DEFAULT_SIZES = (10, 100, 1_000, 10_000, 100_000)
+DEFAULT_ITERATIONS = 200
+# Per-case wall-clock budget; slow cases at large sizes stop early but always
+# get at least MIN_CALLS samples.
+DEFAULT_BUDGET = 2.0
+MIN_CALLS = 5
+BENCH_WEEK = date(2025, 10, 6)  # a Monday mid-term, away from DST changes
+DURATIONS = (50, 80, 110, 170)
+KINDS = ("LEC", "LAB", "TUT", "DGD", "SEM")
+DUE_KINDS = ("Assignment", "Quiz", "Lab", "Exam", "Project")
+
+
+def synthetic_rows(n_events: int, seed: int = 0) -> tuple[list[tuple], list[tuple], list[tuple], list[tuple]]:
+    # Rows in the apply_schedule_rows format: 70% classes, 20% personal, 10%
+    # food, a tenth of them with term bounds and holidays, plus one due item
+    # per event spread over the surrounding eight weeks.
+    rng = random.Random(seed)
+    term = (
+        (BENCH_WEEK - timedelta(weeks=5)).isoformat(),
+        (BENCH_WEEK + timedelta(weeks=8)).isoformat(),
+        1,
+        None,
+        ((BENCH_WEEK + timedelta(days=rng.randrange(14))).isoformat(),),
+        (),
+    )
+    schedule: list[tuple] = []
+    personal: list[tuple] = []
+    food: list[tuple] = []
+    for i in range(n_events):
+        weekday = rng.randrange(5) if rng.random() < 0.9 else rng.randrange(7)
+        start = rng.randrange(8 * 6, 21 * 6) * 10
+        row = (
+            f"{rng.choice('ABCDEFGHIJ')}{rng.choice('ABCDEFGHIJ')}{rng.choice('ABCDEFGHIJ')}{1000 + i % 4000}",
+            rng.choice(KINDS),
+            f"R{rng.randrange(100, 400)}",
+            weekday,
+            (start // 60, start % 60),
+            rng.choice(DURATIONS) * 60,
+            "",
+            term if rng.random() < 0.1 else None,
+        )
+        roll = rng.random()
+        if roll < 0.7:
+            schedule.append(row)
+        elif roll < 0.9:
+            personal.append(row[:6] + (main.PERSONAL_EVENT_COLOR, row[7]))
+        else:
+            food.append(row[:6] + (main.FOOD_EVENT_COLOR, row[7]))
+    start = datetime.combine(BENCH_WEEK - timedelta(weeks=2), datetime.min.time(), main.TZ)
+    due = [
+        (
+            f"Task {i}",
+            rng.choice(DUE_KINDS),
+            (start + timedelta(minutes=rng.randrange(8 * 7 * 24 * 60))).isoformat(),
+        )
+        for i in range(n_events)
+    ]
+    return schedule, personal, food, due
+
+
+def percentile(samples: list[float], q: float) -> float:
+    # Nearest-rank on pre-sorted samples.
+    index = max(0, min(len(samples) - 1, round(q / 100 * len(samples) + 0.5) - 1))
+    return samples[index]
+
+
+def time_case(fn: Callable[[datetime], object], nows: list[datetime], budget: float) -> dict:
+    started = time_mod.perf_counter_ns()
+    fn(nows[0])
+    first = time_mod.perf_counter_ns() - started
+    samples: list[float] = []
+    deadline = time_mod.perf_counter() + budget
+    for now in nows:
+        started = time_mod.perf_counter_ns()
+        fn(now)
+        samples.append((time_mod.perf_counter_ns() - started) / 1e6)
+        if len(samples) >= MIN_CALLS and time_mod.perf_counter() > deadline:
+            break
+    total = sum(samples)
+    samples.sort()
+    return {
+        "calls": len(samples),
+        "first_ms": first / 1e6,
+        "mean_ms": total / len(samples),
+        "p50_ms": percentile(samples, 50),
+        "p99_ms": percentile(samples, 99),
+        "max_ms": samples[-1],
+        "throughput": len(samples) / (total / 1000) if total else float("inf"),
+    }
+
+
+def bench_size(n_events: int, iterations: int, budget: float, seed: int) -> list[dict]:
+    main.apply_schedule_rows(synthetic_rows(n_events, seed))
+    rng = random.Random(seed)
+    week = datetime.combine(BENCH_WEEK, datetime.min.time(), main.TZ)
+    # Random instants in one week, so caches keyed by week stay warm and
+    # "first_ms" is the cold cost.
+    nows = sorted(week + timedelta(seconds=rng.randrange(7 * 24 * 3600)) for _ in range(iterations))
+    box_lines = ["Current Class"] + [f"課: {ev.course} {ev.kind} ({ev.room})" for ev in main.SCHEDULE[:6]]
+
+    def compute_next(now: datetime) -> object:
+        try:
+            return main.compute_next(now)
+        except ValueError:
+            return None
+
+    dashboard = main.Dashboard()
+    tick = [week + timedelta(hours=10, seconds=i) for i in range(iterations)]
+    cases: list[tuple[str, Callable[[datetime], object], list[datetime]]] = [
+        ("compute_next", compute_next, nows),
+        ("compute_current", main.compute_current, nows),
+        ("build_weekly_view", main.build_weekly_view, nows),
+        ("build_due_view", main.build_due_view, nows),
+        ("build_due_list", main.build_due_list, nows),
+        ("make_box", lambda now: main.make_box(box_lines), nows),
+        # One-second ticks through a live Dashboard, as the run loop sees them.
+        ("frame", dashboard.frame, tick),
+        # A fresh Dashboard each call: every section rebuilt.
+        ("frame_cold", lambda now: main.Dashboard().frame(now), nows),
+    ]
+    results = []
+    for name, fn, case_nows in cases:
+        result = time_case(fn, case_nows, budget)
+        results.append({"events": n_events, "function": name, **result})
+        print(
+            f"{n_events:>7} {name:<18} p50 {result['p50_ms']:9.3f} ms  p99 {result['p99_ms']:9.3f} ms"
+            f"  first {result['first_ms']:9.3f} ms  {result['throughput']:10.1f}/s",
+            file=sys.stderr,
+        )
+    return results
+
+
+def compare(old: dict, new: dict) -> str:
+    baseline = {(r["events"], r["function"]): r for r in old["results"]}
+    lines = [f"{'events':>7} {'function':<18} {'p50 old':>10} {'p50 new':>10} {'ratio':>7} {'p99 ratio':>9}"]
+    for r in new["results"]:
+        before = baseline.get((r["events"], r["function"]))
+        if before is None:
+            continue
+        p50 = r["p50_ms"] / before["p50_ms"] if before["p50_ms"] else float("inf")
+        p99 = r["p99_ms"] / before["p99_ms"] if before["p99_ms"] else float("inf")
+        lines.append(
+            f"{r['events']:>7} {r['function']:<18} {before['p50_ms']:10.3f} {r['p50_ms']:10.3f} {p50:7.2f} {p99:9.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main_cli(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard hot paths on synthetic schedules.")
+    parser.add_argument(
+        "--sizes",
+        type=lambda s: [int(n) for n in s.split(",")],
+        default=list(DEFAULT_SIZES),
+        help="comma-separated event counts (default: %(default)s)",
+    )
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="calls per case (default: %(default)s)")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="seconds per case before stopping early (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", "-o", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="earlier JSON results to compare against")
+    args = parser.parse_args(argv)
+
+    results: list[dict] = []
+    for n_events in args.sizes:
+        results += bench_size(n_events, args.iterations, args.budget, args.seed)
+    report = {
+        "created": datetime.now(main.TZ).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": args.iterations,
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+            fh.write("\n")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            print(compare(json.load(fh), report))
+
+
+if __name__ == "__main__":
+    main_cli()
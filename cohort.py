@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Sequence
+from zoneinfo import ZoneInfo
+import sys
+import time as time_mod
+
+import numpy as np
+
+TZ = ZoneInfo("America/Toronto")
+
+DAY_SECONDS = 24 * 60 * 60
+WEEK_SECONDS = 7 * DAY_SECONDS
+# Each student's keys live in their own band. The band is two weeks wide so
+# that end times running past Sunday never collide with the next student.
+STRIDE = 2 * WEEK_SECONDS
+DEPARTURE_LEAD = timedelta(minutes=20)
+
+
+def week_seconds(now: datetime) -> float:
+    return now.weekday() * DAY_SECONDS + now.hour * 3600 + now.minute * 60 + now.second + now.microsecond / 1_000_000
+
+
+class Cohort:
+    # Every student's weekly events in flat arrays sorted by (student, start),
+    # so one searchsorted call answers a query for the whole cohort.
+    def __init__(
+        self,
+        student: Any,
+        weekday: Any,
+        start_minute: Any,
+        duration_minute: Any,
+        n_students: int | None = None,
+        events: Sequence[Any] | None = None,
+    ) -> None:
+        student = np.asarray(student, dtype=np.int64)
+        start = np.asarray(weekday, dtype=np.int64) * DAY_SECONDS + np.asarray(start_minute, dtype=np.int64) * 60
+        duration = np.asarray(duration_minute, dtype=np.int64) * 60
+        if n_students is None:
+            n_students = int(student.max()) + 1 if student.size else 0
+        # Ties on start keep input order, like compute_next over a SCHEDULE list.
+        order = np.lexsort((np.arange(student.size), start, student))
+        self.n_students = n_students
+        self.events = events
+        self.source_index = order
+        self.student = student[order]
+        self.start = start[order]
+        self.duration = duration[order]
+        self.offsets = np.searchsorted(self.student, np.arange(n_students + 1))
+        self.start_key = self.student * STRIDE + self.start
+        self.end_key = self.start_key + self.duration
+        # Running max of end times; a prefix whose max end is before the query
+        # cannot contain an event that is still running.
+        self.max_end_key = np.maximum.accumulate(self.end_key) if self.end_key.size else self.end_key
+
+    @classmethod
+    def from_schedules(cls, schedules: Sequence[Iterable[Any]]) -> Cohort:
+        # `schedules[i]` is student i's list of ClassEvent-like objects.
+        student: list[int] = []
+        weekday: list[int] = []
+        start_minute: list[int] = []
+        duration_minute: list[int] = []
+        events: list[Any] = []
+        for i, schedule in enumerate(schedules):
+            for ev in schedule:
+                student.append(i)
+                weekday.append(ev.weekday)
+                start_minute.append(ev.start.hour * 60 + ev.start.minute)
+                duration_minute.append(int(ev.duration.total_seconds() // 60))
+                events.append(ev)
+        return cls(student, weekday, start_minute, duration_minute, n_students=len(schedules), events=events)
+
+    def event(self, index: int) -> Any:
+        # Maps an index returned by a query back to the input event.
+        if self.events is None or index < 0:
+            return None
+        return self.events[index]
+
+    def next_events(self, now: datetime) -> tuple[np.ndarray, np.ndarray]:
+        # For every student: input index of the next event to start after
+        # `now` (-1 if they have none) and seconds until it starts.
+        n = self.n_students
+        if self.start.size == 0:
+            return np.full(n, -1, dtype=np.int64), np.full(n, -1.0)
+        t = week_seconds(now)
+        whole = int(t)
+        frac = t - whole
+        students = np.arange(n, dtype=np.int64)
+        lo = self.offsets[:-1]
+        hi = self.offsets[1:]
+        empty = lo == hi
+        idx = np.searchsorted(self.start_key, students * STRIDE + whole, side="right")
+        wrap = idx >= hi
+        nxt = np.where(wrap | empty, lo, idx)
+        nxt = np.minimum(nxt, self.start.size - 1)
+        until = self.start[nxt] - whole + np.where(wrap, WEEK_SECONDS, 0) - frac
+        return (
+            np.where(empty, -1, self.source_index[nxt]),
+            np.where(empty, -1.0, until),
+        )
+
+    def current_events(self, now: datetime) -> tuple[np.ndarray, np.ndarray]:
+        # For every student: input index of the event in progress (latest start
+        # wins, started today as in compute_current) and seconds remaining.
+        n = self.n_students
+        event = np.full(n, -1, dtype=np.int64)
+        remaining = np.full(n, -1.0)
+        if self.start.size == 0:
+            return event, remaining
+        t = week_seconds(now)
+        whole = int(t)
+        frac = t - whole
+        students = np.arange(n, dtype=np.int64)
+        query = students * STRIDE + whole
+        day_floor = students * STRIDE + (whole - whole % DAY_SECONDS)
+        lo = self.offsets[:-1]
+        k = np.searchsorted(self.start_key, query, side="right") - 1
+        pending = np.nonzero(k >= lo)[0]
+        k = k[pending]
+        # Walk back from the latest start; each pass handles all students at
+        # once and only those still unresolved carry on. The number of passes
+        # is bounded by how deeply events overlap.
+        while pending.size:
+            started_today = self.start_key[k] >= day_floor[pending]
+            covers = started_today & (self.end_key[k] > query[pending])
+            hit = pending[covers]
+            hit_k = k[covers]
+            # Among events sharing the winning start, the earliest listed one
+            # that still covers the query wins; tied entries that have ended
+            # are stepped over, not stopped at.
+            scan = hit_k - 1
+            tied = np.arange(hit.size)
+            while tied.size:
+                s = scan[tied]
+                same = s >= lo[hit[tied]]
+                same[same] &= self.start_key[s[same]] == self.start_key[hit_k[tied[same]]]
+                tied = tied[same]
+                s = s[same]
+                still = self.end_key[s] > query[hit[tied]]
+                hit_k[tied[still]] = s[still]
+                scan[tied] = s - 1
+            event[hit] = self.source_index[hit_k]
+            remaining[hit] = self.end_key[hit_k] - query[hit] - frac
+            prev = k - 1
+            more = ~covers & started_today & (prev >= lo[pending])
+            more[more] &= self.max_end_key[prev[more]] > query[pending[more]]
+            pending = pending[more]
+            k = prev[more]
+        return event, remaining
+
+    def in_class(self, now: datetime) -> np.ndarray:
+        return self.current_events(now)[0] >= 0
+
+    def leaving_within(self, now: datetime, minutes: float, lead: timedelta = DEPARTURE_LEAD) -> np.ndarray:
+        # Students whose departure (next start minus `lead`) falls in the next `minutes`.
+        event, until = self.next_events(now)
+        leave_in = until - lead.total_seconds()
+        return (event >= 0) & (leave_in >= 0) & (leave_in <= minutes * 60)
+
+
+def synthetic_cohort(n_students: int, events_per_student: int = 12, seed: int = 0) -> Cohort:
+    rng = np.random.default_rng(seed)
+    total = n_students * events_per_student
+    return Cohort(
+        np.repeat(np.arange(n_students), events_per_student),
+        rng.integers(0, 5, total),
+        rng.integers(8 * 2, 21 * 2, total) * 30,
+        rng.choice([80, 80, 170], total),
+        n_students=n_students,
+    )
+
+
+def main() -> None:
+    n_students = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    started = time_mod.perf_counter()
+    cohort = synthetic_cohort(n_students)
+    built = time_mod.perf_counter() - started
+    now = datetime.now(TZ)
+    started = time_mod.perf_counter()
+    in_class = cohort.in_class(now)
+    leaving = cohort.leaving_within(now, 20)
+    queried = time_mod.perf_counter() - started
+    print(f"Students:        {n_students}")
+    print(f"Build:           {built * 1000:.1f} ms")
+    print(f"Query:           {queried * 1000:.1f} ms")
+    print(f"In class:        {int(in_class.sum())}")
+    print(f"Leaving <20 min: {int(leaving.sum())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,20 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime, timedelta, time
+from typing import Any
 from zoneinfo import ZoneInfo
+import argparse
+import heapq
+import json
+import os
 import sys
 import time as time_mod
 
 TZ = ZoneInfo("America/Toronto")
 DEPARTURE_LEAD = timedelta(minutes=20)
+DEFAULT_SHOW = 5
 
 TIME_FORMATS = [
     "%H:%M",
@@ -31,8 +38,8 @@ def parse_time(value: str) -> time:
 
 def next_datetime_for_time(now: datetime, target: time) -> datetime:
     candidate = datetime.combine(now.date(), target, tzinfo=TZ)
-    if candidate <= now:
-        candidate += timedelta(days=1)
+    if candidate.timestamp() <= now.timestamp():
+        candidate = datetime.combine(now.date() + timedelta(days=1), target, tzinfo=TZ)
     return candidate
 
 
@@ -46,32 +53,263 @@ def fmt_delta(td: timedelta) -> str:
     return f"{h:02d}:{m:02d}:{s:02d}"
 
 
+def fmt_delta_minutes(td: timedelta) -> str:
+    # Rounded up, so "00:00" only shows once the moment has arrived.
+    total = max(0, -int(-td.total_seconds() // 60))
+    return f"{total // 60:02d}:{total % 60:02d}"
+
+
+@dataclass(frozen=True)
+class Target:
+    label: str
+    lead: timedelta
+    at: time | None = None  # a daily time
+    event: Any = None  # or a ClassEvent from main's schedule
+
+    def next_after(self, now: datetime) -> datetime | None:
+        if self.event is not None:
+            import main
+
+            return main.next_occurrence(now, self.event)
+        return next_datetime_for_time(now, self.at)
+
+    def lead_for(self, target_dt: datetime) -> timedelta:
+        # A class leaves by main's travel times when a travel file is loaded;
+        # `lead` (from --lead) is the fallback.
+        if self.event is not None:
+            import main
+
+            if main.travel_matrix() is not None:
+                return main.departure_lead(target_dt, self.event)
+        return self.lead
+
+
+def parse_target(spec: str, lead: timedelta = DEPARTURE_LEAD) -> Target:
+    # "[LABEL=]TIME[/LEAD_MINUTES]", e.g. "14:30", "Lab=2:30 PM/10".
+    label, sep, rest = spec.partition("=")
+    if not sep:
+        label, rest = "", spec
+    clock, sep, minutes = rest.partition("/")
+    if sep:
+        try:
+            lead = timedelta(minutes=float(minutes))
+        except ValueError:
+            raise ValueError(f"bad lead time {minutes!r} in {spec!r}") from None
+    at = parse_time(clock)
+    return Target(label.strip() or at.strftime("%H:%M"), lead, at=at)
+
+
+def read_targets(path: str, lead: timedelta) -> list[Target]:
+    targets = []
+    with open(path, encoding="utf-8") as fh:
+        for lineno, line in enumerate(fh, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            try:
+                targets.append(parse_target(line, lead))
+            except ValueError as exc:
+                raise ValueError(f"{path}:{lineno}: {exc}") from None
+    return targets
+
+
+def schedule_targets(path: str | None, lead: timedelta, travel: str | None = None) -> list[Target]:
+    import main
+
+    path = path or main.default_schedule_file()
+    if path:
+        main.load_schedule_file(path)
+    if travel:
+        main.load_travel_file(travel)
+    return [Target(f"{ev.course} {ev.kind}", lead, event=ev) for ev in main.SCHEDULE]
+
+
+def heap_head(heap: list, n: int) -> list:
+    # The n smallest entries of a heap in order, in O(n log n) whatever its
+    # size: only the children of entries already taken can come next.
+    head = []
+    frontier = [(heap[0], 0)] if heap and n > 0 else []
+    while frontier:
+        entry, i = heapq.heappop(frontier)
+        head.append(entry)
+        if len(head) == n:
+            break
+        for child in (2 * i + 1, 2 * i + 2):
+            if child < len(heap):
+                heapq.heappush(frontier, (heap[child], child))
+    return head
+
+
+class DepartureQueue:
+    # Targets waiting for their departure in one min-heap keyed by departure
+    # instant; targets past departure (leave now) in a second heap keyed by
+    # the target instant, where they roll over to their next occurrence.
+    # Each target has exactly one entry, so a tick touches only the heads.
+    # Keys are epoch seconds: aware datetimes in one zone compare by wall
+    # clock, which misorders the repeated hour at the fall-back change.
+    def __init__(self, targets: list[Target], now: datetime) -> None:
+        self.pending: list[tuple[float, int, datetime, datetime, Target]] = []
+        self.leaving: list[tuple[float, int, datetime, datetime, Target]] = []
+        self.seq = 0
+        for target in targets:
+            self.schedule(target, now)
+
+    def schedule(self, target: Target, now: datetime) -> None:
+        target_dt = target.next_after(now)
+        if target_dt is None:
+            return
+        self.seq += 1
+        depart_ts = target_dt.timestamp() - target.lead_for(target_dt).total_seconds()
+        depart_dt = datetime.fromtimestamp(depart_ts, TZ)
+        if depart_ts <= now.timestamp():
+            heapq.heappush(self.leaving, (target_dt.timestamp(), self.seq, depart_dt, target_dt, target))
+        else:
+            heapq.heappush(self.pending, (depart_ts, self.seq, depart_dt, target_dt, target))
+
+    def advance(self, now: datetime) -> list[tuple[datetime, Target]]:
+        # Moves everything whose departure has arrived to `leaving` (returned
+        # as alerts) and rolls targets that have passed over to the next day.
+        t = now.timestamp()
+        alerts = []
+        while self.pending and self.pending[0][0] <= t:
+            _, seq, depart_dt, target_dt, target = heapq.heappop(self.pending)
+            heapq.heappush(self.leaving, (target_dt.timestamp(), seq, depart_dt, target_dt, target))
+            alerts.append((target_dt, target))
+        while self.leaving and self.leaving[0][0] <= t:
+            target = heapq.heappop(self.leaving)[4]
+            self.schedule(target, now)
+        return alerts
+
+    def next_event(self) -> float | None:
+        heads = [heap[0][0] for heap in (self.pending, self.leaving) if heap]
+        return min(heads) if heads else None
+
+    def soonest(self, n: int) -> list[tuple[datetime, datetime, Target]]:
+        rows = [entry[2:] for entry in heap_head(self.leaving, n)]
+        if len(rows) < n:
+            rows += [entry[2:] for entry in heap_head(self.pending, n - len(rows))]
+        return rows
+
+    def __len__(self) -> int:
+        return len(self.pending) + len(self.leaving)
+
+
+def render(queue: DepartureQueue, now: datetime, show: int, minutes: bool) -> str:
+    countdown = fmt_delta_minutes if minutes else fmt_delta
+    lines = [f"Now:           {now:%Y-%m-%d %I:%M:%S %p %Z}" if not minutes else f"Now:           {now:%Y-%m-%d %I:%M %p %Z}"]
+    rows = queue.soonest(show)
+    width = max((len(target.label) for _, _, target in rows), default=0)
+    for depart_dt, target_dt, target in rows:
+        left = depart_dt.timestamp() - now.timestamp()
+        left_text = "leave now" if left <= 0 else f"{countdown(timedelta(seconds=left))} left"
+        lines.append(f"{target.label:<{width}}  {target_dt:%a %I:%M %p}  depart {depart_dt:%I:%M %p}  {left_text}")
+    if len(queue) > len(rows):
+        lines.append(f"(+{len(queue) - len(rows)} more)")
+    return "\n".join(lines)
+
+
+def next_visible_change(now: datetime, minutes: bool) -> float:
+    # Toronto's offsets are whole hours, so epoch minutes are wall minutes.
+    step = 60 if minutes else 1
+    return (int(now.timestamp()) // step + 1) * step
+
+
+def run(
+    queue: DepartureQueue,
+    clock: Any,  # a main.Clock: SYSTEM_CLOCK, or a ReplayClock for --replay
+    show: int,
+    minutes: bool,
+    until: datetime | None = None,
+    out=None,
+    record=None,
+) -> int:
+    # Renders until `until` (forever when None) and returns the frame count.
+    # `record` gets a JSON line whenever alerts fire or the list changes.
+    out = out or sys.stdout
+    frames = 0
+    shown: list | None = None
+    while True:
+        now = clock.now()
+        if until is not None and now.timestamp() >= until.timestamp():
+            return frames
+        alerts = queue.advance(now)
+        for target_dt, target in alerts:
+            print(f"\aLeave now for {target.label} ({target_dt:%I:%M %p})", file=out)
+        print(render(queue, now, show, minutes), file=out)
+        print("", file=out)
+        frames += 1
+        if record is not None:
+            rows = [
+                [target.label, target_dt.isoformat(), depart_dt.timestamp() <= now.timestamp()]
+                for depart_dt, target_dt, target in queue.soonest(show)
+            ]
+            changes: dict[str, Any] = {}
+            if alerts:
+                changes["alerts"] = [[target.label, target_dt.isoformat()] for target_dt, target in alerts]
+            if rows != shown:
+                changes["soonest"] = shown = rows
+            if changes:
+                record.write(json.dumps({"t": now.isoformat(), "frame": frames, "changes": changes}, ensure_ascii=False) + "\n")
+        # Sleep to whichever comes first: the countdown's next visible
+        # change or the next departure/rollover in the queue.
+        wakeup = next_visible_change(now, minutes)
+        event = queue.next_event()
+        if event is not None and event < wakeup:
+            wakeup = event
+        clock.sleep(max(0.0, wakeup - clock.time()))
+
+
 def main() -> None:
-    raw = input("Enter target time (e.g. 14:30 or 2:30 PM): ")
+    import main as app
+
+    parser = argparse.ArgumentParser(description="Count down to departure for one or more target times.")
+    parser.add_argument("targets", nargs="*", metavar="TARGET", help="[LABEL=]TIME[/LEAD_MINUTES], e.g. 14:30 or 'Lab=2:30 PM/10'")
+    parser.add_argument("--file", "-f", metavar="PATH", help="read targets from a file, one per line ('#' comments)")
+    parser.add_argument("--schedule", nargs="?", const="", metavar="PATH", help="add every class in the schedule (default: main.py's schedule file)")
+    parser.add_argument("--lead", type=float, default=DEPARTURE_LEAD.total_seconds() / 60, help="default lead time in minutes (default: %(default)g)")
+    parser.add_argument("--travel", metavar="PATH", help=f"--schedule: TOML/JSON travel times for per-class leads (default: ${app.TRAVEL_FILE_ENV} or {' / '.join(app.TRAVEL_FILE_CANDIDATES)})")
+    parser.add_argument("--show", type=int, default=DEFAULT_SHOW, help="how many of the soonest targets to show (default: %(default)s)")
+    parser.add_argument("--minutes", action="store_true", help="show countdowns to the minute and wake once a minute")
+    parser.add_argument("--replay", nargs=2, type=app.local_datetime, metavar=("FROM", "TO"), help="run over an ISO date/time range on a virtual clock")
+    parser.add_argument("--speed", type=float, default=1000.0, help="replay speed in virtual seconds per second, 0 for as fast as possible (default: %(default)g)")
+    parser.add_argument("--headless", action="store_true", help="replay with no output, as fast as possible")
+    parser.add_argument("--record", metavar="PATH", help="replay: write alerts and list changes as JSON lines ('-' for stdout)")
+    args = parser.parse_args()
+    lead = timedelta(minutes=args.lead)
+
     try:
-        target_time = parse_time(raw)
-    except ValueError as exc:
-        print(f"Invalid time: {exc}")
+        targets = [parse_target(spec, lead) for spec in args.targets]
+        if args.file:
+            targets += read_targets(args.file, lead)
+        if args.schedule is not None:
+            targets += schedule_targets(args.schedule or None, lead, args.travel)
+        if not targets:
+            targets.append(parse_target(input("Enter target time (e.g. 14:30 or 2:30 PM): "), lead))
+    except (OSError, ValueError) as exc:
+        print(f"Invalid target: {exc}")
         sys.exit(1)
 
-    try:
-        while True:
-            now = datetime.now(TZ)
-            target_dt = next_datetime_for_time(now, target_time)
-            depart_dt = target_dt - DEPARTURE_LEAD
-            until_depart = depart_dt - now
-
-            print(f"Now:           {now:%Y-%m-%d %I:%M:%S %p %Z}")
-            print(f"Target time:   {target_dt:%Y-%m-%d %I:%M %p}")
-            print(f"Depart time:   {depart_dt:%Y-%m-%d %I:%M %p}")
-            if until_depart.total_seconds() <= 0:
-                print("Time left:     00:00:00 (leave now)")
-            else:
-                print(f"Time left:     {fmt_delta(until_depart)} (HH:MM:SS)")
-            print("")
-            time_mod.sleep(1)
-    except KeyboardInterrupt:
-        print("\nStopped.")
+    if args.replay is None:
+        queue = DepartureQueue(targets, app.SYSTEM_CLOCK.now())
+        try:
+            run(queue, app.SYSTEM_CLOCK, args.show, args.minutes)
+        except KeyboardInterrupt:
+            print("\nStopped.")
+        return
+
+    import contextlib
+
+    start, end = args.replay
+    clock = app.ReplayClock(start, 0 if args.headless else args.speed)
+    with contextlib.ExitStack() as stack:
+        out = stack.enter_context(open(os.devnull, "w", encoding="utf-8")) if args.headless else sys.stdout
+        record = None
+        if args.record:
+            record = sys.stdout if args.record == "-" else stack.enter_context(open(args.record, "w", encoding="utf-8"))
+        started = time_mod.perf_counter()
+        frames = run(DepartureQueue(targets, clock.now()), clock, args.show, args.minutes, end, out, record)
+        elapsed = time_mod.perf_counter() - started
+    print(f"Replayed {start:%Y-%m-%d %H:%M} - {end:%Y-%m-%d %H:%M}: {frames} frames in {elapsed:.2f} s, {frames / max(elapsed, 1e-9):.0f} frames/s", file=sys.stderr)
 
 
 if __name__ == "__main__":
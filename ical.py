@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, time, timezone
+from typing import IO, Any, Iterable, Iterator
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import re
+
+TZ = ZoneInfo("America/Toronto")
+
+WEEKDAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+COURSE_RE = re.compile(r"^([A-Z]{2,4} ?\d{3,4}[A-Z]?)\s*[-:]?\s*(.*)$")
+DURATION_RE = re.compile(r"^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+FOLD_WIDTH = 75
+
+
+class ICalError(ValueError):
+    pass
+
+
+def unfold(lines: Iterable[str]) -> Iterator[str]:
+    # RFC 5545 3.1: a line starting with a space or tab continues the previous one.
+    pending: str | None = None
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t"):
+            if pending is not None:
+                pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending
+        pending = line
+    if pending:
+        yield pending
+
+
+def split_params(head: str) -> tuple[str, dict[str, str]]:
+    parts: list[str] = []
+    current = ""
+    quoted = False
+    for ch in head:
+        if ch == '"':
+            quoted = not quoted
+        elif ch == ";" and not quoted:
+            parts.append(current)
+            current = ""
+            continue
+        current += ch
+    parts.append(current)
+    params: dict[str, str] = {}
+    for part in parts[1:]:
+        key, _, value = part.partition("=")
+        params[key.upper()] = value.strip('"')
+    return parts[0].upper(), params
+
+
+def parse_line(line: str) -> tuple[str, dict[str, str], str]:
+    if '"' not in line:
+        head, sep, value = line.partition(":")
+        if not sep:
+            raise ICalError(f"malformed content line: {line[:60]!r}")
+        if ";" not in head:
+            return head.upper(), {}, value
+        name, *parts = head.split(";")
+        params = {}
+        for part in parts:
+            key, _, param = part.partition("=")
+            params[key.upper()] = param
+        return name.upper(), params, value
+    # The value starts at the first colon outside a quoted parameter value.
+    quoted = False
+    for i, ch in enumerate(line):
+        if ch == '"':
+            quoted = not quoted
+        elif ch == ":" and not quoted:
+            name, params = split_params(line[:i])
+            return name, params, line[i + 1:]
+    raise ICalError(f"malformed content line: {line[:60]!r}")
+
+
+def unescape(value: str) -> str:
+    if "\\" not in value:
+        return value
+    out: list[str] = []
+    chars = iter(value)
+    for ch in chars:
+        if ch == "\\":
+            nxt = next(chars, "")
+            out.append("\n" if nxt in ("n", "N") else nxt)
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def iter_components(lines: Iterable[str], names: tuple[str, ...] = ("VEVENT", "VTODO")) -> Iterator[tuple[str, dict[str, list[tuple[dict[str, str], str]]]]]:
+    # Yields each wanted component as soon as its END line is read; nested
+    # components (VALARM) are skipped and nothing else is kept in memory.
+    current: dict[str, list[tuple[dict[str, str], str]]] | None = None
+    kind = ""
+    depth = 0
+    for line in unfold(lines):
+        if not line:
+            continue
+        name, params, value = parse_line(line)
+        if name == "BEGIN":
+            value = value.upper()
+            if current is None and value in names:
+                current, kind, depth = {}, value, 0
+            elif current is not None:
+                depth += 1
+            continue
+        if name == "END" and current is not None:
+            if depth:
+                depth -= 1
+            else:
+                yield kind, current
+                current = None
+            continue
+        if current is not None and not depth:
+            current.setdefault(name, []).append((params, value))
+
+
+def zone_for(params: dict[str, str]) -> ZoneInfo | timezone:
+    tzid = params.get("TZID")
+    if not tzid or tzid == TZ.key:
+        return TZ
+    try:
+        return ZoneInfo(tzid)
+    except (ZoneInfoNotFoundError, ValueError):
+        return TZ
+
+
+def parse_datetime(params: dict[str, str], value: str) -> datetime | date:
+    # Sliced by hand: strptime dominates the cost of large feeds.
+    value = value.strip()
+    try:
+        day = date(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+        if params.get("VALUE", "").upper() == "DATE" or len(value) == 8:
+            return day
+        if value[8] != "T":
+            raise ValueError
+        clock = time(int(value[9:11]), int(value[11:13]), int(value[13:15]))
+    except (ValueError, IndexError):
+        raise ICalError(f"bad date-time: {value!r}") from None
+    if value.endswith("Z"):
+        return datetime.combine(day, clock, tzinfo=timezone.utc).astimezone(TZ)
+    zone = zone_for(params)
+    dt = datetime.combine(day, clock, tzinfo=zone)
+    return dt if zone is TZ else dt.astimezone(TZ)
+
+
+def parse_duration(value: str) -> timedelta:
+    match = DURATION_RE.match(value.strip())
+    if not match:
+        raise ICalError(f"bad DURATION: {value!r}")
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    td = timedelta(
+        weeks=int(weeks or 0),
+        days=int(days or 0),
+        hours=int(hours or 0),
+        minutes=int(minutes or 0),
+        seconds=int(seconds or 0),
+    )
+    return -td if sign == "-" else td
+
+
+def parse_rrule(value: str) -> dict[str, str]:
+    return {key.upper(): val for key, _, val in (part.partition("=") for part in value.split(";") if part)}
+
+
+def as_local(value: datetime | date) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.combine(value, time(0), tzinfo=TZ)
+
+
+def as_due(value: datetime | date) -> datetime:
+    # All-day deadlines mean the end of that day.
+    if isinstance(value, datetime):
+        return value
+    return datetime.combine(value, time(23, 59), tzinfo=TZ)
+
+
+def split_summary(summary: str) -> tuple[str, str]:
+    match = COURSE_RE.match(summary)
+    if match:
+        return match.group(1), match.group(2)
+    return summary, ""
+
+
+def first(component: dict[str, list[tuple[dict[str, str], str]]], name: str) -> tuple[dict[str, str], str] | None:
+    values = component.get(name)
+    return values[0] if values else None
+
+
+def date_list(component: dict[str, list[tuple[dict[str, str], str]]], name: str) -> list[datetime | date]:
+    out: list[datetime | date] = []
+    for params, value in component.get(name, []):
+        out.extend(parse_datetime(params, part) for part in value.split(",") if part)
+    return out
+
+
+def last_counted_date(start: date, days: list[int], interval: int, count: int) -> date:
+    # COUNT spans every BYDAY occurrence, so walk weeks until it runs out.
+    week = start - timedelta(days=start.weekday())
+    remaining = max(1, count)
+    while True:
+        for day in sorted(days):
+            current = week + timedelta(days=day)
+            if current < start:
+                continue
+            remaining -= 1
+            if remaining == 0:
+                return current
+        week += timedelta(days=7 * interval)
+
+
+def event_entries(component: dict[str, list[tuple[dict[str, str], str]]]) -> Iterator[tuple[str, dict[str, Any]]]:
+    start_prop = first(component, "DTSTART")
+    if start_prop is None:
+        return
+    start = as_local(parse_datetime(*start_prop))
+    summary = unescape(first(component, "SUMMARY")[1]) if "SUMMARY" in component else ""
+    end_prop = first(component, "DTEND")
+    duration_prop = first(component, "DURATION")
+    if end_prop is not None:
+        duration = as_local(parse_datetime(*end_prop)) - start
+    elif duration_prop is not None:
+        duration = parse_duration(duration_prop[1])
+    else:
+        duration = timedelta(0)
+    uid = first(component, "UID")[1] if "UID" in component else ""
+
+    recurrence_id = first(component, "RECURRENCE-ID")
+    if recurrence_id is not None and uid:
+        # This instance replaces one occurrence of the series with this UID.
+        yield "skip", {"uid": uid, "date": as_local(parse_datetime(*recurrence_id)).date().isoformat()}
+        if "STATUS" in component and first(component, "STATUS")[1].strip().upper() == "CANCELLED":
+            return
+
+    if duration <= timedelta(0):
+        # Zero-length events are how most LMS exports mark deadlines.
+        title, kind = split_summary(summary)
+        yield "due", {"title": title, "kind": kind, "due": as_due(parse_datetime(*start_prop)).isoformat()}
+        return
+
+    course, kind = split_summary(summary)
+    if "X-COURSE" in component:
+        # Written by CalendarWriter so round trips keep the course/kind split.
+        course = unescape(first(component, "X-COURSE")[1])
+        kind = unescape(first(component, "X-KIND")[1]) if "X-KIND" in component else ""
+    entry: dict[str, Any] = {
+        "course": course,
+        "kind": kind,
+        "room": unescape(first(component, "LOCATION")[1]) if "LOCATION" in component else "",
+        "start": start.time().isoformat(),
+        "duration": duration.total_seconds() / 60,
+    }
+    if uid and recurrence_id is None:
+        entry["uid"] = uid
+    if "CATEGORIES" in component:
+        entry["category"] = unescape(first(component, "CATEGORIES")[1]).split(",")[0].strip().lower()
+    rrule_prop = first(component, "RRULE") if recurrence_id is None else None
+    if rrule_prop is None:
+        # A single occurrence is a weekly event whose term is one day long.
+        yield "event", {**entry, "weekday": start.weekday(), "term_start": start.date(), "term_end": start.date()}
+        return
+
+    rule = parse_rrule(rrule_prop[1])
+    freq = rule.get("FREQ", "").upper()
+    interval = int(rule.get("INTERVAL", "1"))
+    if freq == "DAILY" and interval == 1:
+        days = list(range(7))
+    elif freq == "WEEKLY":
+        days = [WEEKDAYS.index(day[-2:].upper()) for day in rule.get("BYDAY", "").split(",") if day[-2:].upper() in WEEKDAYS]
+        days = days or [start.weekday()]
+    else:
+        # Other frequencies do not fit the weekly model; keep the first instance.
+        yield "event", {**entry, "weekday": start.weekday(), "term_start": start.date(), "term_end": start.date()}
+        return
+    if freq == "DAILY":
+        interval = 1
+    entry["term_start"] = start.date()
+    if "UNTIL" in rule:
+        entry["term_end"] = as_local(parse_datetime({}, rule["UNTIL"])).date()
+    elif "COUNT" in rule:
+        entry["term_end"] = last_counted_date(start.date(), days, interval, int(rule["COUNT"]))
+    if interval > 1:
+        # Weeks count from the Monday of DTSTART's week (WKST=MO).
+        entry["every_weeks"] = interval
+        entry["anchor"] = start.date() - timedelta(days=start.weekday())
+    skip = [as_local(d).date() for d in date_list(component, "EXDATE")]
+    if skip:
+        entry["skip"] = skip
+    extra = [as_local(d) for d in date_list(component, "RDATE")]
+    if extra:
+        entry["extra"] = extra
+    for day in days:
+        yield "event", {**entry, "weekday": day}
+
+
+def iter_entries(lines: Iterable[str]) -> Iterator[tuple[str, dict[str, Any]]]:
+    # Yields ("event" | "due" | "skip", entry) in schedule-file entry form.
+    # "skip" entries cancel one occurrence of an earlier or later event with
+    # the same uid; the consumer applies them once the stream ends.
+    for kind, component in iter_components(lines):
+        if kind == "VTODO":
+            due_prop = first(component, "DUE")
+            if due_prop is None:
+                continue
+            summary = unescape(first(component, "SUMMARY")[1]) if "SUMMARY" in component else ""
+            title, task = split_summary(summary)
+            yield "due", {"title": title, "kind": task, "due": as_due(parse_datetime(*due_prop)).isoformat()}
+        else:
+            yield from event_entries(component)
+
+
+def fold(line: str) -> str:
+    # Fold at 75 octets without splitting a UTF-8 sequence.
+    data = line.encode("utf-8")
+    if len(data) <= FOLD_WIDTH:
+        return line + "\r\n"
+    out: list[str] = []
+    chunk = ""
+    size = 0
+    limit = FOLD_WIDTH
+    for ch in line:
+        width = len(ch.encode("utf-8"))
+        if size + width > limit:
+            out.append(chunk)
+            chunk, size, limit = "", 0, FOLD_WIDTH - 1
+        chunk += ch
+        size += width
+    out.append(chunk)
+    return "\r\n ".join(out) + "\r\n"
+
+
+def fmt_local(dt: datetime) -> str:
+    return dt.strftime("%Y%m%dT%H%M%S")
+
+
+def fmt_utc(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+class CalendarWriter:
+    # Writes components as they are added; nothing is buffered beyond one line.
+    def __init__(self, fh: IO[str], tzid: str = "America/Toronto", prodid: str = "-//University Scheduler//EN") -> None:
+        self.fh = fh
+        self.tzid = tzid
+        self.stamp = fmt_utc(datetime.now(timezone.utc))
+        self.count = 0
+        self.write("BEGIN:VCALENDAR")
+        self.write("VERSION:2.0")
+        self.write(f"PRODID:{prodid}")
+
+    def write(self, line: str) -> None:
+        self.fh.write(fold(line))
+
+    def event(self, ev: Any, first_day: date, category: str = "", once: bool = False) -> None:
+        # `ev` is a ClassEvent; `first_day` is the date of its first occurrence,
+        # or of its only one when `once` is set.
+        start = datetime.combine(first_day, ev.start)
+        self.count += 1
+        self.write("BEGIN:VEVENT")
+        self.write(f"UID:{fmt_local(start)}-{self.count}@university-scheduler")
+        self.write(f"DTSTAMP:{self.stamp}")
+        self.write(f"SUMMARY:{escape(f'{ev.course} {ev.kind}'.strip())}")
+        self.write(f"X-COURSE:{escape(ev.course)}")
+        self.write(f"X-KIND:{escape(ev.kind)}")
+        if category:
+            self.write(f"CATEGORIES:{escape(category)}")
+        if ev.room:
+            self.write(f"LOCATION:{escape(ev.room)}")
+        self.write(f"DTSTART;TZID={self.tzid}:{fmt_local(start)}")
+        self.write(f"DTEND;TZID={self.tzid}:{fmt_local(start + ev.duration)}")
+        if once:
+            self.write("END:VEVENT")
+            return
+        rule = ev.recurrence
+        rrule = f"FREQ=WEEKLY;BYDAY={WEEKDAYS[ev.weekday]}"
+        if rule is not None:
+            if rule.interval > 1:
+                rrule += f";INTERVAL={rule.interval}"
+            if rule.term_end is not None:
+                until = datetime.combine(rule.term_end, time(23, 59, 59), tzinfo=TZ)
+                rrule += f";UNTIL={fmt_utc(until)}"
+        self.write(f"RRULE:{rrule}")
+        if rule is not None:
+            for day in sorted(rule.skip):
+                if day.weekday() == ev.weekday and day >= first_day:
+                    self.write(f"EXDATE;TZID={self.tzid}:{fmt_local(datetime.combine(day, ev.start))}")
+            for extra in rule.extra:
+                self.write(f"RDATE;TZID={self.tzid}:{fmt_local(extra.astimezone(TZ).replace(tzinfo=None))}")
+        self.write("END:VEVENT")
+
+    def todo(self, item: Any) -> None:
+        self.count += 1
+        due = item.due_date.astimezone(TZ).replace(tzinfo=None)
+        self.write("BEGIN:VTODO")
+        self.write(f"UID:{fmt_local(due)}-{self.count}@university-scheduler")
+        self.write(f"DTSTAMP:{self.stamp}")
+        self.write(f"SUMMARY:{escape(f'{item.title} {item.kind}'.strip())}")
+        self.write(f"DUE;TZID={self.tzid}:{fmt_local(due)}")
+        self.write("END:VTODO")
+
+    def close(self) -> None:
+        self.write("END:VCALENDAR")
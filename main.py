@@ -1,12 +1,30 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import sys
+
+# Status bars run `--once` every few seconds; answer from statusline's
+# transitions cache before paying for the imports and tables below.
+if __name__ == "__main__" and ("--once" in sys.argv[1:] or "--statusline" in sys.argv[1:]):
+    import statusline
+
+    sys.exit(statusline.main())
+
+from array import array
 from dataclasses import dataclass
-from datetime import datetime, timedelta, time
+from bisect import bisect_left, bisect_right
+from collections import Counter, deque
+from datetime import date, datetime, timedelta, time
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Iterator, Sequence
 from zoneinfo import ZoneInfo
+import dataclasses
+import heapq
 import time as time_mod
 import os
 import random
+import re
+import shutil
 import unicodedata
 
 TZ = ZoneInfo("America/Toronto")  # Ottawa
@@ -31,6 +49,27 @@ MORNING_ENABLED = True
 MORNING_DURATION = timedelta(minutes=60)
 MORNING_EVENT_COLOR = BG_YELLOW
 
+# Weekly grid: minutes per row (one of WEEKLY_RESOLUTIONS) and the hours
+# shown, as (first, last) or "auto" to crop to the earliest and latest event.
+WEEKLY_RESOLUTIONS = (5, 10, 15, 30, 60)
+WEEKLY_SLOT_MINUTES = 30
+WEEKLY_HOURS: tuple[int, int] | str = (0, 24)
+
+# Term bounds, skipped dates (holidays, reading week) and one-off extra
+# occurrences for a weekly event. An override is a skipped date plus an extra.
+@dataclass(frozen=True)
+class Recurrence:
+    term_start: date | None = None
+    term_end: date | None = None
+    interval: int = 1  # weeks between occurrences, counted from anchor
+    anchor: date | None = None  # defaults to term_start
+    skip: frozenset[date] = frozenset()
+    extra: tuple[datetime, ...] = ()
+
+    def __post_init__(self) -> None:
+        # Kept in time order so occurrence lookups can bisect.
+        object.__setattr__(self, "extra", tuple(sorted(self.extra, key=datetime.timestamp)))
+
 # Monday=0 ... Sunday=6
 @dataclass(frozen=True)
 class ClassEvent:
@@ -41,6 +80,111 @@ class ClassEvent:
     start: time
     duration: timedelta
     color: str = ""
+    recurrence: Recurrence | None = None
+
+def clock_seconds(t: time) -> int:
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+class EventTable:
+    # Weekly events as parallel array columns: weekday, start and duration in
+    # seconds, ids into one interned string table for course/kind/room/color,
+    # and ids into a list of shared Recurrence rules (-1 for none). About 30
+    # bytes an event instead of a few hundred for a ClassEvent with its time
+    # and timedelta. Indexing and iteration build ClassEvent views on demand,
+    # so code written against list[ClassEvent] keeps working, while hot paths
+    # read the columns directly.
+    def __init__(self) -> None:
+        self.weekday = array("b")
+        self.start = array("i")
+        self.duration = array("i")
+        self.course = array("I")
+        self.kind = array("I")
+        self.room = array("I")
+        self.color = array("I")
+        self.rule = array("i")
+        self.strings: list[str] = []
+        self.string_ids: dict[str, int] = {}
+        self.rules: list[Recurrence] = []
+        self.rule_ids: dict[Recurrence, int] = {}
+
+    @classmethod
+    def from_events(cls, events: Iterable[ClassEvent]) -> EventTable:
+        table = cls()
+        for ev in events:
+            table.append(ev.course, ev.kind, ev.room, ev.weekday, clock_seconds(ev.start), ev.duration.total_seconds(), ev.color, ev.recurrence)
+        return table
+
+    def intern(self, text: str) -> int:
+        i = self.string_ids.get(text)
+        if i is None:
+            i = self.string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        return i
+
+    def append(
+        self,
+        course: str,
+        kind: str,
+        room: str,
+        weekday: int,
+        start: int,
+        duration: float,
+        color: str = "",
+        recurrence: Recurrence | None = None,
+    ) -> None:
+        rule = -1
+        if recurrence is not None:
+            rule = self.rule_ids.get(recurrence, -1)
+            if rule < 0:
+                rule = self.rule_ids[recurrence] = len(self.rules)
+                self.rules.append(recurrence)
+        self.weekday.append(weekday)
+        self.start.append(start)
+        self.duration.append(round(duration))
+        self.course.append(self.intern(course))
+        self.kind.append(self.intern(kind))
+        self.room.append(self.intern(room))
+        self.color.append(self.intern(color))
+        self.rule.append(rule)
+
+    def recurrence(self, i: int) -> Recurrence | None:
+        rule = self.rule[i]
+        return None if rule < 0 else self.rules[rule]
+
+    def event(self, i: int) -> ClassEvent:
+        start = self.start[i]
+        strings = self.strings
+        return ClassEvent(
+            strings[self.course[i]],
+            strings[self.kind[i]],
+            strings[self.room[i]],
+            self.weekday[i],
+            time(start // 3600, start // 60 % 60, start % 60),
+            timedelta(seconds=self.duration[i]),
+            strings[self.color[i]],
+            self.recurrence(i),
+        )
+
+    def __len__(self) -> int:
+        return len(self.weekday)
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, slice):
+            return [self.event(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("event index out of range")
+        return self.event(index)
+
+    def __iter__(self) -> Iterator[ClassEvent]:
+        return (self.event(i) for i in range(len(self)))
+
+    def __repr__(self) -> str:
+        return f"<EventTable of {len(self)} events>"
+
+def event_table(events: Sequence[ClassEvent]) -> EventTable:
+    return events if isinstance(events, EventTable) else EventTable.from_events(events)
 
 @dataclass(frozen=True)
 class DueItem:
@@ -48,7 +192,7 @@ class DueItem:
     kind: str
     due_date: datetime
 
-SCHEDULE: list[ClassEvent] = [
+SCHEDULE: Sequence[ClassEvent] = [
     # Monday (0)
     ClassEvent("CEG 4166", "Lecture",  "Learning Crossroads C442", 0, time(13, 0),  timedelta(minutes=80)),
     ClassEvent("CEG 4195", "Lecture",  "University Centre AUD",    0, time(14, 30), timedelta(minutes=80)),
@@ -71,7 +215,7 @@ SCHEDULE: list[ClassEvent] = [
     #ClassEvent("ECO 1102", "Lecture",    "Learning Crossroads C240",3, time(17, 30), timedelta(minutes=80)),
 ]
 
-PERSONAL_SCHEDULE: list[ClassEvent] = [
+PERSONAL_SCHEDULE: Sequence[ClassEvent] = [
     # Example:
     ClassEvent("MAT 2384", "Study", "N/A", 0, time(10, 0), timedelta(minutes=60)),
     ClassEvent("MAT 2384", "Study", "N/A", 1, time(19, 0), timedelta(minutes=90)),
@@ -92,7 +236,7 @@ CLASS_EVENT_COLOR = BG_BLUE
 PERSONAL_EVENT_COLOR = BG_MAGENTA
 FOOD_EVENT_COLOR = BG_GREEN
 
-FOOD_SCHEDULE: list[ClassEvent] = [
+FOOD_SCHEDULE: Sequence[ClassEvent] = [
     # Example:
      ClassEvent("Dinner", "Eat out", "N/A", 0, time(16, 0), timedelta(minutes=60)),
      ClassEvent("Lunch", "Prepared Food", "Home", 1, time(10, 0), timedelta(minutes=60)),
@@ -227,14 +371,69 @@ PHRASES = {
 }
 
 
-def next_occurrence(now: datetime, ev: ClassEvent) -> datetime:
-    days_ahead = (ev.weekday - now.weekday()) % 7
-    candidate_date = now.date() + timedelta(days=days_ahead)
-    candidate = datetime.combine(candidate_date, ev.start, tzinfo=TZ)
-    if candidate <= now:
-        candidate += timedelta(days=7)
+def next_regular_date(ev: ClassEvent, from_date: date) -> date | None:
+    # First date >= from_date with a regular occurrence, found by jumping
+    # whole periods; only skipped dates are stepped over one at a time.
+    day = from_date + timedelta(days=(ev.weekday - from_date.weekday()) % 7)
+    rule = ev.recurrence
+    if rule is None:
+        return day
+    period = 7 * max(1, rule.interval)
+    if rule.term_start is not None and day < rule.term_start:
+        day += timedelta(days=(rule.term_start - day).days // 7 * 7)
+        if day < rule.term_start:
+            day += timedelta(days=7)
+    anchor = rule.anchor or rule.term_start
+    if anchor is not None and period > 7:
+        anchor_day = anchor + timedelta(days=(ev.weekday - anchor.weekday()) % 7)
+        day += timedelta(days=-(day - anchor_day).days % period)
+    while day in rule.skip:
+        day += timedelta(days=period)
+    if rule.term_end is not None and day > rule.term_end:
+        return None
+    return day
+
+def occurs_on(ev: ClassEvent, day: date) -> bool:
+    return day.weekday() == ev.weekday and next_regular_date(ev, day) == day
+
+def next_occurrence(now: datetime, ev: ClassEvent, regular_only: bool = False) -> datetime | None:
+    day = next_regular_date(ev, now.date())
+    candidate = None
+    if day is not None:
+        candidate = datetime.combine(day, ev.start, tzinfo=TZ)
+        if candidate.timestamp() <= now.timestamp():
+            day = next_regular_date(ev, day + timedelta(days=1))
+            candidate = None if day is None else datetime.combine(day, ev.start, tzinfo=TZ)
+    if ev.recurrence is not None and not regular_only:
+        for extra in ev.recurrence.extra:
+            if extra.timestamp() > now.timestamp() and (candidate is None or extra.timestamp() < candidate.timestamp()):
+                candidate = extra
     return candidate
 
+def iter_occurrences(ev: ClassEvent, start: datetime, end: datetime) -> Iterator[datetime]:
+    # Lazily yields occurrence starts in [start, end), regular and extra merged.
+    extras: Sequence[datetime] = ()
+    if ev.recurrence is not None and ev.recurrence.extra:
+        extra = ev.recurrence.extra
+        first = bisect_left(extra, start.timestamp(), key=datetime.timestamp)
+        extras = extra[first:bisect_left(extra, end.timestamp(), lo=first, key=datetime.timestamp)]
+    i = 0
+    day = next_regular_date(ev, start.date())
+    period = timedelta(days=7 * max(1, ev.recurrence.interval if ev.recurrence else 1))
+    start_t, end_t = start.timestamp(), end.timestamp()
+    while day is not None:
+        occ = datetime.combine(day, ev.start, tzinfo=TZ)
+        occ_t = occ.timestamp()
+        if occ_t >= end_t:
+            break
+        if occ_t >= start_t:
+            while i < len(extras) and extras[i].timestamp() < occ_t:
+                yield extras[i]
+                i += 1
+            yield occ
+        day = next_regular_date(ev, day + period) if ev.recurrence else day + period
+    yield from extras[i:]
+
 def fmt_delta(td: timedelta) -> str:
     total = int(td.total_seconds())
     if total < 0:
@@ -252,36 +451,230 @@ def fmt_delta_hm(td: timedelta) -> str:
     m = (total % 3600) // 60
     return f"{h:02d}:{m:02d}"
 
-def clear_screen() -> None:
-    os.system("cls" if os.name == "nt" else "clear")
+class TerminalRenderer:
+    # Keeps the last frame and rewrites only the lines that changed, using
+    # cursor-addressing escapes instead of clearing the whole screen.
+    def __init__(self, stream=None) -> None:
+        self.stream = stream or sys.stdout
+        self.interactive = self.stream.isatty()
+        self.previous: list[str] | None = None
+        self.size: os.terminal_size | None = None
+
+    def render(self, frame: str) -> None:
+        lines = frame.split("\n")
+        if not self.interactive:
+            self.stream.write(frame + "\n\n")
+            self.stream.flush()
+            return
+        size = shutil.get_terminal_size()
+        out: list[str] = []
+        if self.previous is None or size != self.size:
+            if self.previous is None and os.name == "nt":
+                os.system("")  # enables ANSI escape handling in the Windows console
+            # Hide the cursor and turn off autowrap so every line stays on one row.
+            out.append("\033[?25l\033[?7l\033[H\033[2J")
+            self.previous = []
+            self.size = size
+        previous = self.previous
+        rows = max(size.lines, 1)
+        if len(lines) > rows:
+            # Absolute positions past the bottom row get clamped onto it, so
+            # cut the frame to the screen and say how much was left off.
+            hidden = len(lines) - rows + 1
+            lines = lines[: rows - 1] + [f"... {hidden} more lines"]
+        for i, line in enumerate(lines):
+            if i < len(previous) and previous[i] == line:
+                continue
+            out.append(f"\033[{i + 1};1H{line}\033[K")
+        if len(lines) < len(previous):
+            out.append(f"\033[{len(lines) + 1};1H\033[J")
+        self.previous = lines
+        if out:
+            self.stream.write("".join(out))
+            self.stream.flush()
+
+    def close(self) -> None:
+        if not self.interactive or self.previous is None:
+            return
+        # Step down from the last drawn row; moving straight to the row below
+        # it would land on that same row when the frame fills the screen.
+        self.stream.write(f"\033[{len(self.previous)};1H\r\n\033[?7h\033[?25h")
+        self.stream.flush()
+
+def real_delta(start: datetime, end: datetime) -> timedelta:
+    # Aware datetimes that share a tzinfo subtract (and compare) as wall-clock
+    # times, which is an hour off across a DST change; epoch seconds are not.
+    return timedelta(seconds=end.timestamp() - start.timestamp())
+
+def local_epoch(day: date, t: time) -> int:
+    # A wall time skipped by spring-forward lands after the gap (02:30 ->
+    # 03:30 EDT); a repeated one at fall-back resolves to its first instance.
+    return int(datetime.combine(day, t, tzinfo=TZ).timestamp())
+
+class WeekTable:
+    # Every occurrence from Monday 00:00 of one local week through the end of
+    # the following week as integer epoch seconds, sorted by (start, regular
+    # before one-off, schedule order) so ties resolve the way the old
+    # min()/max() scans over SCHEDULE did. Converting each occurrence from
+    # wall time once makes the table DST-correct, and a query inside the week
+    # is a bisect over plain numbers.
+    def __init__(self, events: Sequence[ClassEvent], week_start: date) -> None:
+        self.source = events
+        self.size = len(events)
+        self.sleep_key = (SLEEP_ENABLED, SLEEP_START, SLEEP_DURATION)
+        table = self.table = event_table(events)
+        days = [local_epoch(week_start + timedelta(days=i), time(0)) for i in range(15)]
+        self.lo = days[0]
+        self.hi = days[7]
+        self.horizon = days[14]
+        # Wall-clock slots shared by many events are converted once.
+        slots: dict[tuple[int, int], int] = {}
+        rows: list[tuple[int, int, int]] = []
+        weekdays, starts, rule_ids = table.weekday, table.start, table.rule
+        for i in range(len(table)):
+            weekday = weekdays[i]
+            ev = None if rule_ids[i] < 0 else table.event(i)
+            for week in (0, 7):
+                if ev is not None and not occurs_on(ev, week_start + timedelta(days=weekday + week)):
+                    continue
+                slot = (weekday + week, starts[i])
+                start = slots.get(slot)
+                if start is None:
+                    clock = time(starts[i] // 3600, starts[i] // 60 % 60, starts[i] % 60)
+                    start = slots[slot] = local_epoch(week_start + timedelta(days=slot[0]), clock)
+                rows.append((start, 0, i))
+            if ev is not None and ev.recurrence.extra:
+                extra = ev.recurrence.extra
+                for k in range(bisect_left(extra, self.lo, key=datetime.timestamp), len(extra)):
+                    start = int(extra[k].timestamp())
+                    if start >= self.horizon:
+                        break
+                    rows.append((start, 1, i))
+        rows.sort()
+        self.starts = [start for start, _, _ in rows]
+        self.index = array("i", [i for _, _, i in rows])
+        durations = table.duration
+        self.ends = [start + durations[i] for start, _, i in rows]
+        self.bounds: list[int] = []
+        self.active: list[int] = []
+        for d in range(7):
+            self._sweep(days[d], days[d + 1])
+        self.sleep_starts: list[int] = []
+        self.sleep_windows: list[tuple[int, datetime, datetime]] = []
+        if SLEEP_ENABLED:
+            for d in range(-1, 7):
+                start_dt = datetime.combine(week_start + timedelta(days=d), SLEEP_START, tzinfo=TZ)
+                end_dt = start_dt + SLEEP_DURATION  # wakes at a wall-clock time
+                self.sleep_starts.append(int(start_dt.timestamp()))
+                self.sleep_windows.append((int(end_dt.timestamp()), start_dt, end_dt))
+        self._beyond: tuple[datetime, ClassEvent] | None | bool = False
+
+    def _sweep(self, day_lo: int, day_hi: int) -> None:
+        # Split one day into elementary segments between boundaries of the
+        # occurrences starting that day and record which one compute_current
+        # reports in each: the latest start still running, first listed on ties.
+        a = bisect_left(self.starts, day_lo)
+        b = bisect_left(self.starts, day_hi)
+        points = sorted(
+            {day_lo}
+            | set(self.starts[a:b])
+            | {end for end in self.ends[a:b] if end < day_hi}
+        )
+        heap: list[tuple[int, int]] = []
+        i = a
+        for point in points:
+            while i < b and self.starts[i] <= point:
+                heapq.heappush(heap, (-self.starts[i], i))
+                i += 1
+            while heap and self.ends[heap[0][1]] <= point:
+                heapq.heappop(heap)
+            self.bounds.append(point)
+            self.active.append(heap[0][1] if heap else -1)
+
+    def valid(self, events: Sequence[ClassEvent], t: float) -> bool:
+        return (
+            self.source is events
+            and self.size == len(events)
+            and self.lo <= t < self.hi
+            and self.sleep_key == (SLEEP_ENABLED, SLEEP_START, SLEEP_DURATION)
+        )
+
+    def start_dt(self, k: int) -> datetime:
+        return datetime.fromtimestamp(self.starts[k], TZ)
+
+    def event(self, k: int) -> ClassEvent:
+        return self.source[self.index[k]]
+
+    def next_at(self, t: float) -> int:
+        # Index of the first occurrence starting after t, or -1 if the table
+        # has none before its horizon.
+        i = bisect_right(self.starts, t)
+        return i if i < len(self.starts) else -1
+
+    def current_at(self, t: float) -> int:
+        i = bisect_right(self.bounds, t) - 1
+        return self.active[i] if i >= 0 else -1
+
+    def sleep_at(self, t: float) -> tuple[datetime, datetime] | None:
+        i = bisect_right(self.sleep_starts, t) - 1
+        if i < 0 or t > self.sleep_windows[i][0]:
+            return None
+        return self.sleep_windows[i][1], self.sleep_windows[i][2]
+
+    def beyond(self) -> tuple[datetime, ClassEvent] | None:
+        # The first occurrence at or after the horizon, for queries that find
+        # nothing in the table (between terms). It is the same for every
+        # query in the week, so it is scanned for once.
+        if self._beyond is False:
+            after = datetime.fromtimestamp(self.horizon - 1, TZ)
+            best: tuple[int, int, int, datetime, ClassEvent] | None = None
+            for order, ev in enumerate(self.source):
+                candidates = [(next_occurrence(after, ev, regular_only=True), 0)]
+                if ev.recurrence is not None:
+                    candidates += [(extra, 1) for extra in ev.recurrence.extra if extra > after]
+                for occ, kind in candidates:
+                    if occ is None:
+                        continue
+                    key = (int(occ.timestamp()), kind, order, occ, ev)
+                    if best is None or key[:3] < best[:3]:
+                        best = key
+            self._beyond = None if best is None else (best[3], best[4])
+        return self._beyond
+
+_week_table: WeekTable | None = None
+
+def week_table(now: datetime) -> WeekTable:
+    # Rebuilt when the week rolls over or the schedule or sleep settings change.
+    global _week_table
+    if _week_table is None or not _week_table.valid(SCHEDULE, now.timestamp()):
+        _week_table = WeekTable(SCHEDULE, now.date() - timedelta(days=now.weekday()))
+    return _week_table
 
 def compute_next(now: datetime) -> tuple[datetime, ClassEvent, timedelta]:
-    occ, ev = min(
-        ((next_occurrence(now, ev), ev) for ev in SCHEDULE),
-        key=lambda x: x[0]
-    )
-    return occ, ev, (occ - now)
+    table = week_table(now)
+    t = now.timestamp()
+    k = table.next_at(t)
+    if k >= 0:
+        return table.start_dt(k), table.event(k), timedelta(seconds=table.starts[k] - t)
+    beyond = table.beyond()
+    if beyond is None:
+        raise ValueError("no upcoming events")
+    occ, ev = beyond
+    return occ, ev, timedelta(seconds=occ.timestamp() - t)
 
 def class_end(start_dt: datetime, ev: ClassEvent) -> datetime:
-    return start_dt + ev.duration
+    return datetime.fromtimestamp(start_dt.timestamp() + ev.duration.total_seconds(), TZ)
 
 def compute_current(now: datetime) -> tuple[datetime, ClassEvent, timedelta] | None:
-    today = now.date()
-    candidates: list[tuple[datetime, ClassEvent]] = []
-    for ev in SCHEDULE:
-        if ev.weekday != now.weekday():
-            continue
-        start_dt = datetime.combine(today, ev.start, tzinfo=TZ)
-        end_dt = class_end(start_dt, ev)
-        if start_dt <= now < end_dt:
-            candidates.append((start_dt, ev))
-    if not candidates:
+    table = week_table(now)
+    t = now.timestamp()
+    k = table.current_at(t)
+    if k < 0:
         return None
-    start_dt, ev = max(candidates, key=lambda x: x[0])
-    return start_dt, ev, (class_end(start_dt, ev) - now)
+    return table.start_dt(k), table.event(k), timedelta(seconds=table.ends[k] - t)
 
 def phrase_stage(start_dt: datetime, ev: ClassEvent, now: datetime) -> str:
-    elapsed = (now - start_dt).total_seconds()
+    elapsed = real_delta(start_dt, now).total_seconds()
     total = ev.duration.total_seconds()
     if total <= 0:
         return "middle"
@@ -292,15 +685,26 @@ def phrase_stage(start_dt: datetime, ev: ClassEvent, now: datetime) -> str:
         return "middle"
     return "end"
 
+# Format characters such as ZWJ/ZWSP and combining marks take no column.
+ZERO_WIDTH_CATEGORIES = ("Mn", "Me", "Cf")
+
+def char_width(ch: str) -> int:
+    if unicodedata.combining(ch) or unicodedata.category(ch) in ZERO_WIDTH_CATEGORIES:
+        return 0
+    if unicodedata.east_asian_width(ch) in ("W", "F"):
+        return 2
+    return 1
+
+@lru_cache(maxsize=4096)
+def _unicode_width(text: str) -> int:
+    return sum(char_width(ch) for ch in text)
+
 def display_width(text: str) -> int:
-    width = 0
-    for ch in text:
-        if unicodedata.east_asian_width(ch) in ("W", "F"):
-            width += 2
-        else:
-            width += 1
-    return width
+    if text.isascii():
+        return len(text)
+    return _unicode_width(text)
 
+@lru_cache(maxsize=4096)
 def pad_to_width(text: str, width: int) -> str:
     pad = max(0, width - display_width(text))
     return text + (" " * pad)
@@ -320,123 +724,287 @@ def ceil_to_step(value: int, step: int) -> int:
 def floor_to_step(value: int, step: int) -> int:
     return value - (value % step)
 
-def build_weekly_view(now: datetime) -> str:
-    days = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-    slot_minutes = 30
-    start_min, end_min = 0, 24 * 60
-    now_minutes = now.hour * 60 + now.minute
-    now_slot = floor_to_step(now_minutes, slot_minutes)
-    sleep_window = current_sleep_window(now)
-    sleep_marker_day: int | None = None
-    sleep_marker_slot: int | None = None
-    sleep_marker_label = ""
-    if sleep_window:
-        _, sleep_end = sleep_window
-        if sleep_end > now:
-            mid_dt = now + (sleep_end - now) / 2
-            sleep_marker_day = mid_dt.weekday()
-            mid_minutes = mid_dt.hour * 60 + mid_dt.minute
-            sleep_marker_slot = floor_to_step(mid_minutes, slot_minutes)
-            sleep_marker_label = f"|Wake in: {fmt_delta(sleep_end - now)}"
-
-    sleep_events = build_sleep_events()
-    morning_events = build_morning_events()
+def week_occurrences(events: Sequence[ClassEvent], week_start: date) -> list[ClassEvent]:
+    # Plain weekly events pass through; recurring ones become whatever actually
+    # happens that week, with one-off extras moved to their real day and time.
+    start = datetime.combine(week_start, time(0), tzinfo=TZ)
+    end = datetime.combine(week_start + timedelta(days=7), time(0), tzinfo=TZ)
+    out: list[ClassEvent] = []
+    for ev in events:
+        if ev.recurrence is None:
+            out.append(ev)
+            continue
+        for occ in iter_occurrences(ev, start, end):
+            occ = occ.astimezone(TZ)
+            out.append(dataclasses.replace(ev, weekday=occ.weekday(), start=occ.time()))
+    return out
+
+def weekly_event_sources(week_start: date) -> list[tuple[ClassEvent, str, int]]:
     # Higher priority renders on top when events overlap.
-    event_sources = (
-        [(ev, ev.color or PERSONAL_EVENT_COLOR, 3) for ev in PERSONAL_SCHEDULE]
-        + [(ev, ev.color or FOOD_EVENT_COLOR, 2) for ev in FOOD_SCHEDULE]
-        + [(ev, ev.color or CLASS_EVENT_COLOR, 1) for ev in SCHEDULE]
-        + [(ev, ev.color, 0) for ev in sleep_events]
-        + [(ev, ev.color, 0) for ev in morning_events]
+    return (
+        [(ev, ev.color or PERSONAL_EVENT_COLOR, 3) for ev in week_occurrences(PERSONAL_SCHEDULE, week_start)]
+        + [(ev, ev.color or FOOD_EVENT_COLOR, 2) for ev in week_occurrences(FOOD_SCHEDULE, week_start)]
+        + [(ev, ev.color or CLASS_EVENT_COLOR, 1) for ev in week_occurrences(SCHEDULE, week_start)]
+        + [(ev, ev.color, 0) for ev in build_sleep_events()]
+        + [(ev, ev.color, 0) for ev in build_morning_events()]
     )
-    labels = [f"{ev.course} {ev.kind}" for ev, _, _ in event_sources]
-    col_width = max(12, *(display_width(label) for label in labels)) if labels else 12
-    time_width = 6  # marker + HH:MM
 
+def event_slots(ev: ClassEvent, slot_minutes: int) -> list[tuple[int, str, bool]]:
+    ev_start = ev.start.hour * 60 + ev.start.minute
+    ev_end = ev_start + int(ev.duration.total_seconds() // 60)
+    slots: list[tuple[int, str, bool]] = []
+    if ev.course == "Sleep" and ev.kind == "Rest":
+        start_slot = floor_to_step(ev_start, slot_minutes)
+        end_slot = ceil_to_step(ev_end, slot_minutes)
+        last_slot = max(start_slot, end_slot - slot_minutes)
+        for t in range(start_slot, max(end_slot, start_slot + slot_minutes), slot_minutes):
+            if t == start_slot:
+                slots.append((t, "Sleep", True))
+            elif t == last_slot:
+                slots.append((t, "E", False))
+            else:
+                slots.append((t, "|", False))
+    else:
+        # The label goes in the row the event starts in, so coarse rows still
+        # show events that start between them.
+        first = floor_to_step(ev_start, slot_minutes)
+        slots.append((first, f"{ev.course} {ev.kind}", True))
+        for t in range(first + slot_minutes, ev_end, slot_minutes):
+            slots.append((t, "|", False))
+    return slots
+
+class WeeklyGrid:
+    DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+    TIME_WIDTH = 6  # marker + HH:MM
+
+    def __init__(
+        self,
+        event_sources: list[tuple[ClassEvent, str, int]],
+        slot_minutes: int,
+        hours: tuple[int, int] | str = (0, 24),
+    ) -> None:
+        self.slot_minutes = slot_minutes
+        self.rows = (24 * 60) // slot_minutes
+        first_hour, last_hour = visible_hours(event_sources) if hours == "auto" else hours
+        # Only rows first_row..last_row-1 are rendered; the rest stay blank.
+        self.first_row = first_hour * 60 // slot_minutes
+        self.last_row = last_hour * 60 // slot_minutes
+        labels = [f"{ev.course} {ev.kind}" for ev, _, _ in event_sources]
+        self.col_width = max(12, *(display_width(label) for label in labels)) if labels else 12
+        self.labels = [[""] * self.rows for _ in range(7)]
+        self.colors = [[""] * self.rows for _ in range(7)]
+        self._rasterize(event_sources)
+        self.line = "+" + "+".join(["-" * self.TIME_WIDTH] + ["-" * self.col_width] * 7) + "+"
+        self.header = "|" + "|".join(
+            [self.cell("Time", self.TIME_WIDTH)] + [self.cell(day, self.col_width) for day in self.DAYS]
+        ) + "|"
+        self.base_rows = [
+            self.render_row(row, [self.labels[day][row] for day in range(7)], [self.colors[day][row] for day in range(7)])
+            for row in range(self.first_row, self.last_row)
+        ]
+
+    def _rasterize(self, event_sources: list[tuple[ClassEvent, str, int]]) -> None:
+        # Each cell keeps a match count plus the highest-priority match; ties keep
+        # the first painted, matching max() over the per-cell candidate list.
+        counts = [[0] * self.rows for _ in range(7)]
+        best: list[list[tuple[int, str, str, bool] | None]] = [[None] * self.rows for _ in range(7)]
+        for ev, color, priority in event_sources:
+            day = ev.weekday
+            for t, label, is_start in event_slots(ev, self.slot_minutes):
+                if not 0 <= t < 24 * 60:
+                    continue
+                row = t // self.slot_minutes
+                counts[day][row] += 1
+                current = best[day][row]
+                if current is None or priority > current[0]:
+                    best[day][row] = (priority, label, color, is_start)
+        for day in range(7):
+            for row in range(self.first_row, self.last_row):
+                match = best[day][row]
+                if match is None:
+                    continue
+                _, label, color, is_start = match
+                if counts[day][row] > 1:
+                    label = (label + " +") if is_start else "|+"
+                self.labels[day][row] = label
+                self.colors[day][row] = color
+
+    @staticmethod
     def cell(text: str, width: int) -> str:
         return pad_to_width(text[:width], width)
 
-    def cell_hl(text: str, width: int, highlight: bool) -> str:
-        content = cell(text, width)
+    def cell_hl(self, text: str, width: int, highlight: bool) -> str:
+        content = self.cell(text, width)
         if not highlight:
             return content
         return f"{HILITE}{content}{HILITE_RESET}"
 
-    def cell_color(text: str, width: int, color: str) -> str:
-        content = cell(text, width)
+    def cell_color(self, text: str, width: int, color: str) -> str:
+        content = self.cell(text, width)
         if not color:
             return content
         return f"{FG_WHITE}{color}{content}{RESET}"
 
-    line = "+" + "+".join(["-" * time_width] + ["-" * col_width] * len(days)) + "+"
-    out: list[str] = [line]
-    out.append("|" + "|".join([cell("Time", time_width)] + [cell(day, col_width) for day in days]) + "|")
-    out.append(line)
-
-    for t in range(start_min, end_min, slot_minutes):
-        hh = t // 60
-        mm = t % 60
-        marker = "." if t == now_slot else " "
-        row = [f"{marker}{hh:02d}:{mm:02d}"]
-        row_colors: list[str] = []
-        for day_idx in range(7):
-            label = ""
-            color = ""
-            matches: list[tuple[int, str, str, bool, ClassEvent]] = []
-            for ev, default_color, priority in event_sources:
-                if ev.weekday != day_idx:
-                    continue
-                ev_start = ev.start.hour * 60 + ev.start.minute
-                ev_end = ev_start + int(ev.duration.total_seconds() // 60)
-                if ev.course == "Sleep" and ev.kind == "Rest":
-                    start_slot = floor_to_step(ev_start, slot_minutes)
-                    end_slot = ceil_to_step(ev_end, slot_minutes)
-                    last_slot = max(start_slot, end_slot - slot_minutes)
-                    if t == start_slot:
-                        matches.append((priority, "Sleep", default_color, True, ev))
-                    elif t == last_slot:
-                        matches.append((priority, "E", default_color, False, ev))
-                    elif start_slot < t < end_slot:
-                        matches.append((priority, "|", default_color, False, ev))
-                else:
-                    if t == ev_start:
-                        matches.append((priority, f"{ev.course} {ev.kind}", default_color, True, ev))
-                    if ev_start < t < ev_end:
-                        matches.append((priority, "|", default_color, False, ev))
-            if matches:
-                # Pick highest-priority event; mark overlaps.
-                priority, label, color, is_start, _ = max(matches, key=lambda x: x[0])
-                if len(matches) > 1:
-                    label = (label + " +") if is_start else "|+"
-            if (
-                sleep_marker_day is not None
-                and sleep_marker_slot is not None
-                and day_idx == sleep_marker_day
-                and t == sleep_marker_slot
-                and (not label or (label in ("Sleep", "|", "E") and color == SLEEP_EVENT_COLOR))
-            ):
-                label = sleep_marker_label
-                color = SLEEP_EVENT_COLOR
-            if day_idx == now.weekday() and t == now_slot and not label:
-                label = "."
-            row.append(label)
-            row_colors.append(color)
-        row_hl = t == now_slot
-        out.append(
-            "|"
-            + "|".join(
-                [cell_hl(row[0], time_width, row_hl)]
-                + [
-                    cell_hl(text, col_width, row_hl and day_idx == now.weekday())
-                    if row_hl and day_idx == now.weekday()
-                    else (cell_color(text, col_width, color) if text else cell(text, col_width))
-                    for day_idx, (text, color) in enumerate(zip(row[1:], row_colors))
-                ]
-            )
-            + "|"
-        )
-    out.append(line)
-    return "\n".join(out)
+    def render_row(self, row: int, labels: list[str], colors: list[str], today: int | None = None) -> str:
+        t = row * self.slot_minutes
+        marker = "." if today is not None else " "
+        row_hl = today is not None
+        cells = [self.cell_hl(f"{marker}{t // 60:02d}:{t % 60:02d}", self.TIME_WIDTH, row_hl)]
+        for day_idx, (text, color) in enumerate(zip(labels, colors)):
+            if row_hl and day_idx == today:
+                cells.append(self.cell_hl(text, self.col_width, True))
+            elif text:
+                cells.append(self.cell_color(text, self.col_width, color))
+            else:
+                cells.append(self.cell(text, self.col_width))
+        return "|" + "|".join(cells) + "|"
+
+# Bumped whenever the schedule lists or the travel matrix are replaced; the
+# grid, places and free-time caches key on it.
+SCHEDULE_VERSION = 0
+
+def schedule_changed() -> None:
+    global SCHEDULE_VERSION
+    SCHEDULE_VERSION += 1
+
+_weekly_grid: WeeklyGrid | None = None
+_weekly_grid_key: tuple = ()
+
+def weekly_sources_key() -> tuple:
+    return (
+        SCHEDULE_VERSION,
+        SLEEP_ENABLED, SLEEP_START, SLEEP_DURATION, SLEEP_EVENT_COLOR,
+        MORNING_ENABLED, MORNING_DURATION, MORNING_EVENT_COLOR,
+        PERSONAL_EVENT_COLOR, FOOD_EVENT_COLOR, CLASS_EVENT_COLOR,
+    )
+
+def visible_hours(event_sources: list[tuple[ClassEvent, str, int]]) -> tuple[int, int]:
+    # Whole hours around every event except sleep, which would always span
+    # the whole day; the full day when there is nothing else.
+    first, last = 24 * 60, 0
+    for ev, _, _ in event_sources:
+        if ev.course == "Sleep" and ev.kind == "Rest":
+            continue
+        start = ev.start.hour * 60 + ev.start.minute
+        first = min(first, start)
+        last = max(last, min(24 * 60, start + int(ev.duration.total_seconds() // 60)))
+    if first >= last:
+        return 0, 24
+    return first // 60, -(-last // 60)
+
+def weekly_grid(week_start: date, slot_minutes: int = 30, hours: tuple[int, int] | str = (0, 24)) -> WeeklyGrid:
+    global _weekly_grid, _weekly_grid_key
+    key = (weekly_sources_key(), week_start, slot_minutes, hours)
+    if _weekly_grid is None or _weekly_grid_key != key:
+        _weekly_grid = WeeklyGrid(weekly_event_sources(week_start), slot_minutes, hours)
+        _weekly_grid_key = key
+    return _weekly_grid
+
+def build_weekly_view(now: datetime) -> str:
+    grid = weekly_grid(now.date() - timedelta(days=now.weekday()), WEEKLY_SLOT_MINUTES, WEEKLY_HOURS)
+    slot_minutes = grid.slot_minutes
+    today = now.weekday()
+    now_row = (now.hour * 60 + now.minute) // slot_minutes
+    sleep_window = current_sleep_window(now)
+    marker: tuple[int, int, str] | None = None
+    if sleep_window:
+        _, sleep_end = sleep_window
+        left = real_delta(now, sleep_end)
+        if left > timedelta(0):
+            mid_dt = datetime.fromtimestamp(now.timestamp() + left.total_seconds() / 2, TZ)
+            marker = (mid_dt.weekday(), (mid_dt.hour * 60 + mid_dt.minute) // slot_minutes, f"|Wake in: {fmt_delta(left)}")
+
+    def overlay_row(row: int) -> str:
+        labels = [grid.labels[day][row] for day in range(7)]
+        colors = [grid.colors[day][row] for day in range(7)]
+        if marker is not None and marker[1] == row:
+            day = marker[0]
+            label = labels[day]
+            if not label or (label in ("Sleep", "|", "E") and colors[day] == SLEEP_EVENT_COLOR):
+                labels[day] = marker[2]
+                colors[day] = SLEEP_EVENT_COLOR
+        if row != now_row:
+            return grid.render_row(row, labels, colors)
+        if not labels[today]:
+            labels[today] = "."
+        return grid.render_row(row, labels, colors, today)
+
+    # Only the rows under the now line and the wake marker differ from the
+    # cached base rows; either may be outside the visible hours.
+    rows = list(grid.base_rows)
+    for row in {now_row, -1 if marker is None else marker[1]}:
+        if grid.first_row <= row < grid.last_row:
+            rows[row - grid.first_row] = overlay_row(row)
+    return "\n".join([grid.line, grid.header, grid.line, *rows, grid.line])
+
+# Bumped whenever DUE_ITEMS changes: a reload, add/remove_due_item, or a
+# caller editing the list in place and calling due_items_changed().
+DUE_VERSION = 0
+
+def due_items_changed() -> None:
+    global DUE_VERSION
+    DUE_VERSION += 1
+
+class DueStore:
+    # DUE_ITEMS kept sorted by (due date, insertion order) plus per-day
+    # buckets in list order, so the dashboard never re-sorts or rescans.
+    def __init__(self, items: list[DueItem]) -> None:
+        self.source = items
+        self.version = DUE_VERSION
+        self.seq = len(items)
+        order = sorted(range(len(items)), key=lambda i: items[i].due_date)
+        self.keys: list[tuple[datetime, int]] = [(items[i].due_date, i) for i in order]
+        self.entries: list[DueItem] = [items[i] for i in order]
+        self.days: dict[date, list[DueItem]] = {}
+        for item in items:
+            self.days.setdefault(item.due_date.date(), []).append(item)
+
+    def matches(self, items: list[DueItem]) -> bool:
+        return self.source is items and self.version == DUE_VERSION
+
+    def add(self, item: DueItem) -> None:
+        key = (item.due_date, self.seq)
+        self.seq += 1
+        i = bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        self.entries.insert(i, item)
+        self.days.setdefault(item.due_date.date(), []).append(item)
+        self.source.append(item)
+        due_items_changed()
+        self.version = DUE_VERSION
+
+    def remove(self, item: DueItem) -> None:
+        i = bisect_left(self.keys, (item.due_date, -1))
+        while i < len(self.entries) and self.entries[i] != item:
+            i += 1
+        if i == len(self.entries):
+            raise ValueError(f"{item!r} is not in the due store")
+        del self.keys[i]
+        del self.entries[i]
+        bucket = self.days[item.due_date.date()]
+        bucket.remove(item)
+        if not bucket:
+            del self.days[item.due_date.date()]
+        self.source.remove(item)
+        due_items_changed()
+        self.version = DUE_VERSION
+
+    def on_day(self, day: date) -> list[DueItem]:
+        return self.days.get(day, [])
+
+_due_store: DueStore | None = None
+
+def due_store() -> DueStore:
+    global _due_store
+    if _due_store is None or not _due_store.matches(DUE_ITEMS):
+        _due_store = DueStore(DUE_ITEMS)
+    return _due_store
+
+def add_due_item(item: DueItem) -> None:
+    due_store().add(item)
+
+def remove_due_item(item: DueItem) -> None:
+    due_store().remove(item)
 
 def build_due_view(now: datetime) -> str:
     week_start = now.date() - timedelta(days=now.weekday())
@@ -447,11 +1015,11 @@ def build_due_view(now: datetime) -> str:
     def day_label(d) -> str:
         return f"{d:%m/%d}"
 
-    due_map: dict[datetime.date, list[str]] = {}
-    for item in DUE_ITEMS:
-        d = item.due_date.date()
-        if week_start <= d <= (week_start + timedelta(days=13)):
-            due_map.setdefault(d, []).append(f"{item.title} ({item.kind})")
+    store = due_store()
+    due_map = {
+        d: [f"{item.title} ({item.kind})" for item in store.on_day(d)]
+        for d in (week_start + timedelta(days=i) for i in range(14))
+    }
 
     col_width = 18
     line = "+" + "+".join(["-" * col_width] * 7) + "+"
@@ -486,18 +1054,313 @@ def build_due_view(now: datetime) -> str:
     return "\n".join(out)
 
 def build_due_list(now: datetime) -> str:
-    if not DUE_ITEMS:
+    store = due_store()
+    if not store.entries:
         return "No due items."
-    items = sorted(DUE_ITEMS, key=lambda i: i.due_date)
     lines = ["All Tasks (days until due)"]
-    for item in items:
+    for item in store.entries:
         days_left = (item.due_date.date() - now.date()).days
         lines.append(f"{item.title} | {item.kind} | {days_left:+d}d | {item.due_date:%Y-%m-%d %I:%M %p}")
     return "\n".join(lines)
 
-def compute_departure_time(delta: timedelta) -> timedelta:
-    # Assuming you want to leave 20 minutes before class starts
-    return delta - timedelta(minutes=20)
+def semester_week_entries(week_start: date) -> list[list[tuple[int, int, str]]]:
+    # One week's events per day as (start minute, end minute, label), sorted
+    # by start then source order. Sleep stays one entry on the night it
+    # starts and the morning routine lands on the day of waking.
+    days: list[list[tuple[int, int, str]]] = [[] for _ in range(7)]
+    for events in (SCHEDULE, PERSONAL_SCHEDULE, FOOD_SCHEDULE):
+        for ev in week_occurrences(events, week_start):
+            start = ev.start.hour * 60 + ev.start.minute
+            room = f" ({ev.room})" if ev.room and ev.room != "N/A" else ""
+            days[ev.weekday].append((start, start + int(ev.duration.total_seconds() // 60), f"{ev.course} {ev.kind}{room}"))
+    if SLEEP_ENABLED:
+        start = SLEEP_START.hour * 60 + SLEEP_START.minute
+        sleep = int(SLEEP_DURATION.total_seconds() // 60)
+        morning = int(MORNING_DURATION.total_seconds() // 60)
+        for day in range(-1, 7):
+            if day >= 0:
+                days[day].append((start, start + sleep, "Sleep"))
+            wake_day, wake = divmod(start + sleep, 24 * 60)
+            if MORNING_ENABLED and 0 <= day + wake_day < 7:
+                days[day + wake_day].append((wake, wake + morning, "Morning Routine"))
+    for entries in days:
+        entries.sort(key=lambda e: e[0])
+    return days
+
+def semester_clock(minute: int) -> str:
+    day, minute = divmod(minute, 24 * 60)
+    return f"{minute // 60:02d}:{minute % 60:02d}" + (f"+{day}d" if day else "")
+
+def iter_semester_view(first_day: date, weeks: int) -> Iterator[str]:
+    # Line by line, a week at a time, so a long range starts printing at
+    # once and only one week's events are ever held.
+    week_start = first_day - timedelta(days=first_day.weekday())
+    store = due_store()
+    for w in range(weeks):
+        start = week_start + timedelta(days=7 * w)
+        yield f"=== Week {w + 1}/{weeks}: {start:%a %Y-%m-%d} - {start + timedelta(days=6):%a %Y-%m-%d} ==="
+        for offset, entries in enumerate(semester_week_entries(start)):
+            day = start + timedelta(days=offset)
+            yield f"{day:%a %m/%d}"
+            for item in store.on_day(day):
+                yield f"  {f'due {item.due_date:%H:%M}':<14} {item.title} ({item.kind})"
+            for begin, end, label in entries:
+                yield f"  {semester_clock(begin)}-{semester_clock(end):<8} {label}"
+        yield ""
+
+def write_lines(lines: Iterable[str], path: str = "-", pager: bool = True) -> None:
+    # Streams to a file, or to stdout through $PAGER (default less) when it
+    # is a terminal; quitting the pager early stops the generator.
+    import contextlib
+    import shlex
+    import subprocess
+
+    if path != "-":
+        with open(path, "w", encoding="utf-8") as fh:
+            for line in lines:
+                fh.write(line + "\n")
+        return
+    if not (pager and sys.stdout.isatty()):
+        try:
+            for line in lines:
+                sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # Let `| head` end the output quietly.
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return
+    command = shlex.split(os.environ.get("PAGER") or "less -R")
+    proc = subprocess.Popen(command, stdin=subprocess.PIPE, text=True, encoding="utf-8")
+    try:
+        for line in lines:
+            proc.stdin.write(line + "\n")
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
+    finally:
+        with contextlib.suppress(BrokenPipeError):
+            proc.stdin.close()
+        proc.wait()
+
+# Travel times between places, from an optional travel file next to the
+# schedule. Without one every class keeps the fixed DEPARTURE_LEAD.
+DEPARTURE_LEAD = timedelta(minutes=20)
+TRAVEL_FILE_ENV = "SCHEDULER_TRAVEL"
+TRAVEL_FILE_CANDIDATES = ("travel.toml", "travel.json")
+TRAVEL_CACHE_VERSION = 1
+UNKNOWN_ROOMS = frozenset({"", "N/A"})
+
+class TravelMatrix:
+    # All-pairs shortest travel minutes between places (buildings, rooms,
+    # "Home") by Floyd-Warshall over the file's routes, kept as one flat
+    # list so a lookup is two dict hits and an index. Rooms resolve to the
+    # longest place name they start with ("SITE 2061" -> "SITE"), or through
+    # an alias; unknown rooms fall back to the file's default lead.
+    def __init__(
+        self,
+        places: list[str],
+        dist: list[float],
+        aliases: dict[str, str],
+        home: str,
+        buffer: float,
+        default: float,
+    ) -> None:
+        self.places = places
+        self.index = {place: i for i, place in enumerate(places)}
+        self.dist = dist
+        self.aliases = aliases
+        self.home = home
+        self.buffer = buffer
+        self.default = default
+        self._resolved: dict[str, int | None] = {}
+
+    @classmethod
+    def from_routes(
+        cls,
+        routes: list[tuple[str, str, float, bool]],
+        aliases: dict[str, str],
+        home: str,
+        buffer: float,
+        default: float,
+    ) -> TravelMatrix:
+        places = sorted({home} | {a for a, _, _, _ in routes} | {b for _, b, _, _ in routes})
+        index = {place: i for i, place in enumerate(places)}
+        n = len(places)
+        inf = float("inf")
+        dist = [inf] * (n * n)
+        for i in range(n):
+            dist[i * n + i] = 0.0
+        for a, b, minutes, oneway in routes:
+            i, j = index[a], index[b]
+            dist[i * n + j] = min(dist[i * n + j], minutes)
+            if not oneway:
+                dist[j * n + i] = min(dist[j * n + i], minutes)
+        for k in range(n):
+            via = dist[k * n:(k + 1) * n]
+            for i in range(n):
+                dik = dist[i * n + k]
+                if dik == inf:
+                    continue
+                row = dist[i * n:(i + 1) * n]
+                dist[i * n:(i + 1) * n] = [d if d <= dik + dk else dik + dk for d, dk in zip(row, via)]
+        return cls(places, dist, aliases, home, buffer, default)
+
+    def resolve(self, room: str) -> int | None:
+        found = self._resolved.get(room, -1)
+        if found != -1:
+            return found
+        found = None
+        words = room.split()
+        while words:
+            name = " ".join(words)
+            name = self.aliases.get(name, name)
+            if name in self.index:
+                found = self.index[name]
+                break
+            words.pop()
+        self._resolved[room] = found
+        return found
+
+    def minutes(self, origin: str, room: str) -> float | None:
+        if origin in UNKNOWN_ROOMS or room in UNKNOWN_ROOMS:
+            return None
+        i, j = self.resolve(origin), self.resolve(room)
+        if i is None or j is None:
+            return None
+        d = self.dist[i * len(self.places) + j]
+        return None if d == float("inf") else d
+
+_travel: TravelMatrix | None = None
+_travel_loaded = False
+
+def default_travel_file() -> str | None:
+    path = os.environ.get(TRAVEL_FILE_ENV)
+    if path:
+        return path
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in TRAVEL_FILE_CANDIDATES:
+        candidate = os.path.join(here, name)
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+def parse_travel_file(path: str) -> tuple[list[tuple[str, str, float, bool]], dict[str, str], str, float, float]:
+    # home = "Home", buffer = 5, default = 20, [aliases] STE = "SITE", and
+    # [[routes]] from/to/minutes, both ways unless oneway = true.
+    with open(path, "rb") as fh:
+        raw = fh.read()
+    try:
+        if path.endswith(".toml"):
+            import tomllib
+
+            doc = tomllib.loads(raw.decode("utf-8"))
+        else:
+            import json
+
+            doc = json.loads(raw)
+    except ValueError as exc:
+        raise ScheduleFileError(f"{path}: {exc}") from None
+    if not isinstance(doc, dict):
+        raise ScheduleFileError(f"{path}: top level must be a table/object")
+    routes = []
+    for entry in doc.get("routes", []):
+        try:
+            minutes = float(entry["minutes"])
+            routes.append((str(entry["from"]).strip(), str(entry["to"]).strip(), minutes, bool(entry.get("oneway", False))))
+        except (KeyError, TypeError, ValueError):
+            raise ScheduleFileError(f"{path}: bad route {entry!r} (needs from, to, minutes)") from None
+        if minutes < 0:
+            raise ScheduleFileError(f"{path}: negative travel time in {entry!r}")
+    aliases = {str(k).strip(): str(v).strip() for k, v in doc.get("aliases", {}).items()}
+    try:
+        home = str(doc.get("home", "Home"))
+        buffer = float(doc.get("buffer", 0))
+        default = float(doc.get("default", DEPARTURE_LEAD.total_seconds() / 60))
+    except (TypeError, ValueError):
+        raise ScheduleFileError(f"{path}: home, buffer and default must be a name and minutes") from None
+    return routes, aliases, home, buffer, default
+
+def load_travel_file(path: str) -> TravelMatrix:
+    # The solved matrix goes in the parse cache, so Floyd-Warshall runs once
+    # per edit rather than once per start. Unreachable pairs are stored as
+    # null, since strict JSON has no infinity.
+    global _travel, _travel_loaded
+    st = os.stat(path)
+    stamp = (TRAVEL_CACHE_VERSION, st.st_mtime_ns, st.st_size)
+    source = os.path.abspath(path)
+    cached = read_parse_cache("travel", source, stamp)
+    matrix = None
+    if isinstance(cached, list) and len(cached) == 6:
+        places, dist, aliases, home, buffer, default = cached
+        matrix = TravelMatrix(places, [float("inf") if d is None else d for d in dist], aliases, home, buffer, default)
+    if matrix is None:
+        matrix = TravelMatrix.from_routes(*parse_travel_file(path))
+        dist = [None if d == float("inf") else d for d in matrix.dist]
+        write_parse_cache("travel", source, stamp, [matrix.places, dist, matrix.aliases, matrix.home, matrix.buffer, matrix.default])
+    _travel, _travel_loaded = matrix, True
+    schedule_changed()
+    return matrix
+
+def travel_matrix() -> TravelMatrix | None:
+    # Loaded on first use from default_travel_file(); a broken file is
+    # reported once and leaves the fixed lead in place.
+    global _travel_loaded
+    if not _travel_loaded:
+        _travel_loaded = True
+        path = default_travel_file()
+        if path:
+            try:
+                load_travel_file(path)
+            except (OSError, ScheduleFileError) as exc:
+                print(f"travel file ignored: {exc}", file=sys.stderr)
+    return _travel
+
+_places: dict[date, list[tuple[list[int], list[str]]]] = {}
+_places_key: tuple = ()
+
+def week_places(week_start: date) -> list[tuple[list[int], list[str]]]:
+    # Per day of one week: start minutes and rooms of every class, personal
+    # event and meal, in start order. Rooms that are not places stay in, so
+    # the previous event is always the real one.
+    global _places_key
+    key = weekly_sources_key()
+    if key != _places_key:
+        _places.clear()
+        _places_key = key
+    days = _places.get(week_start)
+    if days is None:
+        if len(_places) >= 8:
+            del _places[next(iter(_places))]
+        rows: list[list[tuple[int, str]]] = [[] for _ in range(7)]
+        for events in (SCHEDULE, PERSONAL_SCHEDULE, FOOD_SCHEDULE):
+            for ev in week_occurrences(events, week_start):
+                rows[ev.weekday].append((ev.start.hour * 60 + ev.start.minute, ev.room))
+        days = _places[week_start] = []
+        for day_rows in rows:
+            day_rows.sort(key=lambda row: row[0])
+            days.append(([start for start, _ in day_rows], [room for _, room in day_rows]))
+    return days
+
+def previous_place(occ: datetime, matrix: TravelMatrix) -> str:
+    # The room of the last event starting earlier that day, known place or
+    # not; home if there is none.
+    day = occ.date()
+    starts, rooms = week_places(day - timedelta(days=day.weekday()))[day.weekday()]
+    i = bisect_left(starts, occ.hour * 60 + occ.minute) - 1
+    return rooms[i] if i >= 0 else matrix.home
+
+def departure_lead(occ: datetime, ev: ClassEvent) -> timedelta:
+    # Travel time from the previous event's room to this class plus the
+    # file's buffer; the file's default when either room is not a place.
+    matrix = travel_matrix()
+    if matrix is None:
+        return DEPARTURE_LEAD
+    minutes = matrix.minutes(previous_place(occ, matrix), ev.room)
+    if minutes is None:
+        return timedelta(minutes=matrix.default)
+    return timedelta(minutes=minutes + matrix.buffer)
+
+def compute_departure_time(delta: timedelta, lead: timedelta = DEPARTURE_LEAD) -> timedelta:
+    return delta - lead
 
 def compute_lunch_time(delta: timedelta) -> timedelta:
     return delta - timedelta(minutes=45)
@@ -505,69 +1368,1469 @@ def compute_lunch_time(delta: timedelta) -> timedelta:
 def current_sleep_window(now: datetime) -> tuple[datetime, datetime] | None:
     if not SLEEP_ENABLED:
         return None
-    today_start = datetime.combine(now.date(), SLEEP_START, tzinfo=TZ)
-    start_dt = today_start
-    if now < today_start:
-        start_dt = today_start - timedelta(days=1)
-    end_dt = start_dt + SLEEP_DURATION
-    if not (start_dt <= now <= end_dt):
+    return week_table(now).sleep_at(now.timestamp())
+
+DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+SCHEDULE_FILE_ENV = "SCHEDULER_FILE"
+SCHEDULE_FILE_CANDIDATES = ("schedule.toml", "schedule.json", "schedule.ics")
+SCHEDULE_CACHE_VERSION = 4
+
+class ScheduleFileError(ValueError):
+    pass
+
+# Parsed files are cached as JSON in the user's own cache directory: never
+# next to the file (its directory may be writable by others) and never as
+# pickle, so a planted cache can at worst hold wrong data, not run code.
+def parse_cache_path(kind: str, source: str) -> str:
+    import hashlib
+
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    digest = hashlib.sha256(source.encode("utf-8", "surrogateescape")).hexdigest()[:20]
+    return os.path.join(base, "scheduler", f"{kind}-{digest}.json")
+
+def read_parse_cache(kind: str, source: str, stamp: tuple) -> Any:
+    # The cached data for `source` if it was written for this stamp, else None.
+    import json
+
+    try:
+        with open(parse_cache_path(kind, source), encoding="utf-8") as fh:
+            doc = json.load(fh)
+        if doc["source"] == source and doc["stamp"] == list(stamp):
+            return doc["data"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+def write_parse_cache(kind: str, source: str, stamp: tuple, data: Any) -> None:
+    import json
+
+    cache_path = parse_cache_path(kind, source)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), mode=0o700, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump({"source": source, "stamp": stamp, "data": data}, fh, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # an unwritable cache directory just means no cache
+
+
+def default_schedule_file() -> str | None:
+    path = os.environ.get(SCHEDULE_FILE_ENV)
+    if path:
+        return path
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in SCHEDULE_FILE_CANDIDATES:
+        candidate = os.path.join(here, name)
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+def parse_weekday(value: Any) -> int:
+    if isinstance(value, int) and 0 <= value < 7:
+        return value
+    if isinstance(value, str):
+        key = value.strip()[:3].title()
+        if key in DAY_NAMES:
+            return DAY_NAMES.index(key)
+    raise ScheduleFileError(f"bad weekday: {value!r}")
+
+def parse_clock(value: Any) -> time:
+    if isinstance(value, time):
+        return value
+    if isinstance(value, str):
+        try:
+            return time.fromisoformat(value.strip())
+        except ValueError:
+            pass
+    raise ScheduleFileError(f"bad start time: {value!r} (use HH:MM)")
+
+def parse_due(value: Any) -> datetime:
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.strip())
+        except ValueError:
+            raise ScheduleFileError(f"bad due date: {value!r}") from None
+    if not isinstance(value, datetime):
+        raise ScheduleFileError(f"bad due date: {value!r}")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=TZ)
+    return value
+
+def parse_date(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        try:
+            return date.fromisoformat(value.strip())
+        except ValueError:
+            pass
+    raise ScheduleFileError(f"bad date: {value!r} (use YYYY-MM-DD)")
+
+RECURRENCE_KEYS = ("term_start", "term_end", "every_weeks", "anchor", "skip", "extra", "overrides")
+
+def recurrence_row(entry: dict, start: time) -> tuple | None:
+    if not any(key in entry for key in RECURRENCE_KEYS):
         return None
-    return start_dt, end_dt
+    term_start = parse_date(entry["term_start"]) if "term_start" in entry else None
+    term_end = parse_date(entry["term_end"]) if "term_end" in entry else None
+    anchor = parse_date(entry["anchor"]) if "anchor" in entry else None
+    interval = int(entry.get("every_weeks", 1))
+    if interval < 1:
+        raise ScheduleFileError(f"every_weeks must be >= 1: {entry!r}")
+    if interval > 1 and anchor is None and term_start is None:
+        raise ScheduleFileError(f"every_weeks needs an anchor or term_start: {entry!r}")
+    skip: set[date] = set()
+    for item in entry.get("skip", []):
+        if isinstance(item, dict):
+            # {from, to} ranges cover reading week and multi-day breaks.
+            day, last = parse_date(item["from"]), parse_date(item["to"])
+            while day <= last:
+                skip.add(day)
+                day += timedelta(days=1)
+        else:
+            skip.add(parse_date(item))
+    extra = [parse_due(item) for item in entry.get("extra", [])]
+    for item in entry.get("overrides", []):
+        # Moves one occurrence: drop `date`, add it back on `on` at `start`.
+        moved_from = parse_date(item["date"])
+        skip.add(moved_from)
+        if not item.get("cancel", False):
+            moved_to = parse_date(item.get("on", moved_from))
+            extra.append(datetime.combine(moved_to, parse_clock(item.get("start", start)), tzinfo=TZ))
+    return (
+        None if term_start is None else term_start.isoformat(),
+        None if term_end is None else term_end.isoformat(),
+        interval,
+        None if anchor is None else anchor.isoformat(),
+        tuple(sorted(day.isoformat() for day in skip)),
+        tuple(sorted(dt.isoformat() for dt in extra)),
+    )
 
-def main() -> None:
+# Rows are plain tuples of strings and numbers so the parse cache can be JSON.
+def event_row(entry: dict) -> tuple:
     try:
-        last_phrase_key: tuple[str, str] | None = None
-        last_phrase_value = ""
-        while True:
-            now = datetime.now(TZ)
-            current = compute_current(now)
-            occ, ev, delta = compute_next(now)
-
-            clear_screen()
-            print(f"Now:        {now:%a %Y-%m-%d %I:%M:%S %p %Z}")
-            print(f"Next class: {ev.course} {ev.kind} ({ev.room}) @ {occ:%a %I:%M %p}")
-            print(f"Time left:  {fmt_delta(delta)} (HH:MM:SS)")
-            print(f"Departure:  {fmt_delta(compute_departure_time(delta))} (HH:MM:SS)")
-            print(f"Departure with Lunch: {fmt_delta(compute_lunch_time(compute_departure_time(delta)))} (HH:MM:SS)")
-            if SLEEP_ENABLED:
-                sleep_window = current_sleep_window(now)
-                if sleep_window:
-                    sleep_start, sleep_end = sleep_window
-                    print(f"Sleep ends at: {sleep_end:%a %I:%M %p}")
-                    print(f"Sleep ends in: {fmt_delta(sleep_end - now)} (HH:MM:SS)")
+        start = parse_clock(entry["start"])
+        return (
+            str(entry["course"]),
+            str(entry.get("kind", "")),
+            str(entry.get("room", "")),
+            parse_weekday(entry["weekday"]),
+            (start.hour, start.minute, start.second),
+            float(entry["duration"]) * 60,
+            str(entry.get("color", "")),
+            recurrence_row(entry, start),
+        )
+    except KeyError as exc:
+        raise ScheduleFileError(f"event is missing {exc.args[0]!r}: {entry!r}") from None
+    except (TypeError, ValueError) as exc:
+        raise ScheduleFileError(f"bad event {entry!r}: {exc}") from None
+
+def due_row(entry: dict) -> tuple:
+    try:
+        due = parse_due(entry["due"])
+        return (str(entry["title"]), str(entry.get("kind", "")), due.isoformat())
+    except KeyError as exc:
+        raise ScheduleFileError(f"due item is missing {exc.args[0]!r}: {entry!r}") from None
+    except TypeError as exc:
+        raise ScheduleFileError(f"bad due item {entry!r}: {exc}") from None
+
+def parse_ics_file(path: str) -> tuple[list[tuple], list[tuple], list[tuple], list[tuple]]:
+    import ical
+
+    lists: dict[str, list[tuple]] = {"schedule": [], "personal": [], "food": []}
+    due: list[tuple] = []
+    rows_by_uid: dict[str, list[tuple[list[tuple], int]]] = {}
+    skips: list[tuple[str, str]] = []
+    # One-off instances sharing a title, room, time and length (a meeting
+    # exported instance by instance) are collected into a single event whose
+    # dates are all extras, so the schedule grows per series, not per instance.
+    once: dict[tuple[str, tuple], list[tuple[str, str]]] = {}
+    with open(path, encoding="utf-8-sig", errors="replace", newline="") as fh:
+        try:
+            for kind, entry in ical.iter_entries(fh):
+                if kind == "due":
+                    due.append(due_row(entry))
+                elif kind == "skip":
+                    skips.append((entry["uid"], entry["date"]))
                 else:
-                    print("Not sleeping right now.")
-            print("")
-
-            if current:
-                start_dt, current_ev, remaining = current
-                stage = phrase_stage(start_dt, current_ev, now)
-                phrase_key = (f"{current_ev.course}-{current_ev.kind}", stage)
-                if phrase_key != last_phrase_key:
-                    last_phrase_value = random.choice(PHRASES[stage])
-                    last_phrase_key = phrase_key
-                end_dt = class_end(start_dt, current_ev)
-                box = make_box([
-                    "Current Class",
-                    f"課: {current_ev.course} {current_ev.kind}",
-                    f"室: {current_ev.room}",
-                    f"終: {end_dt:%I:%M %p}",
-                    f"残: {fmt_delta(remaining)}",
-                    f"狐: {last_phrase_value}",
-                ])
-                print(box)
+                    category = entry.get("category", "")
+                    if category in ("sleep", "morning"):
+                        continue  # rebuilt from SLEEP_* / MORNING_* settings
+                    name = category if category in lists else "schedule"
+                    if entry.get("term_start") == entry.get("term_end") and not any(
+                        key in entry for key in RECURRENCE_KEYS if key not in ("term_start", "term_end")
+                    ):
+                        row = event_row(entry)
+                        day = parse_date(entry["term_start"]).isoformat()
+                        once.setdefault((name, row[:3] + row[4:7]), []).append((day, entry.get("uid", "")))
+                        continue
+                    target = lists[name]
+                    if entry.get("uid"):
+                        rows_by_uid.setdefault(entry["uid"], []).append((target, len(target)))
+                    target.append(event_row(entry))
+        except ical.ICalError as exc:
+            raise ScheduleFileError(f"{path}: {exc}") from None
+    # Moved or cancelled instances arrive as separate components, possibly
+    # after their series, so their dates are folded in once the stream ends.
+    for uid, day in skips:
+        for target, i in rows_by_uid.get(uid, []):
+            row = target[i]
+            rule = row[7] or (None, None, 1, None, (), ())
+            target[i] = row[:7] + (rule[:4] + (tuple(sorted({*rule[4], day})),) + rule[5:],)
+    skipped = set(skips)
+    for (name, (course, kind, room, start, duration, color)), instances in once.items():
+        days = sorted({day for day, uid in instances if (uid, day) not in skipped})
+        if not days:
+            continue
+        first = date.fromisoformat(days[0])
+        if len(days) == 1:
+            rule = (days[0], days[0], 1, None, (), ())
+        else:
+            # The term ends before it starts, so every date is an extra.
+            extra = tuple(datetime.combine(date.fromisoformat(day), time(*start), tzinfo=TZ).isoformat() for day in days)
+            rule = (days[0], (first - timedelta(days=1)).isoformat(), 1, None, (), extra)
+        lists[name].append((course, kind, room, first.weekday(), start, duration, color, rule))
+    return lists["schedule"], lists["personal"], lists["food"], due
+
+def parse_schedule_file(path: str) -> tuple[list[tuple], list[tuple], list[tuple], list[tuple]]:
+    if path.endswith(".ics"):
+        return parse_ics_file(path)
+    with open(path, "rb") as fh:
+        raw = fh.read()
+    try:
+        if path.endswith(".toml"):
+            import tomllib
+
+            doc = tomllib.loads(raw.decode("utf-8"))
+        else:
+            import json
+
+            doc = json.loads(raw)
+    except ValueError as exc:
+        raise ScheduleFileError(f"{path}: {exc}") from None
+    if not isinstance(doc, dict):
+        raise ScheduleFileError(f"{path}: top level must be a table/object")
+    return (
+        [event_row(entry) for entry in doc.get("schedule", [])],
+        [event_row(entry) for entry in doc.get("personal", [])],
+        [event_row(entry) for entry in doc.get("food", [])],
+        [due_row(entry) for entry in doc.get("due", [])],
+    )
+
+def load_schedule_rows(path: str) -> tuple[list[tuple], list[tuple], list[tuple], list[tuple]]:
+    st = os.stat(path)
+    stamp = (SCHEDULE_CACHE_VERSION, st.st_mtime_ns, st.st_size)
+    source = os.path.abspath(path)
+    cached = read_parse_cache("schedule", source, stamp)
+    if isinstance(cached, list) and len(cached) == 4:
+        # JSON has no tuples, so the rows come back as lists.
+        def event(row: list) -> tuple:
+            course, kind, room, weekday, start, duration, color, rule = row
+            if rule is not None:
+                rule = (rule[0], rule[1], rule[2], rule[3], tuple(rule[4]), tuple(rule[5]))
+            return course, kind, room, weekday, tuple(start), duration, color, rule
+
+        schedule, personal, food, due = cached
+        return [event(row) for row in schedule], [event(row) for row in personal], [event(row) for row in food], [tuple(row) for row in due]
+    rows = parse_schedule_file(path)
+    write_parse_cache("schedule", source, stamp, rows)
+    return rows
+
+def apply_schedule_rows(rows: tuple[list[tuple], list[tuple], list[tuple], list[tuple]]) -> None:
+    global SCHEDULE, PERSONAL_SCHEDULE, FOOD_SCHEDULE, DUE_ITEMS
+
+    def make_recurrence(term_start, term_end, interval, anchor, skip, extra) -> Recurrence:
+        return Recurrence(
+            None if term_start is None else date.fromisoformat(term_start),
+            None if term_end is None else date.fromisoformat(term_end),
+            interval,
+            None if anchor is None else date.fromisoformat(anchor),
+            frozenset(date.fromisoformat(day) for day in skip),
+            tuple(datetime.fromisoformat(dt).astimezone(TZ) for dt in extra),
+        )
+
+    rules: dict[tuple, Recurrence] = {}
+
+    def recurrence(row: tuple | None) -> Recurrence | None:
+        if row is None:
+            return None
+        # Whole sections usually share one term, so share the objects too.
+        rule = rules.get(row)
+        if rule is None:
+            rule = rules[row] = make_recurrence(*row)
+        return rule
+
+    def events(event_rows: list[tuple]) -> EventTable:
+        table = EventTable()
+        for course, kind, room, weekday, start, duration, color, rule in event_rows:
+            table.append(course, kind, room, weekday, clock_seconds(time(*start)), duration, color, recurrence(rule))
+        return table
+
+    schedule_rows, personal_rows, food_rows, due_rows = rows
+    SCHEDULE = events(schedule_rows)
+    PERSONAL_SCHEDULE = events(personal_rows)
+    FOOD_SCHEDULE = events(food_rows)
+    schedule_changed()
+    DUE_ITEMS = [DueItem(title, kind, datetime.fromisoformat(due).astimezone(TZ)) for title, kind, due in due_rows]
+    due_items_changed()
+
+def load_schedule_file(path: str) -> None:
+    apply_schedule_rows(load_schedule_rows(path))
+
+def dump_schedule_file(path: str) -> None:
+    import json
+
+    def event_entry(ev: ClassEvent) -> dict:
+        minutes = ev.duration.total_seconds() / 60
+        entry = {
+            "course": ev.course,
+            "kind": ev.kind,
+            "room": ev.room,
+            "weekday": DAY_NAMES[ev.weekday],
+            "start": ev.start.isoformat(timespec="minutes"),
+            "duration": minutes if not minutes.is_integer() else int(minutes),
+        }
+        if ev.color:
+            entry["color"] = ev.color
+        rule = ev.recurrence
+        if rule is not None:
+            if rule.term_start is not None:
+                entry["term_start"] = rule.term_start.isoformat()
+            if rule.term_end is not None:
+                entry["term_end"] = rule.term_end.isoformat()
+            if rule.interval != 1:
+                entry["every_weeks"] = rule.interval
+            if rule.anchor is not None:
+                entry["anchor"] = rule.anchor.isoformat()
+            if rule.skip:
+                entry["skip"] = sorted(day.isoformat() for day in rule.skip)
+            if rule.extra:
+                entry["extra"] = [dt.isoformat() for dt in rule.extra]
+        return entry
+
+    doc = {
+        "schedule": [event_entry(ev) for ev in SCHEDULE],
+        "personal": [event_entry(ev) for ev in PERSONAL_SCHEDULE],
+        "food": [event_entry(ev) for ev in FOOD_SCHEDULE],
+        "due": [
+            {"title": item.title, "kind": item.kind, "due": item.due_date.isoformat()}
+            for item in DUE_ITEMS
+        ],
+    }
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(doc, fh, indent=2, ensure_ascii=False)
+        fh.write("\n")
+
+def export_ics(path: str, now: datetime) -> None:
+    import contextlib
+    import ical
+
+    week_start = now.date() - timedelta(days=now.weekday())
+    sources = [
+        ("class", SCHEDULE),
+        ("personal", PERSONAL_SCHEDULE),
+        ("food", FOOD_SCHEDULE),
+        ("sleep", build_sleep_events()),
+        ("morning", build_morning_events()),
+    ]
+    if path == "-":
+        target = contextlib.nullcontext(sys.stdout)
+    else:
+        target = open(path, "w", encoding="utf-8", newline="")
+    with target as fh:
+        writer = ical.CalendarWriter(fh, tzid=TZ.key)
+        for category, events in sources:
+            for ev in events:
+                rule = ev.recurrence
+                # Recurring events export their whole term; plain weekly ones
+                # start in the current week.
+                first_day = next_regular_date(ev, (rule.term_start or rule.anchor or week_start) if rule else week_start)
+                if first_day is not None:
+                    writer.event(ev, first_day, category)
+                elif rule is not None:
+                    # Only extra dates (grouped one-offs): one event each.
+                    for extra in rule.extra:
+                        writer.event(dataclasses.replace(ev, start=extra.time()), extra.date(), category, once=True)
+        for item in DUE_ITEMS:
+            writer.todo(item)
+        writer.close()
+
+class ScheduleFileWatcher:
+    # One stat() per poll; the file is only re-read when mtime or size moves.
+    what = "Schedule"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.stamp: tuple[int, int] | None = None
+        self.error = ""
+
+    def load(self) -> None:
+        load_schedule_file(self.path)
+
+    def poll(self) -> bool:
+        try:
+            st = os.stat(self.path)
+        except OSError as exc:
+            self.error = f"{self.what} file unavailable: {exc}"
+            return False
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp == self.stamp:
+            return False
+        self.stamp = stamp
+        try:
+            self.load()
+        except (OSError, ScheduleFileError) as exc:
+            self.error = f"{self.what} reload failed: {exc}"
+            return False
+        self.error = ""
+        return True
+
+class TravelFileWatcher(ScheduleFileWatcher):
+    # A failed reload keeps the last good matrix.
+    what = "Travel"
+
+    def load(self) -> None:
+        load_travel_file(self.path)
+
+def watch_travel_file(path: str | None) -> TravelFileWatcher | None:
+    # Loads `path` now and stops travel_matrix() looking for a default one;
+    # None when there is no travel file.
+    global _travel_loaded
+    _travel_loaded = True
+    if not path:
+        return None
+    watcher = TravelFileWatcher(path)
+    watcher.poll()
+    return watcher
+
+WEEK_MINUTES = 7 * 24 * 60
+
+@dataclass(frozen=True)
+class Conflict:
+    first: ClassEvent
+    first_source: str
+    second: ClassEvent
+    second_source: str
+    start: int  # minute of the week (Mon 00:00 = 0) where the overlap begins
+    minutes: int
+
+    def describe(self) -> str:
+        day, minute = divmod(self.start % WEEK_MINUTES, 24 * 60)
+        return (
+            f"{DAY_NAMES[day]} {minute // 60:02d}:{minute % 60:02d}  {self.minutes:4d} min  "
+            f"{f'{self.first.course} {self.first.kind}'.strip()} ({self.first_source})"
+            f" x {f'{self.second.course} {self.second.kind}'.strip()} ({self.second_source})"
+        )
+
+def conflict_intervals(week_start: date) -> list[tuple[int, int, int, ClassEvent, str, bool]]:
+    sources = [
+        ("class", week_occurrences(SCHEDULE, week_start)),
+        ("personal", week_occurrences(PERSONAL_SCHEDULE, week_start)),
+        ("food", week_occurrences(FOOD_SCHEDULE, week_start)),
+    ]
+    # build_sleep_events/build_morning_events split blocks at midnight for the
+    # grid; here each night stays one event so it is reported once.
+    if SLEEP_ENABLED:
+        sleep_events = [ClassEvent("Sleep", "Rest", "Home", day, SLEEP_START, SLEEP_DURATION, SLEEP_EVENT_COLOR) for day in range(7)]
+        sources.append(("sleep", sleep_events))
+        if MORNING_ENABLED:
+            wake = [datetime.combine(week_start + timedelta(days=ev.weekday), ev.start) + ev.duration for ev in sleep_events]
+            sources.append(("morning", [
+                ClassEvent("Morning", "Routine", "Home", dt.weekday(), dt.time(), MORNING_DURATION, MORNING_EVENT_COLOR)
+                for dt in wake
+            ]))
+    # The last field marks the Monday-morning tail of a wrapped event.
+    intervals: list[tuple[int, int, int, ClassEvent, str, bool]] = []
+    for source, events in sources:
+        for ev in events:
+            ident = len(intervals)
+            start = ev.weekday * 24 * 60 + ev.start.hour * 60 + ev.start.minute
+            end = start + int(ev.duration.total_seconds() // 60)
+            # Sunday-night events spill into Monday morning of the same weekly cycle.
+            if end > WEEK_MINUTES:
+                intervals.append((start, WEEK_MINUTES, ident, ev, source, False))
+                intervals.append((0, end - WEEK_MINUTES, ident, ev, source, True))
+            else:
+                intervals.append((start, end, ident, ev, source, False))
+    return intervals
+
+def find_conflicts(week_start: date) -> list[Conflict]:
+    # Sweep over start points with a heap of running events keyed by end, so
+    # the cost is O(n log n) plus the number of overlapping pairs.
+    intervals = sorted(conflict_intervals(week_start), key=lambda x: (x[0], x[2]))
+    running: list[tuple[int, int, int, ClassEvent, str, bool]] = []
+    pairs: dict[tuple[int, int], list] = {}
+    for start, end, ident, ev, source, tail in intervals:
+        while running and running[0][0] <= start:
+            heapq.heappop(running)
+        if end <= start:
+            continue
+        for other_end, _, other_ident, other_ev, other_source, other_tail in running:
+            if other_ident == ident:
+                continue
+            overlap = min(end, other_end) - start
+            key = (min(ident, other_ident), max(ident, other_ident))
+            entry = pairs.get(key)
+            if entry is None:
+                first, second = ((other_ev, other_source), (ev, source)) if other_ident < ident else ((ev, source), (other_ev, other_source))
+                pairs[key] = [first, second, start, overlap, tail or other_tail]
+            else:
+                # A pair can overlap on both sides of the week boundary; the
+                # overlap begins on the Sunday side, not in the Monday tail.
+                if entry[4]:
+                    entry[2], entry[4] = start, tail or other_tail
+                entry[3] += overlap
+        heapq.heappush(running, (end, start, ident, ev, source, tail))
+    conflicts = [
+        Conflict(first[0], first[1], second[0], second[1], start, minutes)
+        for first, second, start, minutes, _ in pairs.values()
+    ]
+    conflicts.sort(key=lambda c: (c.start, -c.minutes))
+    return conflicts
+
+def conflict_report(conflicts: list[Conflict]) -> str:
+    if not conflicts:
+        return "No conflicts."
+    lines = [f"{len(conflicts)} conflict(s), {sum(c.minutes for c in conflicts)} min overlapping"]
+    lines += [c.describe() for c in conflicts]
+    return "\n".join(lines)
+
+def busy_intervals(week_start: date) -> list[tuple[int, int]]:
+    # Everything that takes up time in one local week, as epoch-second
+    # intervals clipped to it. Last week's occurrences are included for what
+    # spills past Monday midnight, like Sunday night's sleep.
+    lo = local_epoch(week_start, time(0))
+    hi = local_epoch(week_start + timedelta(days=7), time(0))
+    out: list[tuple[int, int]] = []
+
+    def add(start: int, end: int) -> None:
+        if end > lo and start < hi:
+            out.append((max(start, lo), min(end, hi)))
+
+    for events in (SCHEDULE, PERSONAL_SCHEDULE, FOOD_SCHEDULE):
+        for first in (week_start - timedelta(days=7), week_start):
+            for ev in week_occurrences(events, first):
+                start = local_epoch(first + timedelta(days=ev.weekday), ev.start)
+                add(start, start + int(ev.duration.total_seconds()))
+    if SLEEP_ENABLED:
+        for d in range(-1, 7):
+            start_dt = datetime.combine(week_start + timedelta(days=d), SLEEP_START, tzinfo=TZ)
+            wake = int((start_dt + SLEEP_DURATION).timestamp())  # wakes at a wall-clock time
+            add(int(start_dt.timestamp()), wake)
+            if MORNING_ENABLED:
+                add(wake, wake + int(MORNING_DURATION.total_seconds()))
+    return out
+
+FREE_SLOT_SECONDS = 60
+
+class FreeTime:
+    # One week's busy time on a minute grid (times in the schedule are whole
+    # minutes; anything finer is rounded outwards to busy). A segment tree
+    # over the minutes keeps, per node, how many busy intervals cover all of
+    # it and its free prefix, suffix and longest free run, so adding or
+    # removing an interval and every search below are O(log n).
+    def __init__(self, week_start: date, busy: list[tuple[int, int]]) -> None:
+        self.lo = local_epoch(week_start, time(0))
+        self.hi = local_epoch(week_start + timedelta(days=7), time(0))
+        self.n = (self.hi - self.lo) // FREE_SLOT_SECONDS
+        size = 1
+        while size < self.n:
+            size *= 2
+        self.size = size
+        # Leaves past the end of the week are permanently busy.
+        self.cover = array("i", [0] * size + [0] * self.n + [1] * (size - self.n))
+        self.pref = array("i", [0] * (2 * size))
+        self.suf = array("i", [0] * (2 * size))
+        self.best = array("i", [0] * (2 * size))
+        # Level by level: nodes inside the week start all free, nodes past it
+        # all busy, and only the one straddling the end needs combining.
+        first, width = size, 1
+        while first:
+            full = self.n // width
+            for values in (self.pref, self.suf, self.best):
+                values[first:first + full] = array("i", [width] * full)
+            if full < first and full * width < self.n:
+                self._pull(first + full, width)
+            first, width = first // 2, width * 2
+        self.busy: Counter[tuple[int, int]] = Counter()
+        for start, end in busy:
+            self.add(start, end)
+
+    def _pull(self, node: int, width: int) -> None:
+        if self.cover[node]:
+            self.pref[node] = self.suf[node] = self.best[node] = 0
+        elif width == 1:
+            self.pref[node] = self.suf[node] = self.best[node] = 1
+        else:
+            half = width // 2
+            left, right = 2 * node, 2 * node + 1
+            pref, suf = self.pref, self.suf
+            pref[node] = pref[left] if pref[left] < half else half + pref[right]
+            suf[node] = suf[right] if suf[right] < half else half + suf[left]
+            self.best[node] = max(self.best[left], self.best[right], suf[left] + pref[right])
+
+    def _update(self, node: int, l: int, r: int, a: int, b: int, delta: int) -> None:
+        if b <= l or r <= a:
+            return
+        if a <= l and r <= b:
+            self.cover[node] += delta
+        else:
+            mid = (l + r) // 2
+            self._update(2 * node, l, mid, a, b, delta)
+            self._update(2 * node + 1, mid, r, a, b, delta)
+        self._pull(node, r - l)
+
+    def add(self, start: int, end: int, count: int = 1) -> None:
+        # Marks [start, end) busy `count` more times; a negative count takes
+        # back earlier adds of the same interval.
+        a = max(0, (start - self.lo) // FREE_SLOT_SECONDS)
+        b = min(self.n, -(-(end - self.lo) // FREE_SLOT_SECONDS))
+        if a < b:
+            self._update(1, 0, self.size, a, b, count)
+        self.busy[(start, end)] += count
+        if self.busy[(start, end)] <= 0:
+            del self.busy[(start, end)]
+
+    def update(self, busy: list[tuple[int, int]]) -> None:
+        # Brings the tree to `busy` by applying only what changed.
+        wanted = Counter(busy)
+        for interval, count in (self.busy - wanted).items():
+            self.add(*interval, -count)
+        for interval, count in (wanted - self.busy).items():
+            self.add(*interval, count)
+
+    def _next(self, node: int, l: int, r: int, i: int, free: bool) -> int:
+        # Leftmost slot >= i in this node that is free (or busy), or -1.
+        if r <= i:
+            return -1
+        if self.cover[node]:
+            return -1 if free else max(l, i)
+        if (self.best[node] == 0) if free else (self.best[node] == r - l):
+            return -1
+        if r - l == 1:
+            return l
+        mid = (l + r) // 2
+        found = self._next(2 * node, l, mid, i, free)
+        return found if found >= 0 else self._next(2 * node + 1, mid, r, i, free)
+
+    def _prev_busy(self, node: int, l: int, r: int, i: int) -> int:
+        # Rightmost busy slot < i in this node, or -1.
+        if l >= i or (not self.cover[node] and self.best[node] == r - l):
+            return -1
+        if self.cover[node] or r - l == 1:
+            return min(r, i) - 1
+        mid = (l + r) // 2
+        found = self._prev_busy(2 * node + 1, mid, r, i)
+        return found if found >= 0 else self._prev_busy(2 * node, l, mid, i)
+
+    def _first_run(self, node: int, l: int, r: int, j: int, k: int, carry: int) -> tuple[int, int]:
+        # Leftmost slot p >= j starting k free slots, with `carry` free slots
+        # running up to l; returns (p or -1, free slots running up to r).
+        if r <= j or self.cover[node]:
+            return -1, 0
+        width = r - l
+        if l >= j:
+            if carry + self.pref[node] >= k:
+                return l - carry, 0
+            if self.best[node] < k:
+                return -1, carry + width if self.pref[node] == width else self.suf[node]
+        mid = (l + r) // 2
+        found, carry = self._first_run(2 * node, l, mid, j, k, carry)
+        if found >= 0:
+            return found, 0
+        return self._first_run(2 * node + 1, mid, r, j, k, carry)
+
+    def slot(self, t: float) -> int:
+        return max(0, min(self.n, int((t - self.lo) // FREE_SLOT_SECONDS)))
+
+    def at(self, i: int) -> int:
+        return self.lo + i * FREE_SLOT_SECONDS
+
+    def next_free(self, i: int) -> int:
+        found = self._next(1, 0, self.size, i, True)
+        return self.n if found < 0 else min(found, self.n)
+
+    def next_busy(self, i: int) -> int:
+        found = self._next(1, 0, self.size, i, False)
+        return self.n if found < 0 else min(found, self.n)
+
+    def run_end(self, t: float) -> int | None:
+        # Where the free stretch holding t ends, or None when t is busy.
+        i = self.slot(t)
+        if i >= self.n or self.next_free(i) != i:
+            return None
+        return self.at(self.next_busy(i))
+
+    def tail_start(self) -> int | None:
+        # Where the free stretch reaching the end of the week starts.
+        if self.run_end(self.at(self.n - 1)) is None:
+            return None
+        return self.at(self._prev_busy(1, 0, self.size, self.n) + 1)
+
+    def first_window(self, t: float, need: int) -> tuple[float, int] | None:
+        # The first stretch from t on free for `need` seconds: the rest of
+        # the one holding t, else the leftmost long enough run after it.
+        i = self.slot(t)
+        if i >= self.n:
+            return None
+        end = self.run_end(t)
+        if end is not None and end - t >= need:
+            return t, end
+        k = max(1, -(-need // FREE_SLOT_SECONDS))
+        p = self._first_run(1, 0, self.size, self.next_busy(i), k, 0)[0]
+        if p < 0 or p >= self.n:
+            return None
+        return self.at(p), self.at(self.next_busy(p))
+
+    def windows(self, start: float, end: float) -> Iterator[tuple[float, float]]:
+        i = self.slot(start)
+        while True:
+            i = self.next_free(i)
+            if i >= self.n or self.at(i) >= end:
+                return
+            j = self.next_busy(i)
+            yield max(self.at(i), start), min(self.at(j), end)
+            i = j
+
+_free_times: dict[date, FreeTime] = {}
+_free_times_key: tuple = ()
+
+def free_time(week_start: date) -> FreeTime:
+    global _free_times_key
+    key = weekly_sources_key()
+    if key != _free_times_key:
+        # Cached weeks take only the difference in their busy intervals.
+        for cached_week, table in _free_times.items():
+            table.update(busy_intervals(cached_week))
+        _free_times_key = key
+    table = _free_times.get(week_start)
+    if table is None:
+        if len(_free_times) >= 8:
+            del _free_times[next(iter(_free_times))]
+        table = _free_times[week_start] = FreeTime(week_start, busy_intervals(week_start))
+    return table
+
+def next_free_window(now: datetime, minutes: float, weeks: int = 8) -> tuple[datetime, datetime] | None:
+    # The first stretch from `now` on that is free for at least `minutes`,
+    # with where it ends. Stretches running across Monday midnight are
+    # joined, and the search gives up after `weeks` weeks.
+    need = int(minutes * 60)
+    t = now.timestamp()
+    week_start = now.date() - timedelta(days=now.weekday())
+    carry: float | None = None  # start of a stretch running on from last week
+    for _ in range(weeks):
+        table = free_time(week_start)
+        week_start += timedelta(days=7)
+        head = table.run_end(table.lo)
+        if carry is not None and head is not None and head - carry >= need:
+            found: tuple[float, int] | None = (carry, head)
+        else:
+            found = table.first_window(max(t, table.lo), need)
+        if found is None:
+            tail = table.tail_start()
+            if tail is None:
+                carry = None
+            elif tail != table.lo or carry is None:
+                carry = max(tail, t)
+            continue
+        start, end = found
+        for _ in range(weeks):
+            if end != table.hi:
+                break
+            table = free_time(week_start)
+            week_start += timedelta(days=7)
+            head = table.run_end(table.lo)
+            if head is None:
+                break
+            end = head
+        return datetime.fromtimestamp(start, TZ), datetime.fromtimestamp(end, TZ)
+    return None
+
+def free_windows(start: datetime, end: datetime, minutes: float = 0) -> list[tuple[datetime, datetime]]:
+    # Every free window in [start, end) at least `minutes` long, clipped to
+    # the range; gaps running across Monday midnight are joined.
+    lo, hi = start.timestamp(), end.timestamp()
+    merged: list[list[float]] = []
+    week_start = start.date() - timedelta(days=start.weekday())
+    while True:
+        table = free_time(week_start)
+        if table.lo >= hi:
+            break
+        for s, e in table.windows(lo, hi):
+            if merged and merged[-1][1] == s:
+                merged[-1][1] = e
+            else:
+                merged.append([s, e])
+        week_start += timedelta(days=7)
+    return [
+        (datetime.fromtimestamp(s, TZ), datetime.fromtimestamp(e, TZ))
+        for s, e in merged
+        if e - s >= minutes * 60
+    ]
+
+def next_second(now: datetime) -> datetime:
+    return datetime.fromtimestamp(int(now.timestamp()) + 1, TZ)
+
+def next_slot_boundary(now: datetime, slot_minutes: int = 30) -> datetime:
+    minutes = floor_to_step(now.hour * 60 + now.minute, slot_minutes) + slot_minutes
+    if minutes >= 24 * 60:
+        return next_midnight(now)
+    # Slots are wall-clock rows; a boundary skipped by spring-forward lands
+    # just after the gap.
+    return datetime.fromtimestamp(local_epoch(now.date(), time(minutes // 60, minutes % 60)), TZ)
+
+def next_midnight(now: datetime) -> datetime:
+    return datetime.combine(now.date() + timedelta(days=1), time(0), tzinfo=TZ)
+
+def next_sleep_start(now: datetime) -> datetime | None:
+    if not SLEEP_ENABLED:
+        return None
+    start_dt = datetime.combine(now.date(), SLEEP_START, tzinfo=TZ)
+    if start_dt.timestamp() <= now.timestamp():
+        start_dt = datetime.combine(now.date() + timedelta(days=1), SLEEP_START, tzinfo=TZ)
+    return start_dt
+
+def event_json(ev: ClassEvent) -> dict:
+    return {"course": ev.course, "kind": ev.kind, "room": ev.room}
+
+def due_snapshot(now: datetime) -> list[dict]:
+    return [
+        {
+            "title": item.title,
+            "kind": item.kind,
+            "due": item.due_date.isoformat(),
+            "days_left": (item.due_date.date() - now.date()).days,
+        }
+        for item in due_store().entries
+    ]
+
+def status_snapshot(now: datetime, due: list[dict] | None = None) -> dict:
+    # Everything the dashboard header shows, as JSON-ready data. Callers that
+    # snapshot every second can pass `due` cached until midnight.
+    snapshot: dict[str, Any] = {"now": now.isoformat(timespec="seconds"), "next": None, "current": None, "sleep": None}
+    try:
+        occ, ev, delta = compute_next(now)
+    except ValueError:
+        pass
+    else:
+        departure = compute_departure_time(delta, departure_lead(occ, ev))
+        snapshot["next"] = {
+            **event_json(ev),
+            "start": occ.isoformat(),
+            "starts_in": int(delta.total_seconds()),
+            "departure_in": int(departure.total_seconds()),
+            "departure_with_lunch_in": int(compute_lunch_time(departure).total_seconds()),
+        }
+    current = compute_current(now)
+    if current is not None:
+        start_dt, ev, remaining = current
+        snapshot["current"] = {
+            **event_json(ev),
+            "start": start_dt.isoformat(),
+            "end": class_end(start_dt, ev).isoformat(),
+            "remaining": int(remaining.total_seconds()),
+        }
+    sleep_window = current_sleep_window(now)
+    if sleep_window:
+        snapshot["sleep"] = {
+            "start": sleep_window[0].isoformat(),
+            "end": sleep_window[1].isoformat(),
+            "ends_in": int(real_delta(now, sleep_window[1]).total_seconds()),
+        }
+    snapshot["due"] = due_snapshot(now) if due is None else due
+    return snapshot
+
+def status_transitions(now: datetime) -> tuple[float, list[tuple[float, tuple[float, float, str] | None, tuple[float, str] | None]]]:
+    # The next and current class only change at week-table boundaries, so the
+    # rest of the week is a short list of segments: (from, next, current) with
+    # next = (start, departure, label) and current = (end, label), all in
+    # epoch seconds. Valid until the table's week ends.
+    table = week_table(now)
+    t = now.timestamp()
+    # Segment bounds already include every start, end and midnight.
+    points = [t] + table.bounds[bisect_right(table.bounds, t):]
+    segments: list[tuple[float, tuple[float, float, str] | None, tuple[float, str] | None]] = []
+    for p in points:
+        at = datetime.fromtimestamp(p, TZ)
+        upcoming = None
+        try:
+            occ, ev, delta = compute_next(at)
+        except ValueError:
+            pass
+        else:
+            departure = compute_departure_time(delta, departure_lead(occ, ev))
+            upcoming = (occ.timestamp(), p + departure.total_seconds(), f"{ev.course} {ev.kind} @ {occ:%a %I:%M %p}")
+        current = compute_current(at)
+        if current is not None:
+            start_dt, ev, remaining = current
+            current = (p + remaining.total_seconds(), f"{ev.course} {ev.kind}")
+        if not segments or segments[-1][1:] != (upcoming, current):
+            segments.append((p, upcoming, current))
+    return table.hi, segments
+
+class SectionCache:
+    # Each section keeps its value until its own deadline passes or the data
+    # it was built from changes (tracked by a cheap key). Deadlines compare as
+    # epoch seconds so the repeated hour at fall-back cannot hold one back.
+    def __init__(self) -> None:
+        self.entries: dict[str, tuple[Any, float, datetime, Any]] = {}
+
+    def get(self, name: str, now: datetime, key: Any, build: Callable[[datetime], tuple[Any, datetime]]) -> Any:
+        entry = self.entries.get(name)
+        if entry is None or entry[0] != key or now.timestamp() >= entry[1]:
+            value, deadline = build(now)
+            entry = (key, deadline.timestamp(), deadline, value)
+            self.entries[name] = entry
+        return entry[3]
+
+    def next_deadline(self) -> datetime | None:
+        if not self.entries:
+            return None
+        return min(self.entries.values(), key=lambda entry: entry[1])[2]
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+PROFILE_WINDOW = 600  # frames, about ten minutes of one-second ticks
+PROFILE_SECTIONS = ("poll", "next", "current", "weekly", "due_view", "due_list", "frame", "write", "drift")
+# Histogram bucket upper bounds in milliseconds.
+PROFILE_BUCKETS = (0.01, 0.1, 0.5, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000, float("inf"))
+
+class Profiler:
+    # Rolling per-section timings over the last PROFILE_WINDOW frames, plus
+    # how late each frame ran against the wakeup it asked for.
+    def __init__(self, window: int = PROFILE_WINDOW) -> None:
+        self.samples: dict[str, deque[float]] = {name: deque(maxlen=window) for name in PROFILE_SECTIONS}
+        self.frames = 0
+        self.skipped = 0
+        self.last_second: int | None = None
+
+    def record(self, name: str, seconds: float) -> None:
+        self.samples[name].append(seconds * 1000)
+
+    def tick(self, now: datetime, intended: datetime | None) -> None:
+        self.frames += 1
+        if intended is not None:
+            self.record("drift", max(0.0, real_delta(intended, now).total_seconds()))
+        # The header shows whole seconds; a gap means a second never appeared.
+        second = int(now.timestamp())
+        if self.last_second is not None and second > self.last_second + 1:
+            self.skipped += second - self.last_second - 1
+        self.last_second = second
+
+    def stats(self, name: str) -> tuple[float, float, float] | None:
+        samples = sorted(self.samples[name])
+        if not samples:
+            return None
+        return samples[len(samples) // 2], samples[min(len(samples) - 1, len(samples) * 99 // 100)], samples[-1]
+
+    def footer(self) -> list[str]:
+        cells = []
+        for name in PROFILE_SECTIONS:
+            stats = self.stats(name)
+            if stats is not None:
+                cells.append(f"{name} {stats[0]:.2f}/{stats[1]:.2f}")
+        lines = [f"Profile p50/p99 ms over {len(self.samples['frame'])} frames, {self.skipped} skipped seconds"]
+        for i in range(0, len(cells), 4):
+            lines.append("  " + "  ".join(cells[i:i + 4]))
+        return lines
+
+    def report(self) -> str:
+        lines = [f"Profile: {self.frames} frames, {self.skipped} skipped seconds (last {len(self.samples['frame'])} frames below)"]
+        for name in PROFILE_SECTIONS:
+            stats = self.stats(name)
+            if stats is None:
+                continue
+            samples = self.samples[name]
+            lines.append(
+                f"{name:<9} n={len(samples):<5} mean {sum(samples) / len(samples):8.3f}  p50 {stats[0]:8.3f}"
+                f"  p99 {stats[1]:8.3f}  max {stats[2]:8.3f} ms"
+            )
+            counts = [0] * len(PROFILE_BUCKETS)
+            for ms in samples:
+                counts[bisect_left(PROFILE_BUCKETS, ms)] += 1
+            peak = max(counts)
+            low = 0.0
+            for bound, count in zip(PROFILE_BUCKETS, counts):
+                if count:
+                    label = f"{low:g}-{bound:g}" if bound != float("inf") else f">{low:g}"
+                    lines.append(f"  {label:>12} ms {count:6d} {'#' * max(1, count * 40 // peak)}")
+                low = bound
+        return "\n".join(lines)
+
+class Dashboard:
+    def __init__(self, profiler: Profiler | None = None) -> None:
+        self.sections = SectionCache()
+        self.profiler = profiler
+        self.notice = ""
+        self.last_phrase_key: tuple[str, str] | None = None
+        self.last_phrase_value = ""
+
+    def _next_class(self, now: datetime) -> tuple[tuple[datetime, ClassEvent] | None, datetime]:
+        try:
+            occ, ev, _ = compute_next(now)
+        except ValueError:
+            # Nothing left (empty schedule or every term is over).
+            return None, next_midnight(now)
+        return (occ, ev), occ
+
+    def _current_class(self, now: datetime) -> tuple[tuple[datetime, ClassEvent] | None, datetime]:
+        # A later class can start before the current one ends and take over.
+        upcoming, deadline = self._next_class(now)
+        current = compute_current(now)
+        if current is None:
+            return None, deadline
+        start_dt, ev, _ = current
+        return (start_dt, ev), min(deadline, class_end(start_dt, ev), key=datetime.timestamp)
+
+    def _weekly(self, now: datetime) -> tuple[str, datetime]:
+        sleep_window = current_sleep_window(now)
+        if sleep_window and sleep_window[1].timestamp() > now.timestamp():
+            # The wake-up countdown sits inside the grid while asleep.
+            deadline = next_second(now)
+        else:
+            deadline = next_slot_boundary(now, WEEKLY_SLOT_MINUTES)
+            sleep_start = next_sleep_start(now)
+            if sleep_start is not None:
+                deadline = min(deadline, sleep_start, key=datetime.timestamp)
+        return build_weekly_view(now), deadline
+
+    def header_lines(self, now: datetime, upcoming: tuple[datetime, ClassEvent] | None) -> list[str]:
+        lines = [f"Now:        {now:%a %Y-%m-%d %I:%M:%S %p %Z}"]
+        if upcoming is None:
+            lines.append("Next class: none scheduled")
+        else:
+            occ, ev = upcoming
+            delta = real_delta(now, occ)
+            departure = compute_departure_time(delta, departure_lead(occ, ev))
+            lines += [
+                f"Next class: {ev.course} {ev.kind} ({ev.room}) @ {occ:%a %I:%M %p}",
+                f"Time left:  {fmt_delta(delta)} (HH:MM:SS)",
+                f"Departure:  {fmt_delta(departure)} (HH:MM:SS)",
+                f"Departure with Lunch: {fmt_delta(compute_lunch_time(departure))} (HH:MM:SS)",
+            ]
+        if SLEEP_ENABLED:
+            sleep_window = current_sleep_window(now)
+            if sleep_window:
+                sleep_start, sleep_end = sleep_window
+                lines.append(f"Sleep ends at: {sleep_end:%a %I:%M %p}")
+                lines.append(f"Sleep ends in: {fmt_delta(real_delta(now, sleep_end))} (HH:MM:SS)")
             else:
-                print("No class in session.")
-            print("")
-            print("Weekly Schedule")
-            print(build_weekly_view(now))
-            print("")
-            print(build_due_view(now))
-            print("")
-            print(build_due_list(now))
-            time_mod.sleep(1)
+                lines.append("Not sleeping right now.")
+        return lines
+
+    def current_box(self, now: datetime, current: tuple[datetime, ClassEvent] | None) -> str:
+        if current is None:
+            return "No class in session."
+        start_dt, current_ev = current
+        stage = phrase_stage(start_dt, current_ev, now)
+        phrase_key = (f"{current_ev.course}-{current_ev.kind}", stage)
+        if phrase_key != self.last_phrase_key:
+            self.last_phrase_value = random.choice(PHRASES[stage])
+            self.last_phrase_key = phrase_key
+        end_dt = class_end(start_dt, current_ev)
+        return make_box([
+            "Current Class",
+            f"課: {current_ev.course} {current_ev.kind}",
+            f"室: {current_ev.room}",
+            f"終: {end_dt:%I:%M %p}",
+            f"残: {fmt_delta(real_delta(now, end_dt))}",
+            f"狐: {self.last_phrase_value}",
+        ])
+
+    def _section(self, name: str, now: datetime, key: Any, build: Callable[[datetime], tuple[Any, datetime]]) -> Any:
+        if self.profiler is None:
+            return self.sections.get(name, now, key, build)
+        started = time_mod.perf_counter()
+        value = self.sections.get(name, now, key, build)
+        self.profiler.record(name, time_mod.perf_counter() - started)
+        return value
+
+    def frame(self, now: datetime) -> str:
+        schedule_key = weekly_sources_key()
+        due_key = DUE_VERSION
+        upcoming = self._section("next", now, schedule_key, self._next_class)
+        current = self._section("current", now, schedule_key, self._current_class)
+        weekly = self._section("weekly", now, schedule_key, self._weekly)
+        due_view = self._section("due_view", now, due_key, lambda t: (build_due_view(t), next_midnight(t)))
+        due_list = self._section("due_list", now, due_key, lambda t: (build_due_list(t), next_midnight(t)))
+        lines = self.header_lines(now, upcoming)
+        if self.notice:
+            lines.append(self.notice)
+        lines.append("")
+        lines.append(self.current_box(now, current))
+        lines.append("")
+        lines.append("Weekly Schedule")
+        lines.append(weekly)
+        lines.append("")
+        lines.append(due_view)
+        lines.append("")
+        lines.append(due_list)
+        if self.profiler is not None:
+            lines.append("")
+            lines += self.profiler.footer()
+        return "\n".join(lines)
+
+    def next_wakeup(self, now: datetime) -> datetime:
+        # The header countdowns tick every second; everything else waits for
+        # its own deadline, so an idle second costs one header render.
+        deadline = self.sections.next_deadline()
+        wakeup = next_second(now)
+        if deadline is not None and deadline.timestamp() < wakeup.timestamp():
+            wakeup = deadline
+        return wakeup
+
+class Clock:
+    # What the run loops read the time from and sleep on; replay swaps in a
+    # virtual one.
+    def now(self) -> datetime:
+        return datetime.now(TZ)
+
+    def time(self) -> float:
+        return time_mod.time()
+
+    def sleep(self, seconds: float) -> None:
+        time_mod.sleep(seconds)
+
+class ReplayClock(Clock):
+    # Virtual time from `start`. Sleeping moves it forward and takes 1/speed
+    # of the real time, or none at all when speed is 0 (as fast as possible).
+    def __init__(self, start: datetime, speed: float = 1000.0) -> None:
+        self.t = start.timestamp()
+        self.speed = speed
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.t, TZ)
+
+    def time(self) -> float:
+        return self.t
+
+    def sleep(self, seconds: float) -> None:
+        seconds = max(0.0, seconds)
+        if self.speed > 0:
+            time_mod.sleep(seconds / self.speed)
+        self.t += seconds
+
+SYSTEM_CLOCK = Clock()
+
+class FrameRecorder:
+    # Writes one JSON line per frame in which the dashboard's state changed:
+    # next and current class, sleep window, notice, and a digest of each
+    # cached text section with its HH:MM:SS countdowns blanked, so two runs
+    # over the same range only differ where behaviour did.
+    def __init__(self, stream) -> None:
+        self.stream = stream
+        self.state: dict[str, Any] = {}
+        self.frames = 0
+        self.transitions = 0
+
+    COUNTDOWN = re.compile(r"\d\d:\d\d:\d\d")
+
+    @classmethod
+    def describe(cls, value: Any) -> Any:
+        import hashlib
+
+        if isinstance(value, str):
+            return hashlib.sha1(cls.COUNTDOWN.sub("", value).encode()).hexdigest()[:12]
+        if isinstance(value, tuple) and len(value) == 2 and isinstance(value[1], ClassEvent):
+            start_dt, ev = value
+            return f"{ev.course} {ev.kind} @ {start_dt.isoformat()}"
+        return value
+
+    def record(self, now: datetime, dashboard: Dashboard) -> None:
+        import json
+
+        self.frames += 1
+        sleep_window = current_sleep_window(now)
+        state = {name: self.describe(entry[3]) for name, entry in dashboard.sections.entries.items()}
+        state["sleep"] = None if sleep_window is None else sleep_window[1].isoformat()
+        state["notice"] = dashboard.notice or None
+        changes = {key: value for key, value in state.items() if self.state.get(key, ()) != value}
+        if changes:
+            self.transitions += 1
+            self.stream.write(json.dumps({"t": now.isoformat(), "frame": self.frames, "changes": changes}, ensure_ascii=False) + "\n")
+        self.state = state
+
+def run_dashboard(
+    watcher: ScheduleFileWatcher | None,
+    profiler: Profiler | None = None,
+    clock: Clock = SYSTEM_CLOCK,
+    until: datetime | None = None,
+    renderer: TerminalRenderer | None = None,
+    recorder: FrameRecorder | None = None,
+    travel: TravelFileWatcher | None = None,
+) -> int:
+    renderer = renderer or TerminalRenderer()
+    dashboard = Dashboard(profiler)
+    wakeup: datetime | None = None
+    frames = 0
+    stopped = False
+    try:
+        while True:
+            started = time_mod.perf_counter()
+            if watcher is not None or travel is not None:
+                notices = []
+                for source in (watcher, travel):
+                    if source is not None:
+                        source.poll()
+                        notices.append(source.error)
+                dashboard.notice = "  ".join(filter(None, notices))
+            now = clock.now()
+            if until is not None and now.timestamp() >= until.timestamp():
+                break
+            if profiler is None:
+                renderer.render(dashboard.frame(now))
+            else:
+                profiler.record("poll", time_mod.perf_counter() - started)
+                profiler.tick(now, wakeup)
+                started = time_mod.perf_counter()
+                frame = dashboard.frame(now)
+                profiler.record("frame", time_mod.perf_counter() - started)
+                started = time_mod.perf_counter()
+                renderer.render(frame)
+                profiler.record("write", time_mod.perf_counter() - started)
+            frames += 1
+            if recorder is not None:
+                recorder.record(now, dashboard)
+            wakeup = dashboard.next_wakeup(now)
+            clock.sleep(max(0.0, wakeup.timestamp() - clock.time()))
     except KeyboardInterrupt:
+        stopped = True
+    finally:
+        renderer.close()
+    if stopped:
         print("\nStopped.")
+    if profiler is not None:
+        print(profiler.report(), file=sys.stderr)
+    return frames
+
+def run_replay(
+    start: datetime,
+    end: datetime,
+    speed: float,
+    headless: bool,
+    record: str | None,
+    profiler: Profiler | None,
+    seed: int,
+) -> int:
+    # The dashboard over [start, end) on a virtual clock. Headless frames are
+    # still built and written, to /dev/null, so the run measures the whole
+    # frame pipeline.
+    import contextlib
+
+    random.seed(seed)
+    with contextlib.ExitStack() as stack:
+        renderer = None
+        if headless:
+            renderer = TerminalRenderer(stack.enter_context(open(os.devnull, "w", encoding="utf-8")))
+        recorder = None
+        if record:
+            stream = sys.stdout if record == "-" else stack.enter_context(open(record, "w", encoding="utf-8"))
+            recorder = FrameRecorder(stream)
+        started = time_mod.perf_counter()
+        frames = run_dashboard(None, profiler, ReplayClock(start, 0 if headless else speed), end, renderer, recorder)
+        elapsed = time_mod.perf_counter() - started
+    summary = f"Replayed {start:%Y-%m-%d %H:%M} - {end:%Y-%m-%d %H:%M}: {frames} frames in {elapsed:.2f} s, {frames / max(elapsed, 1e-9):.0f} frames/s"
+    if recorder is not None:
+        summary += f", {recorder.transitions} with state changes"
+    print(summary, file=sys.stderr)
+    return 0
+
+def run_conflicts(week: date | None, as_json: bool) -> int:
+    now = datetime.now(TZ)
+    day = week or now.date()
+    conflicts = find_conflicts(day - timedelta(days=day.weekday()))
+    if as_json:
+        import json
+
+        def conflict_event_json(ev: ClassEvent, source: str) -> dict:
+            return {
+                **event_json(ev),
+                "source": source,
+                "weekday": DAY_NAMES[ev.weekday],
+                "start": ev.start.isoformat(timespec="minutes"),
+                "duration": ev.duration.total_seconds() / 60,
+            }
+
+        print(json.dumps([
+            {
+                "first": conflict_event_json(c.first, c.first_source),
+                "second": conflict_event_json(c.second, c.second_source),
+                "weekday": DAY_NAMES[(c.start // (24 * 60)) % 7],
+                "start": f"{c.start % (24 * 60) // 60:02d}:{c.start % 60:02d}",
+                "minutes": c.minutes,
+            }
+            for c in conflicts
+        ], indent=2, ensure_ascii=False))
+    else:
+        print(conflict_report(conflicts))
+    return 1 if conflicts else 0
+
+def run_travel(week: date | None) -> int:
+    day = week or datetime.now(TZ).date()
+    week_start = day - timedelta(days=day.weekday())
+    matrix = travel_matrix()
+    if matrix is None:
+        print(f"No travel file (${TRAVEL_FILE_ENV} or {' / '.join(TRAVEL_FILE_CANDIDATES)}); every class leaves {fmt_delta_hm(DEPARTURE_LEAD)} ahead.")
+    occurrences = sorted(
+        (datetime.combine(week_start + timedelta(days=ev.weekday), ev.start, tzinfo=TZ), ev)
+        for ev in week_occurrences(SCHEDULE, week_start)
+    )
+    for occ, ev in occurrences:
+        lead = departure_lead(occ, ev)
+        origin = "" if matrix is None else f"  from {previous_place(occ, matrix) or '?'}"
+        leave = datetime.fromtimestamp(occ.timestamp() - lead.total_seconds(), TZ)
+        print(f"{occ:%a %H:%M}  {ev.course} {ev.kind} ({ev.room}){origin}  leave {leave:%H:%M} ({int(lead.total_seconds() // 60)} min)")
+    return 0
+
+def local_datetime(value: str) -> datetime:
+    # An ISO date or date-time from the command line, local unless it says otherwise.
+    dt = datetime.fromisoformat(value)
+    return dt.replace(tzinfo=TZ) if dt.tzinfo is None else dt.astimezone(TZ)
+
+def run_free(minutes: float, start: datetime | None, end: datetime | None, first_only: bool, as_json: bool) -> int:
+    now = datetime.now(TZ)
+    start = start or now
+    if first_only:
+        found = next_free_window(start, minutes)
+        windows = [] if found is None else [found]
+    else:
+        if end is None:
+            end = datetime.combine(start.date() + timedelta(days=7 - start.weekday()), time(0), tzinfo=TZ)
+        windows = free_windows(start, end, minutes)
+    if as_json:
+        import json
+
+        print(json.dumps([
+            {
+                "start": s.isoformat(timespec="minutes"),
+                "end": e.isoformat(timespec="minutes"),
+                "minutes": int(real_delta(s, e).total_seconds() // 60),
+            }
+            for s, e in windows
+        ], indent=2))
+    elif not windows:
+        print(f"No free window of {minutes:g} min.")
+    else:
+        for s, e in windows:
+            length = int(real_delta(s, e).total_seconds() // 60)
+            print(f"{s:%a %Y-%m-%d %H:%M} - {e:%a %H:%M}  {length // 60:3d}h{length % 60:02d}")
+    return 0 if windows else 1
+
+def run_semester(first_day: date | None, weeks: int, path: str, pager: bool) -> int:
+    write_lines(iter_semester_view(first_day or datetime.now(TZ).date(), weeks), path, pager)
+    return 0
+
+def weekly_hours(value: str) -> tuple[int, int] | str:
+    # "auto" or "FIRST-LAST" in whole hours, e.g. "7-23".
+    if value == "auto":
+        return value
+    first, _, last = value.partition("-")
+    hours = (int(first), int(last))
+    if not 0 <= hours[0] < hours[1] <= 24:
+        raise ValueError(value)
+    return hours
+
+def main(argv: list[str] | None = None) -> None:
+    global WEEKLY_SLOT_MINUTES, WEEKLY_HOURS
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Class schedule dashboard.")
+    parser.add_argument(
+        "--schedule",
+        default=default_schedule_file(),
+        help=f"TOML/JSON/iCalendar schedule file, hot-reloaded on change (default: ${SCHEDULE_FILE_ENV} or {' / '.join(SCHEDULE_FILE_CANDIDATES)} next to this script)",
+    )
+    parser.add_argument(
+        "--travel",
+        default=default_travel_file(),
+        help=f"TOML/JSON travel times between places, hot-reloaded on change (default: ${TRAVEL_FILE_ENV} or {' / '.join(TRAVEL_FILE_CANDIDATES)} next to this script)",
+    )
+    parser.add_argument("--export-schedule", metavar="PATH", help="write the loaded schedule as JSON and exit")
+    parser.add_argument("--export-ics", metavar="PATH", help="write the week's events and due items as iCalendar ('-' for stdout) and exit")
+    parser.add_argument(
+        "--once",
+        "--statusline",
+        action="store_true",
+        help="print one status line (next class, countdowns, current class) and exit; served from a cache, see statusline.py",
+    )
+    parser.add_argument("--profile", action="store_true", help="time each dashboard section and tick drift; stats footer, full histograms on exit")
+    parser.add_argument(
+        "--resolution",
+        type=int,
+        choices=WEEKLY_RESOLUTIONS,
+        default=WEEKLY_SLOT_MINUTES,
+        help="minutes per row of the weekly grid (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--hours",
+        type=weekly_hours,
+        default=WEEKLY_HOURS,
+        help="hours shown in the weekly grid: FIRST-LAST (e.g. 7-23) or 'auto' to crop to the events (default: all day)",
+    )
+    commands = parser.add_subparsers(dest="command")
+    conflicts_cmd = commands.add_parser("conflicts", help="list overlapping events and exit (status 1 if any)")
+    conflicts_cmd.add_argument("--week", type=date.fromisoformat, help="any date in the week to check (default: this week)")
+    conflicts_cmd.add_argument("--json", action="store_true", help="print the report as JSON")
+    semester_cmd = commands.add_parser("semester", help="print classes, sleep, mornings and due items day by day over many weeks")
+    semester_cmd.add_argument("--from", dest="start", type=date.fromisoformat, help="any date in the first week (default: this week)")
+    semester_cmd.add_argument("--weeks", type=int, default=16, help="number of weeks (default: %(default)s)")
+    semester_cmd.add_argument("--output", "-o", default="-", metavar="PATH", help="write to a file instead of stdout")
+    semester_cmd.add_argument("--no-pager", dest="pager", action="store_false", help="never pipe stdout through $PAGER")
+    replay_cmd = commands.add_parser("replay", help="run the dashboard over a time range on a virtual clock")
+    replay_cmd.add_argument("--from", dest="start", type=local_datetime, required=True, help="ISO date/time to start at")
+    replay_cmd.add_argument("--to", dest="end", type=local_datetime, help="ISO date/time to stop at (default: a day later)")
+    replay_cmd.add_argument("--speed", type=float, default=1000.0, help="virtual seconds per real second, 0 for as fast as possible (default: %(default)g)")
+    replay_cmd.add_argument("--headless", action="store_true", help="no terminal output, as fast as possible (a frame-pipeline benchmark)")
+    replay_cmd.add_argument("--record", metavar="PATH", help="write each frame's state changes as JSON lines ('-' for stdout)")
+    replay_cmd.add_argument("--seed", type=int, default=0, help="seed for the phrase picks, so replays repeat exactly (default: %(default)s)")
+    travel_cmd = commands.add_parser("travel", help="list the week's classes with where you come from and when to leave")
+    travel_cmd.add_argument("--week", type=date.fromisoformat, help="any date in the week to list (default: this week)")
+    free_cmd = commands.add_parser("free", help="list free windows between classes, meals, sleep and mornings (status 1 if none)")
+    free_cmd.add_argument("--minutes", type=float, default=30, help="shortest window worth listing (default: %(default)g)")
+    free_cmd.add_argument("--from", dest="start", type=local_datetime, help="ISO date/time to search from (default: now)")
+    free_cmd.add_argument("--to", dest="end", type=local_datetime, help="ISO date/time to search to (default: end of that week)")
+    free_cmd.add_argument("--next", action="store_true", help="only the first window long enough, however far ahead")
+    free_cmd.add_argument("--json", action="store_true", help="print the windows as JSON")
+    args = parser.parse_args(argv)
+    WEEKLY_SLOT_MINUTES, WEEKLY_HOURS = args.resolution, args.hours
+    if args.once:
+        # Normally answered by the sys.argv check at the top before any of
+        # this loads; this covers main() being called directly.
+        import statusline
+
+        sys.exit(statusline.main(["--schedule", args.schedule] if args.schedule else []))
+
+    watcher: ScheduleFileWatcher | None = None
+    if args.schedule:
+        watcher = ScheduleFileWatcher(args.schedule)
+        watcher.poll()
+        if watcher.error:
+            parser.error(watcher.error)
+    travel = watch_travel_file(args.travel)
+    if travel is not None and travel.error:
+        parser.error(travel.error)
+    if args.export_schedule or args.export_ics:
+        if args.export_schedule:
+            dump_schedule_file(args.export_schedule)
+        if args.export_ics:
+            export_ics(args.export_ics, datetime.now(TZ))
+        return
+    if args.command == "conflicts":
+        sys.exit(run_conflicts(args.week, args.json))
+    if args.command == "travel":
+        sys.exit(run_travel(args.week))
+    if args.command == "replay":
+        end = args.end or args.start + timedelta(days=1)
+        sys.exit(run_replay(args.start, end, args.speed, args.headless, args.record, Profiler() if args.profile else None, args.seed))
+    if args.command == "semester":
+        sys.exit(run_semester(args.start, args.weeks, args.output, args.pager))
+    if args.command == "free":
+        sys.exit(run_free(args.minutes, args.start, args.end, args.next, args.json))
+    run_dashboard(watcher, Profiler() if args.profile else None, travel=travel)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+from datetime import datetime
+import argparse
+import asyncio
+import json
+import os
+import stat
+import sys
+import time as time_mod
+
+import main
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_REQUEST_BYTES = 8192
+REQUEST_TIMEOUT = 10.0
+
+
+class SnapshotHub:
+    # One snapshot per second, encoded once and shared by every client.
+    # Subscribers wait on `changed`, which is swapped for a fresh event on
+    # each tick, so a slow client just skips to the latest snapshot.
+    def __init__(self, watcher: main.ScheduleFileWatcher | None, travel: main.TravelFileWatcher | None = None) -> None:
+        self.watcher = watcher
+        self.travel = travel
+        self.payload = b"{}"
+        self.changed = asyncio.Event()
+        self.due: list[dict] | None = None
+        self.due_key: tuple | None = None
+
+    def refresh(self, now: datetime) -> None:
+        sources = [source for source in (self.watcher, self.travel) if source is not None]
+        for source in sources:
+            source.poll()
+        due_key = (main.DUE_VERSION, now.date())
+        if due_key != self.due_key:
+            self.due = main.due_snapshot(now)
+            self.due_key = due_key
+        snapshot = main.status_snapshot(now, self.due)
+        errors = [source.error for source in sources if source.error]
+        if errors:
+            snapshot["error"] = "  ".join(errors)
+        self.payload = json.dumps(snapshot, ensure_ascii=False).encode()
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+    async def run(self) -> None:
+        while True:
+            now = datetime.now(main.TZ)
+            self.refresh(now)
+            await asyncio.sleep(max(0.0, main.next_second(now).timestamp() - time_mod.time()))
+
+    async def updates(self):
+        while True:
+            changed = self.changed
+            await changed.wait()
+            yield self.payload
+
+
+def http_head(status: str, content_type: str, extra: str = "") -> bytes:
+    return (
+        f"HTTP/1.1 {status}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        "Cache-Control: no-store\r\n"
+        "Connection: close\r\n"
+        f"{extra}\r\n"
+    ).encode()
+
+
+async def handle(hub: SnapshotHub, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), REQUEST_TIMEOUT)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+            return
+        method, _, rest = request.decode("latin-1").partition(" ")
+        path = rest.partition(" ")[0].partition("?")[0]
+        if method != "GET":
+            writer.write(http_head("405 Method Not Allowed", "text/plain", "Allow: GET\r\n") + b"GET only\n")
+        elif path in ("/", "/status"):
+            body = hub.payload + b"\n"
+            writer.write(http_head("200 OK", "application/json", f"Content-Length: {len(body)}\r\n") + body)
+        elif path == "/events":
+            # Server-sent events, one `data:` line per snapshot.
+            writer.write(http_head("200 OK", "text/event-stream"))
+            writer.write(b"data: " + hub.payload + b"\n\n")
+            await writer.drain()
+            async for payload in hub.updates():
+                writer.write(b"data: " + payload + b"\n\n")
+                await writer.drain()
+        elif path == "/stream":
+            # Line-delimited JSON for clients that just read lines.
+            writer.write(http_head("200 OK", "application/x-ndjson"))
+            writer.write(hub.payload + b"\n")
+            await writer.drain()
+            async for payload in hub.updates():
+                writer.write(payload + b"\n")
+                await writer.drain()
+        else:
+            writer.write(http_head("404 Not Found", "text/plain") + b"try /status, /events or /stream\n")
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        # Runs on cancellation too, which then carries on to the server.
+        writer.close()
+
+
+def is_socket(path: str) -> bool:
+    try:
+        return stat.S_ISSOCK(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return False
+
+
+async def serve(hub: SnapshotHub, host: str, port: int, unix_path: str | None) -> None:
+    hub.refresh(datetime.now(main.TZ))
+    client = lambda reader, writer: handle(hub, reader, writer)
+    if unix_path:
+        # Only a leftover socket is replaced; anything else at the path is
+        # most likely a mistyped --unix.
+        if is_socket(unix_path):
+            os.unlink(unix_path)
+        elif os.path.exists(unix_path):
+            raise FileExistsError(f"{unix_path} exists and is not a socket")
+        server = await asyncio.start_unix_server(client, unix_path, limit=MAX_REQUEST_BYTES)
+        where = unix_path
+    else:
+        server = await asyncio.start_server(client, host, port, limit=MAX_REQUEST_BYTES)
+        where = f"http://{host}:{port}"
+    print(f"Serving status on {where} (/status, /events, /stream)", file=sys.stderr)
+    async with server:
+        await asyncio.gather(server.serve_forever(), hub.run())
+
+
+def main_cli(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve the dashboard state as JSON, streamed once per second.")
+    parser.add_argument(
+        "--schedule",
+        default=main.default_schedule_file(),
+        help=f"TOML/JSON/iCalendar schedule file, hot-reloaded on change (default: ${main.SCHEDULE_FILE_ENV} or {' / '.join(main.SCHEDULE_FILE_CANDIDATES)})",
+    )
+    parser.add_argument(
+        "--travel",
+        default=main.default_travel_file(),
+        help=f"TOML/JSON travel times between places, hot-reloaded on change (default: ${main.TRAVEL_FILE_ENV} or {' / '.join(main.TRAVEL_FILE_CANDIDATES)})",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to listen on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port (default: %(default)s)")
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    args = parser.parse_args(argv)
+    if args.unix and os.path.exists(args.unix) and not is_socket(args.unix):
+        parser.error(f"--unix {args.unix} exists and is not a socket")
+
+    watcher: main.ScheduleFileWatcher | None = None
+    if args.schedule:
+        watcher = main.ScheduleFileWatcher(args.schedule)
+        watcher.poll()
+        if watcher.error:
+            parser.error(watcher.error)
+    travel = main.watch_travel_file(args.travel)
+    if travel is not None and travel.error:
+        parser.error(travel.error)
+    try:
+        asyncio.run(serve(SnapshotHub(watcher, travel), args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.unix and is_socket(args.unix):
+            os.unlink(args.unix)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# One compact status line for tmux, polybar and shell prompts. The common path
+# only stats a few files and reads the transitions cache; main (and with it
+# zoneinfo, dataclasses and the schedule parsers) is imported only when the
+# cache has to be rebuilt, about once a week or after a schedule edit.
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+CACHE_ENV = "SCHEDULER_STATUS_CACHE"
+CACHE_MAGIC = "scheduler-status 1"
+# Keep in step with main.SCHEDULE_FILE_ENV / SCHEDULE_FILE_CANDIDATES.
+SCHEDULE_FILE_ENV = "SCHEDULER_FILE"
+SCHEDULE_FILE_CANDIDATES = ("schedule.toml", "schedule.json", "schedule.ics")
+# And main.TRAVEL_FILE_ENV / TRAVEL_FILE_CANDIDATES.
+TRAVEL_FILE_ENV = "SCHEDULER_TRAVEL"
+TRAVEL_FILE_CANDIDATES = ("travel.toml", "travel.json")
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def default_cache_path() -> str:
+    path = os.environ.get(CACHE_ENV)
+    if path:
+        return path
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "scheduler", "status")
+
+
+def source_paths(schedule: str) -> list[str]:
+    # Everything the answer depends on: main.py (it holds the built-in
+    # schedule), the schedule file and the travel file (departure times), or
+    # every candidate when none is named, so creating one is noticed too.
+    paths = [os.path.join(HERE, "main.py")]
+    if schedule:
+        paths.append(os.path.abspath(schedule))
+    else:
+        paths += [os.path.join(HERE, name) for name in SCHEDULE_FILE_CANDIDATES]
+    travel = os.environ.get(TRAVEL_FILE_ENV)
+    if travel:
+        paths.append(os.path.abspath(travel))
+    else:
+        paths += [os.path.join(HERE, name) for name in TRAVEL_FILE_CANDIDATES]
+    return paths
+
+
+def source_stamps(paths: list[str]) -> list[str]:
+    stamps = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            stamps.append(f"{path}\t-")
+        else:
+            stamps.append(f"{path}\t{st.st_mtime_ns}:{st.st_size}")
+    return stamps
+
+
+def fmt_delta(seconds: float) -> str:
+    total = max(0, int(seconds))
+    return f"{total // 3600:02d}:{total % 3600 // 60:02d}:{total % 60:02d}"
+
+
+def clean(label: str) -> str:
+    return label.replace("\t", " ").replace("\n", " ")
+
+
+def write_cache(path: str, app, schedule: str) -> None:
+    # `app` is the loaded main module; its schedule must already be applied.
+    now = app.datetime.now(app.TZ)
+    valid_until, segments = app.status_transitions(now)
+    lines = [f"{CACHE_MAGIC}\t{schedule}\t{valid_until}", "\t".join(source_stamps(source_paths(schedule)))]
+    for start, upcoming, current in segments:
+        fields = [repr(start), "", "", "", "", ""]
+        if upcoming is not None:
+            fields[1:4] = [repr(upcoming[0]), repr(upcoming[1]), clean(upcoming[2])]
+        if current is not None:
+            fields[4:6] = [repr(current[0]), clean(current[1])]
+        lines.append("\t".join(fields))
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        fh.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+
+
+def read_cache(path: str, schedule: str, t: float) -> list[str] | None:
+    # The segment line covering `t`, or None when the cache is missing,
+    # expired, for another schedule, or older than any of its sources.
+    try:
+        with open(path, encoding="utf-8") as fh:
+            lines = fh.read().split("\n")
+    except OSError:
+        return None
+    if len(lines) < 3:
+        return None
+    magic, _, rest = lines[0].partition("\t")
+    cached_schedule, _, valid_until = rest.rpartition("\t")
+    try:
+        if magic != CACHE_MAGIC or cached_schedule != schedule or not t < float(valid_until):
+            return None
+        if lines[1] != "\t".join(source_stamps(source_paths(schedule))):
+            return None
+        found = None
+        for line in lines[2:]:
+            if not line:
+                continue
+            fields = line.split("\t")
+            if float(fields[0]) > t:
+                break
+            found = fields
+        if found is not None:
+            _, next_start, next_depart, _, current_end, _ = found
+            for value in (next_start, next_depart, current_end):
+                if value:
+                    float(value)
+    except ValueError:
+        return None  # truncated or corrupt: rebuild it
+    return found
+
+
+def format_line(fields: list[str], t: float) -> str:
+    _, next_start, next_depart, next_label, current_end, current_label = fields
+    parts = []
+    if next_start:
+        parts.append(f"{next_label} in {fmt_delta(float(next_start) - t)}")
+        leave = float(next_depart) - t
+        parts.append("leave now" if leave <= 0 else f"leave in {fmt_delta(leave)}")
+    else:
+        parts.append("no upcoming classes")
+    if current_end:
+        parts.append(f"now: {current_label}, {fmt_delta(float(current_end) - t)} left")
+    return " | ".join(parts)
+
+
+def main(argv: list[str] | None = None) -> int:
+    # Deliberately no argparse: it costs more to import than the whole fast path.
+    args = sys.argv[1:] if argv is None else argv
+    schedule = os.environ.get(SCHEDULE_FILE_ENV, "")
+    cache = default_cache_path()
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg in ("--schedule", "--cache") and i + 1 < len(args):
+            if arg == "--schedule":
+                schedule = args[i + 1]
+            else:
+                cache = args[i + 1]
+            i += 2
+        elif arg.startswith(("--schedule=", "--cache=")):
+            name, _, value = arg.partition("=")
+            if name == "--schedule":
+                schedule = value
+            else:
+                cache = value
+            i += 1
+        elif arg in ("--once", "--statusline"):
+            i += 1
+        else:
+            print(f"usage: {os.path.basename(sys.argv[0])} [--schedule PATH] [--cache PATH]", file=sys.stderr)
+            return 2
+    t = time.time()
+    fields = read_cache(cache, schedule, t)
+    if fields is None:
+        import main as app
+
+        path = schedule or app.default_schedule_file()
+        if path:
+            try:
+                app.load_schedule_file(path)
+            except (OSError, app.ScheduleFileError) as exc:
+                print(f"schedule error: {exc}")
+                return 1
+        try:
+            write_cache(cache, app, schedule)
+        except OSError as exc:
+            print(f"status cache not writable: {exc}", file=sys.stderr)
+        t = time.time()
+        fields = read_cache(cache, schedule, t)
+        if fields is None:
+            # Unwritable cache: answer from the module directly.
+            now = app.datetime.fromtimestamp(t, app.TZ)
+            _, segments = app.status_transitions(now)
+            _, upcoming, current = segments[0]
+            fields = [repr(t)] + (["", "", ""] if upcoming is None else [repr(upcoming[0]), repr(upcoming[1]), upcoming[2]])
+            fields += ["", ""] if current is None else [repr(current[0]), current[1]]
+    print(format_line(fields, t))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
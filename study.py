@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Sequence
+import argparse
+import json
+import sys
+import time as time_mod
+
+import main
+
+DEFAULT_SLOT = 5
+DEFAULT_BUFFER = 10
+DEFAULT_BUDGET = 0.8
+MAX_NODES = 200_000
+STUDY_KIND = "Study"
+STUDY_ROOM = "N/A"
+
+
+@dataclass(frozen=True)
+class StudyRequest:
+    course: str
+    minutes: int  # per week
+    min_block: int = 60
+    max_block: int = 90
+    days: frozenset[int] = frozenset(range(7))
+    earliest: int = 8 * 60  # minutes after midnight
+    latest: int = 22 * 60
+    per_day: int = 1  # blocks of this course on one day
+
+
+@dataclass
+class StudyPlan:
+    events: list[main.ClassEvent] = field(default_factory=list)
+    unplaced: list[tuple[str, int]] = field(default_factory=list)  # (course, minutes)
+    nodes: int = 0
+    exhausted: bool = False  # stopped by the budget before proving the best
+
+
+def parse_minutes(value: str) -> int:
+    # "90", "90m", "1.5h", "1h30".
+    text = value.strip().lower()
+    hours, sep, rest = text.partition("h")
+    if sep:
+        return round(float(hours or 0) * 60 + float(rest.rstrip("m") or 0))
+    return round(float(text.rstrip("m")))
+
+
+def clock_minutes(value: str) -> int:
+    # "HH:MM" as minutes after midnight; "24:00" is the end of the day.
+    if value.strip() == "24:00":
+        return 24 * 60
+    clock = main.parse_clock(value)
+    return clock.hour * 60 + clock.minute
+
+
+def parse_days(value: str) -> frozenset[int]:
+    # "Mon-Fri", "Sat+Sun", "Tue-Thu+Sun".
+    days: set[int] = set()
+    for part in value.split("+"):
+        first, sep, last = part.partition("-")
+        a = main.parse_weekday(first)
+        b = main.parse_weekday(last) if sep else a
+        days.update(d % 7 for d in range(a, b + 1 if b >= a else b + 8))
+    return frozenset(days)
+
+
+def parse_request(spec: str) -> StudyRequest:
+    # "COURSE=HOURS[,block=MIN-MAX][,days=Mon-Fri][,between=HH:MM-HH:MM][,per_day=N]",
+    # e.g. "MAT 2384=6h,block=60-90,days=Mon-Fri+Sun,between=09:00-21:00".
+    course, sep, rest = spec.partition("=")
+    if not sep or not course.strip():
+        raise ValueError(f"expected COURSE=HOURS in {spec!r}")
+    total, *options = rest.split(",")
+    try:
+        fields: dict = {"minutes": parse_minutes(total)}
+        for option in options:
+            key, _, value = option.partition("=")
+            key = key.strip()
+            if key == "block":
+                low, _, high = value.partition("-")
+                fields["min_block"] = parse_minutes(low)
+                fields["max_block"] = parse_minutes(high or low)
+            elif key == "days":
+                fields["days"] = parse_days(value)
+            elif key == "between":
+                low, _, high = value.partition("-")
+                fields["earliest"] = clock_minutes(low)
+                fields["latest"] = clock_minutes(high)
+            elif key == "per_day":
+                fields["per_day"] = int(value)
+            else:
+                raise ValueError(f"unknown option {key!r}")
+    except (ValueError, main.ScheduleFileError) as exc:
+        raise ValueError(f"{exc} in {spec!r}") from None
+    request = StudyRequest(course.strip(), **fields)
+    if request.minutes <= 0 or request.min_block <= 0 or request.max_block < request.min_block or request.per_day < 1:
+        raise ValueError(f"bad hours or block sizes in {spec!r}")
+    if request.earliest >= request.latest:
+        raise ValueError(f"empty time window in {spec!r}")
+    return request
+
+
+def read_requests(path: str) -> list[StudyRequest]:
+    requests = []
+    with open(path, encoding="utf-8") as fh:
+        for lineno, line in enumerate(fh, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            try:
+                requests.append(parse_request(line))
+            except ValueError as exc:
+                raise ValueError(f"{path}:{lineno}: {exc}") from None
+    return requests
+
+
+def split_blocks(request: StudyRequest, slot: int) -> list[int]:
+    # The weekly total in as few blocks of at most max_block as possible, as
+    # even as the slot size allows (in slots, longest first). When the two
+    # limits cannot both hold, blocks stay at least min_block long.
+    total = -(-request.minutes // slot)
+    longest = max(1, request.max_block // slot)
+    n = max(1, min(-(-total // longest), total // max(1, request.min_block // slot)))
+    base, extra = divmod(total, n)
+    return [base + 1] * extra + [base] * (n - extra)
+
+
+def span_mask(first: int, last: int) -> int:
+    return ((1 << (last - first)) - 1) << first if last > first else 0
+
+
+def day_masks(week_start: date, skip_courses: set[str], slot: int) -> list[int]:
+    # Bit k of day d is set when slot k of that day is taken by a class,
+    # meal, personal event, sleep or the morning routine. Study blocks of the
+    # courses being planned are left out: they are what gets replaced.
+    per_day = 24 * 60 // slot
+    masks = [0] * 7
+    sources = [
+        main.week_occurrences(main.SCHEDULE, week_start),
+        main.week_occurrences(main.FOOD_SCHEDULE, week_start),
+        [
+            ev for ev in main.week_occurrences(main.PERSONAL_SCHEDULE, week_start)
+            if not (ev.kind == STUDY_KIND and ev.course in skip_courses)
+        ],
+        main.build_sleep_events(),
+        main.build_morning_events(),
+    ]
+    for events in sources:
+        for ev in events:
+            start = ev.start.hour * 60 + ev.start.minute
+            end = start + int(ev.duration.total_seconds() // 60)
+            day = ev.weekday
+            # Events past midnight carry on into the next day (Sunday into Monday).
+            while end > 0:
+                masks[day] |= span_mask(start // slot, min(-(-end // slot), per_day))
+                start, end = 0, end - 24 * 60
+                day = (day + 1) % 7
+    return masks
+
+
+def dilate(mask: int, steps: int, full: int) -> int:
+    grown = mask
+    for k in range(1, steps + 1):
+        grown |= (mask << k) | (mask >> k)
+    return grown & full
+
+
+def runs_of(free: int, n: int) -> int:
+    # Bit p set when slots p..p+n-1 are all free, by doubling: after each
+    # step `runs` marks starts of free runs `length` slots long.
+    runs, length = free, 1
+    while length * 2 <= n:
+        runs &= runs >> length
+        length *= 2
+    if n > length:
+        runs &= runs >> (n - length)
+    return runs
+
+
+class _Stop(Exception):
+    pass
+
+
+def plan_study(
+    requests: Sequence[StudyRequest],
+    week_start: date,
+    slot: int = DEFAULT_SLOT,
+    buffer: int = DEFAULT_BUFFER,
+    budget: float = DEFAULT_BUDGET,
+    max_nodes: int = MAX_NODES,
+) -> StudyPlan:
+    # Depth-first branch and bound over the blocks, most constrained first.
+    # A day is one int per state, so checking where a block of n slots fits
+    # is a handful of shifts and ANDs. Only left-aligned starts are tried
+    # (right after something busy or at the window's start): sliding blocks
+    # earlier never breaks a placement, so this loses no solutions and keeps
+    # the branching to the number of free stretches. Leaving a block out is
+    # the last branch, so the best partial plan is kept when nothing fits all.
+    per_day = 24 * 60 // slot
+    full = (1 << per_day) - 1
+    pad = -(-buffer // slot)
+    occupied = day_masks(week_start, {r.course for r in requests}, slot)
+    windows = [span_mask(-(-r.earliest // slot), r.latest // slot) for r in requests]
+    blocks = [(n, i) for i, r in enumerate(requests) for n in split_blocks(r, slot)]
+    blocks.sort(key=lambda b: (len(requests[b[1]].days) * bin(windows[b[1]]).count("1"), -b[0], b[1]))
+    remaining = [0] * (len(blocks) + 1)
+    for k in range(len(blocks) - 1, -1, -1):
+        remaining[k] = remaining[k + 1] + blocks[k][0]
+
+    blocked = [dilate(mask, pad, full) for mask in occupied]
+    counts = [[0] * 7 for _ in requests]  # blocks per course per day
+    study = [0] * 7  # study slots per day, to spread the load
+    chosen: list[tuple[int, int] | None] = [None] * len(blocks)
+    best: list[tuple[int, int] | None] = list(chosen)
+    best_slots = -1
+    nodes = 0
+    deadline = time_mod.perf_counter() + budget
+
+    def search(k: int, placed: int) -> None:
+        nonlocal best, best_slots, nodes
+        nodes += 1
+        if nodes >= max_nodes or (nodes & 255 == 0 and time_mod.perf_counter() > deadline):
+            raise _Stop
+        if placed + remaining[k] <= best_slots:
+            return
+        if k == len(blocks):
+            best, best_slots = list(chosen), placed
+            if placed == remaining[0]:
+                raise _Stop  # everything placed; nothing can beat it
+            return
+        n, i = blocks[k]
+        request = requests[i]
+        # Identical blocks of one course are interchangeable: keep them in
+        # (day, start) order so each set of placements is tried once.
+        after = (-1, -1)
+        twin = k > 0 and blocks[k - 1] == blocks[k]
+        if twin:
+            if chosen[k - 1] is None:
+                search(k + 1, placed)
+                return
+            after = chosen[k - 1]
+        for day in sorted(request.days, key=lambda d: (counts[i][d], study[d], d)):
+            if counts[i][day] >= request.per_day or day < after[0]:
+                continue
+            free = ~blocked[day] & windows[i]
+            starts = runs_of(free, n) & ~(free << 1)
+            while starts:
+                low = starts & -starts
+                starts ^= low
+                p = low.bit_length() - 1
+                if (day, p) <= after:
+                    continue
+                mask = span_mask(p, p + n)
+                saved = blocked[day]
+                occupied[day] |= mask
+                blocked[day] = dilate(occupied[day], pad, full)
+                counts[i][day] += 1
+                study[day] += n
+                chosen[k] = (day, p)
+                search(k + 1, placed + n)
+                chosen[k] = None
+                study[day] -= n
+                counts[i][day] -= 1
+                occupied[day] &= ~mask
+                blocked[day] = saved
+        search(k + 1, placed)
+
+    plan = StudyPlan()
+    try:
+        search(0, 0)
+    except _Stop:
+        plan.exhausted = best_slots < remaining[0]
+    plan.nodes = nodes
+    for (n, i), spot in zip(blocks, best):
+        course = requests[i].course
+        if spot is None:
+            plan.unplaced.append((course, n * slot))
+            continue
+        day, p = spot
+        minute = p * slot
+        plan.events.append(
+            main.ClassEvent(course, STUDY_KIND, STUDY_ROOM, day, time(minute // 60, minute % 60), timedelta(minutes=n * slot))
+        )
+    plan.events.sort(key=lambda ev: (ev.weekday, ev.start, ev.course))
+    return plan
+
+
+def apply_plan(plan: StudyPlan, requests: Sequence[StudyRequest]) -> None:
+    # Swaps the planned courses' study blocks in PERSONAL_SCHEDULE for the plan.
+    courses = {r.course for r in requests}
+    kept = [ev for ev in main.PERSONAL_SCHEDULE if not (ev.kind == STUDY_KIND and ev.course in courses)]
+    main.PERSONAL_SCHEDULE = kept + plan.events
+    main.schedule_changed()
+
+
+def render(plan: StudyPlan) -> str:
+    lines = []
+    for ev in plan.events:
+        minutes = int(ev.duration.total_seconds() // 60)
+        lines.append(f"{main.DAY_NAMES[ev.weekday]} {ev.start:%H:%M}  {minutes:4d} min  {ev.course}")
+    for course, minutes in plan.unplaced:
+        lines.append(f"unplaced: {course} {minutes} min")
+    if plan.exhausted:
+        lines.append(f"(search stopped after {plan.nodes} nodes; a better plan may exist)")
+    return "\n".join(lines) or "Nothing to place."
+
+
+def main_cli(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Place weekly study blocks into free time around classes, meals and sleep.")
+    parser.add_argument(
+        "requests",
+        nargs="*",
+        metavar="REQUEST",
+        help="COURSE=HOURS[,block=MIN-MAX][,days=Mon-Fri][,between=HH:MM-HH:MM][,per_day=N], e.g. 'MAT 2384=6h,block=60-90'",
+    )
+    parser.add_argument("--file", "-f", metavar="PATH", help="read requests from a file, one per line ('#' comments)")
+    parser.add_argument("--schedule", default=main.default_schedule_file(), help="TOML/JSON/iCalendar schedule file (default: main.py's)")
+    parser.add_argument("--week", type=date.fromisoformat, help="any date in the week to plan around (default: this week)")
+    parser.add_argument("--slot", type=int, default=DEFAULT_SLOT, help="grid resolution in minutes (default: %(default)s)")
+    parser.add_argument("--buffer", type=int, default=DEFAULT_BUFFER, help="free minutes kept around each block (default: %(default)s)")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="seconds of search before settling (default: %(default)s)")
+    parser.add_argument("--json", action="store_true", help="print the plan as JSON")
+    parser.add_argument("--write", metavar="PATH", help="write the schedule with these study blocks replaced, as JSON")
+    args = parser.parse_args(argv)
+    if args.slot <= 0 or 24 * 60 % args.slot:
+        parser.error("--slot must divide a day evenly")
+
+    try:
+        requests = [parse_request(spec) for spec in args.requests]
+        if args.file:
+            requests += read_requests(args.file)
+        if args.schedule:
+            main.load_schedule_file(args.schedule)
+    except (OSError, ValueError, main.ScheduleFileError) as exc:
+        parser.error(str(exc))
+    if not requests:
+        parser.error("nothing to plan: give COURSE=HOURS requests or --file")
+
+    day = args.week or datetime.now(main.TZ).date()
+    plan = plan_study(requests, day - timedelta(days=day.weekday()), args.slot, args.buffer, args.budget)
+    if args.json:
+        print(json.dumps({
+            "events": [
+                {
+                    "course": ev.course,
+                    "weekday": main.DAY_NAMES[ev.weekday],
+                    "start": ev.start.isoformat(timespec="minutes"),
+                    "minutes": int(ev.duration.total_seconds() // 60),
+                }
+                for ev in plan.events
+            ],
+            "unplaced": [{"course": course, "minutes": minutes} for course, minutes in plan.unplaced],
+            "exhausted": plan.exhausted,
+        }, indent=2, ensure_ascii=False))
+    else:
+        print(render(plan))
+    if args.write:
+        apply_plan(plan, requests)
+        main.dump_schedule_file(args.write)
+    sys.exit(1 if plan.unplaced else 0)
+
+
+if __name__ == "__main__":
+    main_cli()
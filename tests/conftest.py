@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    # Tests swap main's schedule lists; set up before (and so torn down
+    # after) monkeypatch, so every test starts and ends on fresh caches.
+    main.schedule_changed()
+    main.due_items_changed()
+    yield
+    main.schedule_changed()
+    main.due_items_changed()
+
+
+@pytest.fixture
+def schedule(monkeypatch):
+    # Replaces the loaded schedule the way a file reload does.
+    def use(*events, personal=(), food=()):
+        monkeypatch.setattr(main, "SCHEDULE", list(events))
+        monkeypatch.setattr(main, "PERSONAL_SCHEDULE", list(personal))
+        monkeypatch.setattr(main, "FOOD_SCHEDULE", list(food))
+        main.schedule_changed()
+
+    return use
+
+
+@pytest.fixture
+def reloads(monkeypatch, tmp_path):
+    # Lets a test load schedule files; main's lists are put back afterwards
+    # and parse caches go to a scratch directory.
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    for name in ("SCHEDULE", "PERSONAL_SCHEDULE", "FOOD_SCHEDULE", "DUE_ITEMS"):
+        monkeypatch.setattr(main, name, getattr(main, name))
+    return tmp_path
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import alerts
+import main
+
+
+def event(course, hour, minute, room="R1"):
+    return main.ClassEvent(course, "Lecture", room, 1, time(hour, minute), timedelta(minutes=50))
+
+
+def armed(engine):
+    return {key[1].course: datetime.fromtimestamp(at, main.TZ) for key, (at, _) in engine.pending.items()}
+
+
+def test_resync_only_pushes_moved_alerts(schedule):
+    now = datetime(2026, 2, 2, 8, 0, tzinfo=main.TZ)
+    events = [event("A", 9, 0), event("B", 13, 0)]
+    schedule(*events)
+    engine = alerts.AlertEngine(("depart",), [])
+    engine.sync(now)
+    size = len(engine.heap)
+    for _ in range(50):
+        engine.sync(now)
+    assert len(engine.heap) == size
+
+    # A new class just before B moves B's departure and nothing else.
+    before = armed(engine)
+    schedule(*events, event("C", 12, 0, room="Elsewhere"))
+    engine.sync(now)
+    after = armed(engine)
+    assert after["A"] == before["A"]
+    fresh = alerts.AlertEngine(("depart",), [])
+    fresh.sync(now)
+    assert after == armed(fresh)
+    assert len(engine.heap) <= 2 * len(engine.pending)
+
+
+def test_stale_entries_are_compacted(schedule):
+    now = datetime(2026, 2, 2, 8, 0, tzinfo=main.TZ)
+    schedule(event("A", 9, 0))
+    engine = alerts.AlertEngine(("depart",), [])
+    engine.sync(now)
+    for minute in range(1, 40):
+        schedule(event("A", 9, minute))
+        engine.sync(now)
+        assert len(engine.heap) <= 2 * len(engine.pending)
+    (at, _), = engine.pending.values()
+    assert engine.next_at() == at
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("numpy")
+
+import cohort
+import main
+
+
+def test_current_tie_skips_ended_event(schedule):
+    # Three events start together; the middle one has ended by the query, so
+    # the first listed one that still runs wins, as in compute_current.
+    events = [
+        main.ClassEvent("A", "Lecture", "R1", 0, time(10, 0), timedelta(minutes=120)),
+        main.ClassEvent("B", "Lecture", "R2", 0, time(10, 0), timedelta(minutes=30)),
+        main.ClassEvent("C", "Lecture", "R3", 0, time(10, 0), timedelta(minutes=120)),
+    ]
+    now = datetime(2026, 2, 2, 10, 45, tzinfo=main.TZ)
+    schedule(*events)
+    expected = main.compute_current(now)
+    assert expected is not None and expected[1].course == "A"
+
+    group = cohort.Cohort.from_schedules([events])
+    event, remaining = group.current_events(now)
+    assert group.event(int(event[0])).course == "A"
+    assert remaining[0] == pytest.approx(expected[2].total_seconds())
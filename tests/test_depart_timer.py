@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import depart_timer
+import main
+
+TRAVEL = {
+    "home": "Home",
+    "buffer": 5,
+    "default": 25,
+    "routes": [
+        {"from": "Home", "to": "Learning Crossroads", "minutes": 18},
+        {"from": "Learning Crossroads", "to": "SITE", "minutes": 4},
+    ],
+}
+
+
+@pytest.fixture
+def targets(monkeypatch, tmp_path, schedule):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(main, "_travel", None)
+    monkeypatch.setattr(main, "_travel_loaded", True)
+    events = [
+        main.ClassEvent("CSI 2110", "Lecture", "SITE 2061", 1, time(10, 0), timedelta(minutes=80)),
+        main.ClassEvent("MAT 1341", "Lecture", "Nowhere 1", 1, time(13, 0), timedelta(minutes=80)),
+    ]
+    schedule(*events)
+    return [depart_timer.Target(f"{ev.course} {ev.kind}", timedelta(minutes=12), event=ev) for ev in events]
+
+
+def departures(targets):
+    now = datetime(2026, 2, 3, 7, 0, tzinfo=main.TZ)
+    queue = depart_timer.DepartureQueue(targets, now)
+    return {target.label: depart_dt.strftime("%H:%M") for depart_dt, _, target in queue.soonest(len(targets))}
+
+
+def test_schedule_targets_use_travel_times(targets, tmp_path):
+    path = tmp_path / "travel.json"
+    path.write_text(json.dumps(TRAVEL), encoding="utf-8")
+    main.load_travel_file(str(path))
+    # Home -> SITE is 22 minutes plus the 5 minute buffer; an unknown room
+    # takes the file's default.
+    assert departures(targets) == {"CSI 2110 Lecture": "09:33", "MAT 1341 Lecture": "12:35"}
+
+
+def test_schedule_targets_fall_back_to_lead(targets):
+    assert departures(targets) == {"CSI 2110 Lecture": "09:48", "MAT 1341 Lecture": "12:48"}
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from datetime import datetime
+import dataclasses
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+NOW = datetime(2026, 2, 4, 12, 0, tzinfo=main.TZ)
+
+
+def views():
+    return main.build_due_view(NOW), main.build_due_list(NOW)
+
+
+def fresh_views(monkeypatch):
+    # The same views from a store built from scratch.
+    monkeypatch.setattr(main, "_due_store", None)
+    return views()
+
+
+@pytest.fixture
+def items(monkeypatch):
+    monkeypatch.setattr(main, "DUE_ITEMS", [
+        main.DueItem("CSI 2110", "Assignment 1", datetime(2026, 2, 6, 23, 59, tzinfo=main.TZ)),
+        main.DueItem("MAT 1341", "Quiz", datetime(2026, 2, 4, 10, 0, tzinfo=main.TZ)),
+        main.DueItem("CSI 2110", "Lab 2", datetime(2026, 2, 6, 23, 59, tzinfo=main.TZ)),
+    ])
+    monkeypatch.setattr(main, "_due_store", None)
+    main.due_items_changed()
+    return main.DUE_ITEMS
+
+
+def test_add_and_remove(monkeypatch, items):
+    views()
+    added = main.DueItem("ECO 1102", "Essay", datetime(2026, 2, 10, 17, 0, tzinfo=main.TZ))
+    main.add_due_item(added)
+    view, listing = views()
+    assert "ECO 1102 (Essay)" in view and "ECO 1102 | Essay" in listing
+    assert (view, listing) == fresh_views(monkeypatch)
+
+    removed = items[0]
+    main.remove_due_item(removed)
+    view, listing = views()
+    assert "Assignment 1" not in view and "Assignment 1" not in listing
+    assert (view, listing) == fresh_views(monkeypatch)
+    with pytest.raises(ValueError):
+        main.remove_due_item(removed)
+
+
+def test_in_place_edit_same_length(monkeypatch, items):
+    views()
+    items[1] = dataclasses.replace(items[1], due_date=datetime(2026, 2, 12, 9, 0, tzinfo=main.TZ))
+    main.due_items_changed()
+    view, listing = views()
+    assert listing.splitlines()[-1].startswith("MAT 1341 | Quiz | +8d")
+    assert (view, listing) == fresh_views(monkeypatch)
+
+
+def test_reload_with_same_count(monkeypatch, reloads, items):
+    path = reloads / "schedule.json"
+    main.dump_schedule_file(str(path))
+    main.load_schedule_file(str(path))
+    before = views()
+    doc = json.loads(path.read_text(encoding="utf-8"))
+    doc["due"][0]["due"] = "2026-02-05T08:00:00-05:00"
+    path.write_text(json.dumps(doc), encoding="utf-8")
+    main.load_schedule_file(str(path))
+    after = views()
+    assert after != before
+    assert after == fresh_views(monkeypatch)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+
+def minute_scan(week_starts):
+    # Free windows by marking every minute any busy interval touches.
+    lo = main.local_epoch(week_starts[0], time(0))
+    hi = main.local_epoch(week_starts[-1] + timedelta(days=7), time(0))
+    busy = bytearray((hi - lo) // 60)
+    for week_start in week_starts:
+        for s, e in main.busy_intervals(week_start):
+            for m in range((s - lo) // 60, -(-(e - lo) // 60)):
+                busy[m] = 1
+    windows, m = [], 0
+    while m < len(busy):
+        if busy[m]:
+            m += 1
+            continue
+        start = m
+        while m < len(busy) and not busy[m]:
+            m += 1
+        windows.append((lo + start * 60, lo + m * 60))
+    return lo, hi, windows
+
+
+def free_windows(lo, hi, minutes=0):
+    found = main.free_windows(datetime.fromtimestamp(lo, main.TZ), datetime.fromtimestamp(hi, main.TZ), minutes)
+    return [(int(s.timestamp()), int(e.timestamp())) for s, e in found]
+
+
+def fresh_windows(week_start):
+    table = main.FreeTime(week_start, main.busy_intervals(week_start))
+    return list(table.windows(table.lo, table.hi))
+
+
+@pytest.mark.parametrize("first", [date(2026, 3, 2), date(2026, 10, 26)])
+def test_reload_updates_cached_trees(reloads, first):
+    weeks = [first, first + timedelta(days=7)]
+    path = reloads / "schedule.json"
+    main.dump_schedule_file(str(path))
+    main.load_schedule_file(str(path))
+    lo, hi, expected = minute_scan(weeks)
+    assert free_windows(lo, hi) == expected
+    cached = [main.free_time(week) for week in weeks]
+
+    doc = json.loads(path.read_text(encoding="utf-8"))
+    del doc["schedule"][0]
+    doc["food"][0]["start"] = "17:15"
+    doc["personal"].append({"course": "Gym", "kind": "Workout", "room": "N/A", "weekday": "Sun", "start": "01:30", "duration": 95})
+    doc["personal"].append({"course": "Call", "kind": "Chat", "room": "N/A", "weekday": "Wed", "start": "12:07", "duration": 13})
+    path.write_text(json.dumps(doc), encoding="utf-8")
+    main.load_schedule_file(str(path))
+
+    lo, hi, expected = minute_scan(weeks)
+    assert free_windows(lo, hi) == expected
+    # The cached trees took the edit in place and agree with new ones.
+    assert all(main.free_time(week) is table for week, table in zip(weeks, cached))
+    for week in weeks:
+        table = main.free_time(week)
+        assert list(table.windows(table.lo, table.hi)) == fresh_windows(week)
+    assert free_windows(lo, hi, 120) == [(s, e) for s, e in expected if e - s >= 120 * 60]
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ical
+import main
+
+NOW = datetime(2026, 2, 4, 12, 0, tzinfo=main.TZ)
+
+
+def calendar(*lines):
+    return "\r\n".join(["BEGIN:VCALENDAR", "VERSION:2.0", *lines, "END:VCALENDAR", ""])
+
+
+def import_text(reloads, text):
+    path = reloads / "in.ics"
+    path.write_text(text, encoding="utf-8", newline="")
+    return main.parse_schedule_file(str(path))
+
+
+def round_trip(reloads):
+    path = reloads / "out.ics"
+    main.export_ics(str(path), NOW)
+    return main.parse_schedule_file(str(path))
+
+
+def test_default_schedule_round_trip(reloads):
+    json_path = reloads / "schedule.json"
+    main.dump_schedule_file(str(json_path))
+    expected = main.parse_schedule_file(str(json_path))
+    got = round_trip(reloads)
+    monday = NOW.date() - timedelta(days=NOW.weekday())
+    for want_rows, got_rows in zip(expected[:3], got[:3]):
+        assert len(got_rows) == len(want_rows)
+        for want, row in zip(want_rows, got_rows):
+            # Plain weekly events come back starting in the exported week.
+            assert row[:7] == want[:7]
+            assert row[7] == ((monday + timedelta(days=want[3])).isoformat(), None, 1, None, (), ())
+    assert got[3] == expected[3]
+
+
+def test_recurrence_round_trip(reloads):
+    def at(day, hour, minute=0):
+        return datetime(*day, hour, minute, tzinfo=main.TZ).isoformat()
+
+    rows = (
+        [
+            ("CSI 2110", "Lecture", "SITE 0130", 2, (10, 0, 0), 4800.0, "", ("2026-01-14", "2026-04-15", 1, None, ("2026-02-18", "2026-03-04"), (at((2026, 3, 5), 14, 30),))),
+            ("CSI 2110", "Lab", "STE 2060", 3, (8, 30, 0), 10800.0, "", ("2026-01-15", "2026-04-09", 2, "2026-01-12", (), ())),
+            ("CSI 2110", "Review", "SITE 0130", 5, (13, 0, 0), 7200.0, "", ("2026-04-18", "2026-04-17", 1, None, (), (at((2026, 4, 18), 13), at((2026, 4, 25), 13)))),
+        ],
+        [("Club", "Meeting", "UCU 215", 4, (18, 0, 0), 3600.0, "", ("2026-03-13", "2026-03-13", 1, None, (), ()))],
+        [],
+        [("CSI 2110", "Assignment 1", datetime(2026, 2, 6, 23, 59, tzinfo=main.TZ).isoformat())],
+    )
+    main.apply_schedule_rows(rows)
+    assert round_trip(reloads) == rows
+
+
+def test_folded_lines():
+    room = "Pavillon Desmarais – salle 12102 " * 4
+    line = f"LOCATION:{ical.escape(room)}"
+    folded = ical.fold(line)
+    parts = folded.split("\r\n")[:-1]
+    assert len(parts) > 1
+    assert all(len(part.encode("utf-8")) <= ical.FOLD_WIDTH for part in parts)
+    assert all(part.startswith(" ") for part in parts[1:])
+    assert list(ical.unfold(io.StringIO(folded))) == [line]
+
+    # A tab continues a line too, and a continuation can split a word.
+    text = calendar(
+        "BEGIN:VEVENT",
+        "UID:a@example",
+        "SUMMARY:CSI 2110 Lec",
+        "\ttu",
+        " re",
+        "LOCATION:SITE",
+        "  0130",
+        "DTSTART;TZID=America/Toronto:20260114T100000",
+        "DTEND;TZID=America/Toronto:20260114T112000",
+        "RRULE:FREQ=WEEKLY;BYDAY=WE;UNTIL=20260415T235959Z",
+        "END:VEVENT",
+    )
+    (component,) = [entry for _, entry in ical.iter_entries(io.StringIO(text))]
+    assert (component["course"], component["kind"], component["room"]) == ("CSI 2110", "Lecture", "SITE 0130")
+
+
+def test_exdate(reloads):
+    text = calendar(
+        "BEGIN:VEVENT",
+        "UID:b@example",
+        "SUMMARY:MAT 1341 Lecture",
+        "DTSTART;TZID=America/Toronto:20260112T083000",
+        "DURATION:PT1H20M",
+        "RRULE:FREQ=WEEKLY;BYDAY=MO;COUNT=6",
+        "EXDATE;TZID=America/Toronto:20260126T083000,20260202T083000",
+        "EXDATE:20260209T133000Z",
+        "END:VEVENT",
+    )
+    schedule, _, _, _ = import_text(reloads, text)
+    (row,) = schedule
+    assert row[3:6] == (0, (8, 30, 0), 4800.0)
+    assert row[7] == ("2026-01-12", "2026-02-16", 1, None, ("2026-01-26", "2026-02-02", "2026-02-09"), ())
+    main.apply_schedule_rows((schedule, [], [], []))
+    (ev,) = main.SCHEDULE
+    start = datetime(2026, 1, 1, tzinfo=main.TZ)
+    days = [occ.date() for occ in main.iter_occurrences(ev, start, start + timedelta(days=90))]
+    assert days == [date(2026, 1, 12), date(2026, 1, 19), date(2026, 2, 16)]
+
+
+def test_utc_and_other_zones(reloads):
+    text = calendar(
+        "BEGIN:VEVENT",
+        "UID:c@example",
+        "SUMMARY:Call",
+        "DTSTART:20260310T150000Z",
+        "DTEND:20260310T160000Z",
+        "END:VEVENT",
+        "BEGIN:VEVENT",
+        "UID:d@example",
+        "SUMMARY:Seminar",
+        "DTSTART;TZID=Europe/Paris:20260311T170000",
+        "DTEND;TZID=Europe/Paris:20260311T183000",
+        "END:VEVENT",
+    )
+    schedule, _, _, _ = import_text(reloads, text)
+    # 15:00 UTC is 11:00 EDT; 17:00 in Paris (CET) is 12:00 EDT.
+    assert [(row[0], row[3], row[4], row[5]) for row in schedule] == [
+        ("Call", 1, (11, 0, 0), 3600.0),
+        ("Seminar", 2, (12, 0, 0), 5400.0),
+    ]
+
+
+def test_one_offs_fold_into_a_series(reloads):
+    def meeting(uid, day, summary="Project Meeting"):
+        return [
+            "BEGIN:VEVENT",
+            f"UID:{uid}",
+            f"SUMMARY:{summary}",
+            "LOCATION:SITE 5084",
+            f"DTSTART;TZID=America/Toronto:{day}T150000",
+            f"DTEND;TZID=America/Toronto:{day}T160000",
+            "END:VEVENT",
+        ]
+
+    cancelled = [
+        "BEGIN:VEVENT",
+        "UID:m2@example",
+        "RECURRENCE-ID;TZID=America/Toronto:20260217T150000",
+        "SUMMARY:Project Meeting",
+        "STATUS:CANCELLED",
+        "DTSTART;TZID=America/Toronto:20260217T150000",
+        "DTEND;TZID=America/Toronto:20260217T160000",
+        "END:VEVENT",
+    ]
+    text = calendar(
+        *meeting("m1@example", "20260210"),
+        *meeting("m2@example", "20260217"),
+        *meeting("m3@example", "20260303"),
+        *meeting("x@example", "20260305", summary="Other"),
+        *cancelled,
+    )
+    schedule, _, _, _ = import_text(reloads, text)
+    rows = {row[0]: row for row in schedule}
+    assert set(rows) == {"Project Meeting", "Other"}
+    term_start, term_end, _, _, skip, extra = rows["Project Meeting"][7]
+    assert (term_start, term_end, skip) == ("2026-02-10", "2026-02-09", ())
+    assert [datetime.fromisoformat(dt).date() for dt in extra] == [date(2026, 2, 10), date(2026, 3, 3)]
+    assert rows["Other"][7] == ("2026-03-05", "2026-03-05", 1, None, (), ())
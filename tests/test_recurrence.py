@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+FIRST = date(2025, 12, 1)
+LAST = date(2026, 7, 1)
+WED = 2
+
+
+def lecture(rule=None, weekday=WED, start=time(10, 0)):
+    return main.ClassEvent("CSI 2110", "Lecture", "R1", weekday, start, timedelta(minutes=80), recurrence=rule)
+
+
+def regular_days(ev):
+    # Day by day, straight from the rule's definition, well past the last
+    # query so a next occurrence is never cut off.
+    rule = ev.recurrence or main.Recurrence()
+    anchor = rule.anchor or rule.term_start
+    day = FIRST
+    while day < LAST + timedelta(days=200):
+        ok = day.weekday() == ev.weekday
+        ok = ok and (rule.term_start is None or day >= rule.term_start)
+        ok = ok and (rule.term_end is None or day <= rule.term_end)
+        ok = ok and day not in rule.skip
+        if ok and anchor is not None and rule.interval > 1:
+            anchor_day = anchor + timedelta(days=(ev.weekday - anchor.weekday()) % 7)
+            ok = (day - anchor_day).days // 7 % rule.interval == 0
+        if ok:
+            yield day
+        day += timedelta(days=1)
+
+
+def brute_occurrences(ev):
+    rows = [(datetime.combine(day, ev.start, tzinfo=main.TZ), 0) for day in regular_days(ev)]
+    if ev.recurrence is not None:
+        rows += [(extra, 1) for extra in ev.recurrence.extra]
+    rows.sort(key=lambda row: (row[0].timestamp(), row[1]))
+    return [occ for occ, _ in rows]
+
+
+def brute_next(ev, now):
+    for occ in brute_occurrences(ev):
+        if occ.timestamp() > now.timestamp():
+            return occ
+    return None
+
+
+def check(ev, queries):
+    everything = brute_occurrences(ev)
+    for now in queries:
+        assert main.next_occurrence(now, ev) == brute_next(ev, now), now
+    for start, end in zip(queries, queries[1:]):
+        if start.timestamp() > end.timestamp():
+            start, end = end, start
+        expected = [occ for occ in everything if start.timestamp() <= occ.timestamp() < end.timestamp()]
+        assert list(main.iter_occurrences(ev, start, end)) == expected, (start, end)
+
+
+def at(day, hour=0, minute=0):
+    return datetime.combine(day, time(hour, minute), tzinfo=main.TZ)
+
+
+def every_day(hour=10, minute=0):
+    # Just before, at and just after the class time on every day.
+    day, out = FIRST, []
+    while day < LAST - timedelta(days=1):
+        out += [at(day, hour, minute) - timedelta(seconds=1), at(day, hour, minute), at(day, hour, minute) + timedelta(seconds=1)]
+        day += timedelta(days=1)
+    return out
+
+
+def test_plain_weekly():
+    check(lecture(), every_day())
+
+
+def test_term_start_and_end():
+    rule = main.Recurrence(term_start=date(2026, 1, 12), term_end=date(2026, 4, 15))
+    ev = lecture(rule)
+    check(ev, every_day())
+    assert main.next_occurrence(at(date(2025, 12, 20)), ev) == at(date(2026, 1, 14), 10)
+    assert main.next_occurrence(at(date(2026, 4, 15), 9), ev) == at(date(2026, 4, 15), 10)
+    assert main.next_occurrence(at(date(2026, 4, 15), 11), ev) is None
+
+
+def test_skip_dates():
+    # Reading week and a run of back-to-back skips.
+    skip = frozenset({date(2026, 2, 18), date(2026, 3, 4), date(2026, 3, 11), date(2026, 3, 18)})
+    ev = lecture(main.Recurrence(term_start=date(2026, 1, 12), term_end=date(2026, 4, 15), skip=skip))
+    check(ev, every_day())
+    assert main.next_occurrence(at(date(2026, 3, 1)), ev) == at(date(2026, 3, 25), 10)
+
+
+def test_override_dates():
+    # Moved from Wednesday to Thursday afternoon on two weeks.
+    moved = [date(2026, 2, 4), date(2026, 3, 25)]
+    rule = main.Recurrence(
+        term_start=date(2026, 1, 12),
+        term_end=date(2026, 4, 15),
+        skip=frozenset(moved),
+        extra=tuple(at(day + timedelta(days=1), 14, 30) for day in reversed(moved)),
+    )
+    ev = lecture(rule)
+    check(ev, every_day() + every_day(14, 30))
+    assert main.next_occurrence(at(date(2026, 2, 4), 9), ev) == at(date(2026, 2, 5), 14, 30)
+
+
+def test_biweekly_parity_across_term_boundary():
+    # Anchored in the fall term: the winter term keeps the same fortnights,
+    # whichever side of the term start a query falls on.
+    anchor = date(2025, 12, 3)
+    ev = lecture(main.Recurrence(term_start=date(2026, 1, 5), term_end=date(2026, 4, 15), interval=2, anchor=anchor))
+    days = list(regular_days(ev))
+    assert days[0] == date(2026, 1, 14)
+    assert all((day - anchor).days % 14 == 0 for day in days)
+    check(ev, every_day())
+    # Without an anchor, the term start sets the parity.
+    ev = lecture(main.Recurrence(term_start=date(2026, 1, 5), term_end=date(2026, 4, 15), interval=2))
+    assert next(regular_days(ev)) == date(2026, 1, 7)
+    check(ev, every_day())
+
+
+def test_ended_recurrence():
+    ev = lecture(main.Recurrence(term_start=date(2025, 9, 3), term_end=date(2025, 12, 10)))
+    check(ev, every_day())
+    assert main.next_occurrence(at(date(2026, 1, 1)), ev) is None
+    assert list(main.iter_occurrences(ev, at(date(2026, 1, 1)), at(date(2026, 6, 1)))) == []
+    assert not main.occurs_on(ev, date(2026, 1, 7))
+
+
+def test_extras_after_term_end():
+    extra = (at(date(2026, 4, 22), 9), at(date(2026, 4, 20), 18))
+    ev = lecture(main.Recurrence(term_start=date(2026, 1, 12), term_end=date(2026, 4, 15), extra=extra))
+    check(ev, every_day() + [at(date(2026, 4, 20), 18), at(date(2026, 4, 22), 9)])
+    assert main.next_occurrence(at(date(2026, 4, 16)), ev) == extra[1]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_rules(seed):
+    rng = random.Random(seed)
+    term_start = FIRST + timedelta(days=rng.randrange(0, 60))
+    term_end = term_start + timedelta(days=rng.randrange(0, 150))
+    weekday = rng.randrange(7)
+    skip = frozenset(term_start + timedelta(days=rng.randrange(0, 160)) for _ in range(rng.randrange(6)))
+    extra = tuple(at(FIRST + timedelta(days=rng.randrange(200)), rng.randrange(24), rng.choice((0, 30))) for _ in range(rng.randrange(5)))
+    rule = main.Recurrence(
+        term_start=term_start if rng.random() < 0.8 else None,
+        term_end=term_end if rng.random() < 0.8 else None,
+        interval=rng.choice((1, 1, 2, 3)),
+        anchor=FIRST + timedelta(days=rng.randrange(60)) if rng.random() < 0.5 else None,
+        skip=skip,
+        extra=extra,
+    )
+    # 02:30 exercises the spring-forward day when the class is on a Sunday.
+    ev = lecture(rule, weekday, rng.choice((time(2, 30), time(10, 0), time(23, 30))))
+    queries = [at(FIRST + timedelta(days=rng.randrange(205)), rng.randrange(24), rng.choice((0, 29, 30, 31))) for _ in range(150)]
+    check(ev, queries)
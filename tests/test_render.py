@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+
+class FakeTty(io.StringIO):
+    def isatty(self) -> bool:
+        return True
+
+
+def render(monkeypatch, frames, lines=10):
+    monkeypatch.setattr(main.shutil, "get_terminal_size", lambda *a: os.terminal_size((80, lines)))
+    stream = FakeTty()
+    renderer = main.TerminalRenderer(stream)
+    writes = []
+    for frame in frames:
+        start = stream.tell()
+        renderer.render(frame)
+        writes.append(stream.getvalue()[start:])
+    start = stream.tell()
+    renderer.close()
+    writes.append(stream.getvalue()[start:])
+    return writes
+
+
+def test_tall_frame_is_clipped_to_terminal(monkeypatch):
+    frame = "\n".join(f"line {i}" for i in range(25))
+    first, closed = render(monkeypatch, [frame])
+    for row in range(1, 10):
+        assert f"\033[{row};1Hline {row - 1}\033[K" in first
+    assert "\033[10;1H... 16 more lines\033[K" in first
+    assert "line 9" not in first
+    assert "\033[11;" not in first
+    assert closed == "\033[10;1H\r\n\033[?7h\033[?25h"
+
+
+def test_only_changed_rows_are_rewritten(monkeypatch):
+    before = "\n".join(f"line {i}" for i in range(25))
+    after = before.replace("line 3", "LINE 3").replace("line 20", "LINE 20")
+    _, second, _ = render(monkeypatch, [before, after])
+    assert second == "\033[4;1HLINE 3\033[K"
+
+
+def test_short_frame_is_drawn_whole(monkeypatch):
+    first, closed = render(monkeypatch, ["a\nb\nc"])
+    assert "\033[3;1Hc\033[K" in first
+    assert "more lines" not in first
+    assert closed == "\033[3;1H\r\n\033[?7h\033[?25h"
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta
+import asyncio
+import json
+import os
+import socket
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+import status_server
+
+
+def write_travel(path, minutes):
+    doc = {"home": "Home", "buffer": 0, "default": 30, "routes": [{"from": "Home", "to": "SITE", "minutes": minutes}]}
+    path.write_text(json.dumps(doc), encoding="utf-8")
+    # A new size or mtime is what the watcher looks for.
+    os.utime(path, ns=(minutes * 10**9, minutes * 10**9))
+
+
+def test_hub_picks_up_travel_edits(monkeypatch, tmp_path, schedule):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(main, "_travel", None)
+    monkeypatch.setattr(main, "_travel_loaded", False)
+    schedule(main.ClassEvent("CSI 2110", "Lecture", "SITE 2061", 1, time(10, 0), timedelta(minutes=80)))
+    path = tmp_path / "travel.json"
+    write_travel(path, 10)
+    hub = status_server.SnapshotHub(None, main.watch_travel_file(str(path)))
+    now = datetime(2026, 2, 3, 9, 0, tzinfo=main.TZ)
+    hub.refresh(now)
+    assert json.loads(hub.payload)["next"]["departure_in"] == 50 * 60
+    write_travel(path, 25)
+    hub.refresh(now)
+    assert json.loads(hub.payload)["next"]["departure_in"] == 35 * 60
+    path.write_text("{", encoding="utf-8")
+    hub.refresh(now)
+    snapshot = json.loads(hub.payload)
+    assert snapshot["next"]["departure_in"] == 35 * 60
+    assert snapshot["error"].startswith("Travel reload failed")
+
+
+def test_unix_path_that_is_not_a_socket_is_kept(tmp_path, capsys):
+    path = tmp_path / "notes.txt"
+    path.write_text("keep me", encoding="utf-8")
+    with pytest.raises(SystemExit):
+        status_server.main_cli(["--schedule", "", "--travel", "", "--unix", str(path)])
+    assert "is not a socket" in capsys.readouterr().err
+    assert path.read_text(encoding="utf-8") == "keep me"
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+def test_stale_socket_is_replaced(tmp_path):
+    path = str(tmp_path / "status.sock")
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(path)
+    stale.close()
+    assert status_server.is_socket(path)
+
+    async def start_and_stop():
+        task = asyncio.ensure_future(status_server.serve(status_server.SnapshotHub(None), "", 0, path))
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(path)
+                break
+            except ConnectionRefusedError:
+                await asyncio.sleep(0.01)
+        writer.write(b"GET /status HTTP/1.1\r\n\r\n")
+        assert (await reader.readline()).startswith(b"HTTP/1.1 200")
+        writer.close()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(asyncio.wait_for(start_and_stop(), 5))
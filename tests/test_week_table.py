@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+SUNDAY = 6
+
+
+def at(y, mo, d, h, mi, fold=0):
+    return datetime(y, mo, d, h, mi, tzinfo=main.TZ, fold=fold)
+
+
+def event(course, weekday, hour, minute, minutes):
+    return main.ClassEvent(course, "Lecture", "R1", weekday, time(hour, minute), timedelta(minutes=minutes))
+
+
+def test_spring_forward_class_in_gap(schedule):
+    # 2026-03-08 02:30 does not exist; the class starts at 03:30 EDT.
+    schedule(event("GAP", SUNDAY, 2, 30, 60))
+    occ, ev, left = main.compute_next(at(2026, 3, 8, 1, 0))
+    assert ev.course == "GAP"
+    assert occ.timestamp() == at(2026, 3, 8, 3, 30).timestamp()
+    assert left == timedelta(minutes=90)
+    start, ev, left = main.compute_current(at(2026, 3, 8, 3, 45))
+    assert ev.course == "GAP" and left == timedelta(minutes=45)
+    assert main.compute_current(at(2026, 3, 8, 4, 30)) is None
+
+
+def test_spring_forward_counts_real_time(schedule):
+    schedule(event("LATE", SUNDAY, 4, 0, 60))
+    _, _, left = main.compute_next(at(2026, 3, 8, 0, 0))
+    assert left == timedelta(hours=3)
+
+
+def test_fall_back_counts_real_time(schedule):
+    schedule(event("LATE", SUNDAY, 3, 0, 60))
+    _, _, left = main.compute_next(at(2026, 11, 1, 0, 0))
+    assert left == timedelta(hours=4)
+
+
+def test_fall_back_class_in_repeated_hour(schedule):
+    # 01:30 happens twice; the class takes the first (EDT) one and its
+    # hour runs until 01:30 EST.
+    schedule(event("TWICE", SUNDAY, 1, 30, 60))
+    occ, _, left = main.compute_next(at(2026, 11, 1, 0, 30))
+    assert left == timedelta(hours=1)
+    assert occ.utcoffset() == timedelta(hours=-4)
+    _, ev, left = main.compute_current(at(2026, 11, 1, 1, 15, fold=1))
+    assert ev.course == "TWICE" and left == timedelta(minutes=15)
+    assert main.compute_current(at(2026, 11, 1, 1, 45, fold=1)) is None
+
+
+@pytest.mark.parametrize("week_start", [date(2026, 3, 2), date(2026, 10, 26)])
+def test_week_table_matches_day_by_day_scan(schedule, week_start):
+    events = [event(f"C{h}", d, h, 30, 90) for d in range(7) for h in (0, 1, 2, 3, 22)]
+    schedule(*events)
+    table = main.WeekTable(events, week_start)
+    expected = sorted(
+        (main.local_epoch(week_start + timedelta(days=d), ev.start), i)
+        for d in range(14)
+        for i, ev in enumerate(events)
+        if ev.weekday == (week_start + timedelta(days=d)).weekday()
+    )
+    assert list(zip(table.starts, table.index)) == expected
+    for start, i in expected:
+        assert table.ends[table.starts.index(start)] - start == 90 * 60
+
+
+def test_weekly_deadline_while_waking_in_gap(monkeypatch, schedule):
+    # Sleep ends at 02:30 on the spring-forward day, which is really 03:30
+    # EDT; at 03:00 EDT the wake-up countdown is still running.
+    schedule()
+    monkeypatch.setattr(main, "SLEEP_ENABLED", True)
+    monkeypatch.setattr(main, "SLEEP_START", time(23, 30))
+    monkeypatch.setattr(main, "SLEEP_DURATION", timedelta(hours=3))
+    now = at(2026, 3, 8, 3, 0)
+    assert main.current_sleep_window(now) is not None
+    _, deadline = main.Dashboard()._weekly(now)
+    assert deadline == main.next_second(now)